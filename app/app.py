@@ -6,17 +6,28 @@ from datetime import datetime
 import flet as ft
 from flet.auth import OAuthProvider
 from flet.security import encrypt, decrypt
-from functools import cache
+from functools import cache, partial
 from google.oauth2.credentials import Credentials
 import httpx
+import inspect
 import logging
 import os
-from typing import Literal, Optional, Awaitable, Callable
+from typing import Any, Iterable, Literal, Optional, Awaitable, Callable
 
 import tabbycat_api as tc
-from .components import TabbycatAuthPagelet, MyAppBar, MyBottomAppBar, MyNavDrawer, TeamImporterPagelet, AdjudicatorImporterPagelet, RoundStatusPagelet, LogoManagerPagelet, SlideGeneratorPagelet
-from .exceptions import ExpectedError
+from .components import TabbycatAuthPagelet, MyAppBar, MyBottomAppBar, MyNavDrawer, TeamImporterPagelet, AdjudicatorImporterPagelet, RoundStatusPagelet, LogoManagerPagelet, SlideGeneratorPagelet, ComplianceSummaryPagelet, DiagnosticsPagelet
+from .ballot_analysis import BallotAnalysis, ScoreRules
+from .compliance import ComplianceMatrix, get_directions
+from .downloads import SessionDownloads
+from .exceptions import CollectionLoadError, ExpectedError
+from .feedback import FeedbackDelta, FeedbackSync
+from .google_api import build_service
+from .metrics import get_metrics, instrument_httpx
+from .pptx_renderer import ImageCache
+from .scheduler import Priority
+from .store import TournamentStore, get_store_registry
 from .utils import MyGoogleOAuthProvider, LogoData, get_version
+from .verification import DebateSummary, VerificationResult, summarize_debate
 
 LOGGER = logging.getLogger(__name__)
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
@@ -26,6 +37,19 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 assert GOOGLE_CLIENT_ID, "GOOGLE_CLIENT_ID is not set"
 assert GOOGLE_CLIENT_SECRET, "GOOGLE_CLIENT_SECRET is not set"
 assert SECRET_KEY, "SECRET_KEY is not set"
+PageletName = Literal["tabbycat_auth", "team_importer", "adjudicator_importer", "round_status", "logo_manager", "generate_slides", "compliance", "diagnostics"]
+ROUTES: dict[str, tuple[str, PageletName]] = {
+    "/": ("Home", "tabbycat_auth"),
+    "/teams": ("Import Teams", "team_importer"),
+    "/adjudicators": ("Import Adjudicators", "adjudicator_importer"),
+    "/rounds": ("Round Status", "round_status"),
+    "/logos": ("Manage Logos", "logo_manager"),
+    "/slides": ("Generate Slides", "generate_slides"),
+    "/compliance": ("Feedback Compliance", "compliance"),
+    "/admin": ("Diagnostics", "diagnostics"),
+}
+# Routes which can be opened without logging in to Tabbycat
+PUBLIC_ROUTES = ("/",)
 
 @dataclass
 class AppPagelets:
@@ -35,11 +59,16 @@ class AppPagelets:
     pg_round_status: RoundStatusPagelet = None
     pg_logo_manager: LogoManagerPagelet = None
     pg_generate_slides: SlideGeneratorPagelet = None
+    pg_compliance: ComplianceSummaryPagelet = None
+    pg_diagnostics: DiagnosticsPagelet = None
     
     def get_all_pagelets(self) -> list[ft.Pagelet]:
         return [getattr(self, field.name) for field in fields(self) if field.name.startswith("pg_")]
     
-    def switch_visibility(self, pagelet: Literal["tabbycat_auth", "team_importer", "adjudicator_importer", "round_status", "logo_manager", "generate_slides"]):
+    def get_pagelet(self, pagelet: PageletName) -> ft.Pagelet:
+        return getattr(self, f"pg_{pagelet}")
+    
+    def switch_visibility(self, pagelet: PageletName):
         for k, v in {field.name: getattr(self, field.name) for field in fields(self)}.items():
             if not k.startswith("pg_"):
                 pass
@@ -57,9 +86,7 @@ class AppPagelets:
 
 class TabbycatApp:
     page: ft.Page
-    client: tc.Client = None
-    institutions: tc.models.PaginatedInstitutions = None
-    tournament: tc.models.Tournament = None
+    store: Optional[TournamentStore] = None
     storage_key: str = None
     provider: MyGoogleOAuthProvider = None
     pagelets: AppPagelets = None
@@ -68,7 +95,12 @@ class TabbycatApp:
     __tasks: dict[str, asyncio.Task]
     __oauth_credentials: Optional[Credentials] = None
     __cached_images: dict[str, asyncio.Task]
+    __google_services: dict[tuple[str, str], Any]
+    __opened_pagelets: set[PageletName]
+    __opening_pagelets: dict[PageletName, asyncio.Task]
+    foreground: bool = True
     logos: Optional[LogoData]
+    image_cache: ImageCache
     
     def __init__(self, page: ft.Page):
         self.page = page
@@ -83,12 +115,20 @@ class TabbycatApp:
             AdjudicatorImporterPagelet(),
             RoundStatusPagelet(),
             LogoManagerPagelet(),
-            SlideGeneratorPagelet()
+            SlideGeneratorPagelet(),
+            ComplianceSummaryPagelet(),
+            DiagnosticsPagelet()
         )
         self.__tasks = {}
         self.__futures = {}
         self.__cached_images = {}
+        self.__google_services = {}
+        self.__opened_pagelets = set()
+        self.__opening_pagelets = {}
         self.__httpx = httpx.AsyncClient()
+        instrument_httpx(self.__httpx, "images")
+        self.image_cache = ImageCache(client=self.__httpx)
+        self.downloads = SessionDownloads()
         self.page.data = {"app": self}
         self.page.appbar = MyAppBar(self.on_click_login, on_click_logout=self.on_click_logout)
         self.page.drawer = MyNavDrawer()
@@ -96,6 +136,8 @@ class TabbycatApp:
         self.page.on_login = self.on_login
         self.page.on_logout = self.on_logout
         self.page.on_route_change = self.on_route_change
+        self.page.on_close = self.on_close
+        self.page.on_app_lifecycle_state_change = self.on_app_lifecycle_state_change
         self.page.controls = self.pagelets.get_all_pagelets()
         self.page.go("/")
         self.try_init_login()
@@ -173,6 +215,7 @@ class TabbycatApp:
                 token=self.page.auth.token.access_token,
                 refresh_handler=refresh_handler
             )
+            self.__google_services.clear()
             jt = self.page.auth.token.to_json()
             ejt = encrypt(jt, SECRET_KEY)
             try:
@@ -198,6 +241,7 @@ class TabbycatApp:
     
     def on_logout(self, e):
         self.__oauth_credentials = None
+        self.__google_services.clear()
         LOGGER.info("Logged out")
         self.page.open(
             ft.SnackBar(
@@ -208,28 +252,37 @@ class TabbycatApp:
         self.page.appbar.set_loginout()
         self.page.appbar.update()
     
+    async def on_close(self, e):
+        self.downloads.close()
+        if self.store is not None:
+            get_store_registry().release(self.store, self.page.session_id)
+            self.store = None
+    
+    def on_app_lifecycle_state_change(self, e: ft.AppLifecycleStateChangeEvent):
+        self.foreground = e.state not in (ft.AppLifecycleState.HIDE, ft.AppLifecycleState.PAUSE, ft.AppLifecycleState.DETACH)
+        if self.foreground:
+            self.resume_live()
+    
+    def resume_live(self):
+        """Polls the round shown in live mode right away, after the poller backed off while it was hidden"""
+        if self.store is not None and "round_status" in self.__opened_pagelets:
+            self.pagelets.pg_round_status.set_live()
+    
     def on_route_change(self, e: ft.RouteChangeEvent):
         LOGGER.info(f"Route change: {e.route}")
-        if self.client is None and e.route != "/":
+        if self.client is None and e.route not in PUBLIC_ROUTES:
             return self.page.go("/")
-        if e.route == "/":
-            self.set_title("Home")
-            self.pagelets.switch_visibility("tabbycat_auth")
-        elif e.route == "/teams":
-            self.set_title("Import Teams")
-            self.pagelets.switch_visibility("team_importer")
-        elif e.route == "/adjudicators":
-            self.set_title("Import Adjudicators")
-            self.pagelets.switch_visibility("adjudicator_importer")
-        elif e.route == "/rounds":
-            self.set_title("Round Status")
-            self.pagelets.switch_visibility("round_status")
-        elif e.route == "/logos":
-            self.set_title("Manage Logos")
-            self.pagelets.switch_visibility("logo_manager")
-        elif e.route == "/slides":
-            self.set_title("Generate Slides")
-            self.pagelets.switch_visibility("generate_slides")
+        if e.route in ROUTES:
+            title, pagelet = ROUTES[e.route]
+            self.set_title(title)
+            self.pagelets.switch_visibility(pagelet)
+            if pagelet == "diagnostics":
+                # Process-wide, shown fresh on every navigation
+                self.pagelets.pg_diagnostics.set_metrics()
+            elif self.store is not None and pagelet not in self.__opened_pagelets:
+                self.page.run_task(self.open_pagelet, pagelet)
+            elif pagelet == "round_status":
+                self.resume_live()
         self.page.update()
     
     def set_title(self, title: str):
@@ -287,6 +340,19 @@ class TabbycatApp:
     def oauth_credentials(self) -> Optional[Credentials]:
         return self.__oauth_credentials
     
+    def google_service(self, service_name: str, version: str) -> Any:
+        """Get a Google API service authorized with the credentials of the session, built once per login
+        
+        Raises:
+            ExpectedError: If not logged in to Google
+        """
+        if self.__oauth_credentials is None:
+            raise ExpectedError("Not logged in to Google")
+        key = (service_name, version)
+        if key not in self.__google_services:
+            self.__google_services[key] = build_service(service_name, version, self.__oauth_credentials)
+        return self.__google_services[key]
+    
     async def cache_image_async(self, *, src: Optional[str]=None, file_id: Optional[str]=None) -> str|None:
         try:
             if not src and not file_id:
@@ -322,32 +388,238 @@ class TabbycatApp:
         base64_image = base64.b64encode(response.content).decode("utf-8")
         return base64_image
     
-    async def set_tabbycat(self, client: tc.Client, tournament: tc.models.Tournament, storage_key: str):
-        self.client = client
-        self.tournament = tournament
-        self.institutions = await self.client.get_institutions()
-        await asyncio.gather(
-            self.update_teams(),
-            self.update_break_categories(),
-            self.update_speakers(),
-            self.update_speaker_categories(),
-            self.update_adjudicators(),
-            self.update_rounds(),
-            self.update_motions(),
-            self.update_venues(),
-            self.update_venue_categories(),
-            self.update_feedback_questions(),
-            self.update_feedback(),
-            self.update_preferences(),
+    @property
+    def client(self) -> Optional[tc.Client]:
+        return self.store and self.store.client
+    
+    @property
+    def tournament(self) -> Optional[tc.models.Tournament]:
+        return self.store and self.store.tournament
+    
+    @property
+    def institutions(self) -> Optional[tc.models.PaginatedInstitutions]:
+        return self.store and self.store.institutions
+    
+    @property
+    def feedback_sync(self) -> Optional[FeedbackSync]:
+        return self.store and self.store.feedback
+    
+    def get_collection(self, name: str) -> Any:
+        """Get the loaded paginated collection by name"""
+        return self.store.get_collection(name)
+    
+    def find(self, name: str, **kwargs) -> Optional[Any]:
+        """Finds an object of a loaded collection by an indexed key such as url, code, slug or identifier"""
+        return self.store.find(name, **kwargs)
+    
+    def preference(self, identifier: str, default: Any = None) -> Any:
+        """Get the value of a tournament preference"""
+        preference = self.store.find("preferences", identifier=identifier)
+        return default if preference is None else preference.value
+    
+    def compliance(self) -> ComplianceMatrix:
+        """Builds the feedback compliance matrix of the whole tournament from the loaded pairings and feedback, memoized until they change"""
+        return self.store.compliance.build(
+            self.tournament._links.rounds,
+            self.feedback_sync,
+            self.preference("feedback__feedback_from_teams"),
+            self.preference("feedback__feedback_paths")
         )
+    
+    def verify_debate(self, pairing: tc.models.RoundPairing, round: tc.models.Round) -> VerificationResult:
+        """Verifies the feedback of a debate against the feedback rules of its round, memoized until the debate or its feedback change"""
+        team_direction, adj_direction = get_directions(
+            round,
+            self.preference("feedback__feedback_from_teams"),
+            self.preference("feedback__feedback_paths")
+        )
+        return self.store.verification.verify(pairing, self.feedback_sync.for_debate(pairing.url), team_direction, adj_direction)
+    
+    def score_rules(self) -> ScoreRules:
+        return ScoreRules(
+            self.preference("scoring__score_min", 68.0),
+            self.preference("scoring__score_max", 82.0),
+            self.preference("scoring__reply_score_min", 34.0),
+            self.preference("scoring__reply_score_max", 41.0),
+            self.preference("debate_rules__speakers_in_team", 3),
+        )
+    
+    def analyze_ballots(self, pairing: tc.models.RoundPairing) -> BallotAnalysis:
+        """Compares the loaded ballots of a debate, memoized until they change"""
+        return self.store.ballot_analysis.analyze(pairing, self.score_rules())
+    
+    def debate_summaries(self) -> list[DebateSummary]:
+        """Summarizes the status of every debate whose pairings are loaded, from the memoized verification and ballot analysis"""
+        return [
+            summarize_debate(round, pairing, self.verify_debate(pairing, round), self.analyze_ballots(pairing))
+            for round in self.tournament._links.rounds
+            for pairing in round._links.pairing or ()
+        ]
+    
+    async def set_tabbycat(self, client: tc.Client, tournament: tc.models.Tournament, storage_key: str, force: bool = False):
+        """Sets the tournament to manage, attaching to the store shared with the other sessions managing it.
+
+        Args:
+            client (tc.Client): Client logged in to the Tabbycat instance. The store is shared only with the sessions using the same API token
+            tournament (tc.models.Tournament): Tournament to manage
+            storage_key (str): `tabbycat_login.*` client storage key of the login
+            force (bool, optional): Reload every collection even if already loaded. Defaults to False.
+        """
+        registry = get_store_registry()
+        store = registry.acquire(client, tournament, self.page.session_id)
+        if store is not self.store:
+            if self.store is not None:
+                registry.release(self.store, self.page.session_id)
+            self.store = store
+            self.__opened_pagelets.clear()
+            self.subscribe_pagelets()
+        if store.loaded_collections and not force:
+            LOGGER.info(f"Opening {tournament.name} from the shared store ({len(store.sessions)} sessions attached)")
+        error: Optional[CollectionLoadError] = None
+        try:
+            stale = await store.open(force, owner=self.page.session_id)
+        except CollectionLoadError as e:
+            # Keep whatever loaded, the pagelets depending only on it still work
+            stale, error = [], e
         self.storage_key = storage_key.split(".")[-1]
         LOGGER.info(f"Set Tabbycat {tournament.name} (storage_key = {self.storage_key})")
         await self.load_logos_async(self.storage_key)
         self.page.drawer.set_tabbycat()
-        self.pagelets.pg_logo_manager.set_tabbycat()
-        self.pagelets.pg_generate_slides.set_tabbycat()
+        self.set_pagelets()
         self.page.drawer.update()
-        self.page.run_task(self.pagelets.pg_round_status.set_tabbycat)
+        if error is not None:
+            self.show_load_error(error)
+        if stale:
+            self.page.run_task(self.revalidate, stale)
+    
+    def subscribe_pagelets(self):
+        """Subscribes the pagelets to the changes of the data they display"""
+        for _, pagelet in ROUTES.values():
+            if topics := getattr(self.pagelets.get_pagelet(pagelet), "topics", ()):
+                self.store.subscribe(self.page.session_id, topics, partial(self.notify_pagelet, pagelet))
+    
+    def notify_pagelet(self, pagelet: PageletName, topic: str, payload: Any) -> Optional[Awaitable]:
+        # Pagelets which have not been opened yet are set up with fresh data when opened
+        if pagelet in self.__opened_pagelets:
+            return self.pagelets.get_pagelet(pagelet).on_store_change(topic, payload)
+    
+    async def open_pagelet(self, pagelet: PageletName):
+        """Loads the collections required by a pagelet on its first navigation and sets it up, showing a progress bar meanwhile"""
+        task = self.__opening_pagelets.get(pagelet)
+        if task is None or task.done():
+            task = self.__opening_pagelets[pagelet] = asyncio.create_task(self.__open_pagelet(pagelet))
+        await task
+    
+    async def __open_pagelet(self, pagelet: PageletName):
+        self.page.splash = ft.ProgressBar()
+        self.page.update()
+        try:
+            await self.store.ensure_loaded(getattr(self.pagelets.get_pagelet(pagelet), "required_collections", ()), Priority.INTERACTIVE, owner=self.page.session_id)
+            self.__opened_pagelets.add(pagelet)
+            await self.set_pagelet(pagelet)
+        except CollectionLoadError as e:
+            self.__opened_pagelets.discard(pagelet)
+            self.show_load_error(e)
+        except Exception as e:
+            self.__opened_pagelets.discard(pagelet)
+            LOGGER.error(f"Failed to open {pagelet}", exc_info=e)
+            self.page.open(
+                ft.SnackBar(
+                    content=ft.Text(f"Failed to load data: {type(e).__name__}: {e}", color=ft.Colors.BLACK),
+                    bgcolor=ft.Colors.RED_100
+                )
+            )
+        finally:
+            self.page.splash = None
+            self.page.update()
+    
+    async def set_pagelet(self, pagelet: PageletName):
+        if (set_tabbycat := getattr(self.pagelets.get_pagelet(pagelet), "set_tabbycat", None)) is None:
+            return
+        with get_metrics().timer("ui", f"{pagelet}.set_tabbycat"):
+            result = set_tabbycat()
+            if inspect.isawaitable(result):
+                await result
+    
+    def set_pagelets(self):
+        """Sets up the pagelets which have been opened with the current data"""
+        for pagelet in self.__opened_pagelets:
+            self.page.run_task(self.set_pagelet, pagelet)
+    
+    async def revalidate(self, names: list[str]):
+        """Reloads the stale collections in the background, the subscribed pagelets are notified by the store"""
+        LOGGER.info(f"Revalidating {', '.join(names)}")
+        results = await asyncio.gather(
+            *[self.store.refresh(name, Priority.BULK, owner=self.page.session_id) for name in names],
+            return_exceptions=True
+        )
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                LOGGER.warning(f"Failed to revalidate {name}", exc_info=result)
+    
+    async def reload_all(self):
+        """Forces a full reload of every collection of the shared store"""
+        try:
+            await self.store.load(full=True, owner=self.page.session_id)
+        except CollectionLoadError as e:
+            self.show_load_error(e)
+        self.set_pagelets()
+    
+    def show_load_error(self, e: CollectionLoadError):
+        """Shows the collections which failed to load, with an action to retry only those"""
+        for name, error in e.failed.items():
+            LOGGER.warning(f"Failed to load {name}", exc_info=error)
+        details = "; ".join(f"{name} ({type(error).__name__})" for name, error in sorted(e.failed.items()))
+        self.page.open(
+            ft.SnackBar(
+                content=ft.Text(f"Failed to load {details}. Pages using other data still work.", color=ft.Colors.BLACK),
+                bgcolor=ft.Colors.RED_100,
+                action="Retry",
+                on_action=self.on_retry_failed,
+                duration=15000
+            )
+        )
+    
+    async def on_retry_failed(self, e):
+        self.page.splash = ft.ProgressBar()
+        self.page.update()
+        try:
+            await self.store.retry_failed(Priority.INTERACTIVE, owner=self.page.session_id)
+        except CollectionLoadError as err:
+            self.show_load_error(err)
+            return
+        finally:
+            self.page.splash = None
+            self.page.update()
+        # Set up the current page if it could not be opened, and refresh the opened ones with the recovered data
+        self.set_pagelets()
+        if (route := ROUTES.get(self.page.route)) is not None and route[1] != "diagnostics" and route[1] not in self.__opened_pagelets:
+            await self.open_pagelet(route[1])
+    
+    def publish(self, topic: str, payload: Any = None):
+        """Notifies the other sessions attached to the store of a change"""
+        self.store.publish(topic, payload, source=self.page.session_id)
+    
+    async def request[T](self, factory: Callable[[], Awaitable[T]], priority: Priority = Priority.NORMAL, label: str = "", retry: bool = True) -> T:
+        """Runs a Tabbycat API request through the scheduler of the Tabbycat instance.
+
+        Args:
+            factory (Callable[[], Awaitable[T]]): Function creating the request coroutine
+            priority (Priority, optional): Priority of the request. Defaults to Priority.NORMAL.
+            label (str, optional): Label for logging. Defaults to "".
+            retry (bool, optional): Whether to retry on 429/5xx. Defaults to True.
+        """
+        return await self.store.scheduler.submit(
+            factory,
+            priority=priority,
+            owner=self.page.session_id,
+            label=label,
+            retry=retry
+        )
+    
+    async def create[T](self, obj: T) -> T:
+        """Creates an object in the tournament through the scheduler, without retrying"""
+        return await self.request(partial(self.tournament.create, obj), label=f"create {type(obj).__name__}", retry=False)
     
     async def run_task[T](self, key: str, coro: Awaitable, rerun: bool = True, *, args = None, kwargs = None) -> T:
         """Runs a task and returns the result. Prevents multiple tasks from running at the same time.
@@ -380,41 +652,61 @@ class TabbycatApp:
         self.__tasks[key] = task
         return await future
     
+    async def load_collections(self, names: Iterable[str], priority: Priority = Priority.NORMAL):
+        await asyncio.gather(*[self.update_collection(name, priority) for name in names])
+    
+    async def update_collection(self, name: str, priority: Priority = Priority.NORMAL):
+        """Reloads a collection of the shared store and notifies the other sessions"""
+        await self.store.refresh(name, priority, owner=self.page.session_id, source=self.page.session_id)
+    
     async def update_institutions(self):
-        await self.run_task("update_institutions", self.institutions.load(force=True))
+        await self.update_collection("institutions")
     
     async def update_teams(self):
-        await self.run_task("update_teams", self.tournament._links.teams.load(force=True))
+        await self.update_collection("teams")
     
     async def update_break_categories(self):
-        await self.run_task("update_break_categories", self.tournament._links.break_categories.load(force=True))
+        await self.update_collection("break_categories")
     
     async def update_speakers(self):
-        await self.run_task("update_speakers", self.tournament._links.speakers.load(force=True))
+        await self.update_collection("speakers")
     
     async def update_speaker_categories(self):
-        await self.run_task("update_speaker_categories", self.tournament._links.speaker_categories.load(force=True))
+        await self.update_collection("speaker_categories")
     
     async def update_adjudicators(self):
-        await self.run_task("update_adjudicators", self.tournament._links.adjudicators.load(force=True))
+        await self.update_collection("adjudicators")
     
     async def update_rounds(self):
-        await self.run_task("update_rounds", self.tournament._links.rounds.load(force=True))
+        await self.update_collection("rounds")
     
     async def update_motions(self):
-        await self.run_task("update_motions", self.tournament._links.motions.load(force=True))
+        await self.update_collection("motions")
     
     async def update_venues(self):
-        await self.run_task("update_venues", self.tournament._links.venues.load(force=True))
+        await self.update_collection("venues")
     
     async def update_venue_categories(self):
-        await self.run_task("update_venue_categories", self.tournament._links.venue_categories.load(force=True))
+        await self.update_collection("venue_categories")
     
     async def update_feedback_questions(self):
-        await self.run_task("update_feedback_questions", self.tournament._links.feedback_questions.load(force=True))
+        await self.update_collection("feedback_questions")
+    
+    async def update_feedback(self, full: bool = False, priority: Priority = Priority.NORMAL) -> FeedbackDelta:
+        """Reloads the feedback, keeping the objects of unchanged feedback, and returns what changed"""
+        return await self.store.sync_feedback(full, priority, owner=self.page.session_id, source=self.page.session_id)
     
-    async def update_feedback(self):
-        await self.run_task("update_feedback_responses", self.tournament._links.feedback.load(force=True))
+    async def load_pairings(self, rounds: Iterable[tc.models.Round], priority: Priority = Priority.NORMAL):
+        """Reloads the pairings of the rounds, joining the reloads already in progress"""
+        await asyncio.gather(
+            *[self.store.load_pairings(round, priority, owner=self.page.session_id) for round in rounds]
+        )
+    
+    async def load_ballots(self, rounds: Iterable[tc.models.Round], full: bool = False, priority: Priority = Priority.NORMAL):
+        """Loads the ballots of the debates of the rounds, skipping the debates whose settled result did not change since their recent load"""
+        await asyncio.gather(
+            *[self.store.load_ballots(round, full, priority, owner=self.page.session_id) for round in rounds]
+        )
     
     async def update_preferences(self):
-        await self.run_task("update_preferences", self.tournament._links.preferences.load(force=True))
\ No newline at end of file
+        await self.update_collection("preferences")
\ No newline at end of file
@@ -0,0 +1,114 @@
+from dataclasses import dataclass, field
+import logging
+from typing import Any, Hashable, Literal
+
+import tabbycat_api as tc
+from .poller import ballot_signature
+from .verification import get_name, get_url
+
+LOGGER = logging.getLogger(__name__)
+# rank: ballots disagree on the result, speaker: ballots disagree on the speakers or a speaker is not in the team,
+# outlier: a score is out of the allowed range, side: a team is on a different side than in the draw
+BallotFlagKind = Literal["rank", "speaker", "outlier", "side"]
+
+@dataclass(frozen=True)
+class ScoreRules:
+    """Scoring rules of the tournament needed to check the speeches"""
+    score_min: float
+    score_max: float
+    reply_score_min: float
+    reply_score_max: float
+    speakers_in_team: int
+
+@dataclass
+class BallotFlag:
+    kind: BallotFlagKind
+    message: str
+
+@dataclass
+class BallotAnalysis:
+    """Discrepancies found between the ballots of a debate"""
+    flags: list[BallotFlag] = field(default_factory=list)
+    
+    def __bool__(self) -> bool:
+        return bool(self.flags)
+    
+    @property
+    def message(self) -> str:
+        return "\n".join(flag.message for flag in self.flags)
+
+def ballot_name(ballot: tc.models.Ballot) -> str:
+    return f"Ver. {getattr(ballot, 'version', None) or '?'}{' (confirmed)' if ballot.confirmed else ''}"
+
+def sheet_ranking(sheet: Any) -> tuple:
+    """Get the result of a sheet as (side, points or win) pairs, comparable across ballots"""
+    return tuple(sorted((team.side, points if (points := getattr(team, "points", None)) is not None else getattr(team, "win", None)) for team in sheet.teams))
+
+def sheet_speakers(sheet: Any) -> dict[str, tuple]:
+    return {team.side: tuple(get_url(speech.speaker) for speech in team.speeches or ()) for team in sheet.teams}
+
+def analyze_pairing(pairing: tc.models.RoundPairing, rules: ScoreRules) -> BallotAnalysis:
+    """Compares the ballots of a debate which are not discarded with each other and with the draw in a single pass over their sheets"""
+    analysis = BallotAnalysis()
+    ballots = [ballot for ballot in pairing._links.ballots if not ballot.discarded and ballot.result is not None]
+    draw = {dt.side: dt.team for dt in pairing.teams}
+    members = {
+        dt.side: {get_url(speaker) for speaker in speakers}
+        for dt in pairing.teams
+        if (speakers := getattr(dt.team, "speakers", None))
+    }
+    rankings: dict[tuple, list[tc.models.Ballot]] = {}
+    speakers: dict[tuple, list[tc.models.Ballot]] = {}
+    for ballot in ballots:
+        sheets = ballot.result.sheets or ()
+        rankings.setdefault(tuple(sheet_ranking(sheet) for sheet in sheets), []).append(ballot)
+        if sheets:
+            # Every sheet of a voting ballot has the same speakers, the first one stands for the ballot
+            speakers.setdefault(tuple(sorted(sheet_speakers(sheets[0]).items())), []).append(ballot)
+        for i, sheet in enumerate(sheets):
+            for team in sheet.teams:
+                expected = draw.get(team.side)
+                if expected is None:
+                    analysis.flags.append(BallotFlag("side", f"{ballot_name(ballot)}: side {team.side} is not in the draw"))
+                elif team.team is not None and get_url(team.team) != get_url(expected):
+                    analysis.flags.append(BallotFlag("side", f"{ballot_name(ballot)}: {get_name(team.team, 'short_name')} on {team.side}, the draw has {get_name(expected, 'short_name')}"))
+                for position, speech in enumerate(team.speeches or ()):
+                    is_reply = position >= rules.speakers_in_team
+                    low, high = (rules.reply_score_min, rules.reply_score_max) if is_reply else (rules.score_min, rules.score_max)
+                    if speech.score is not None and not low <= speech.score <= high:
+                        analysis.flags.append(BallotFlag("outlier", f"{ballot_name(ballot)}: {get_name(speech.speaker)} scored {speech.score}{' (reply)' if is_reply else ''}, outside {low}-{high}"))
+                    if i == 0 and team.side in members and get_url(speech.speaker) not in members[team.side]:
+                        analysis.flags.append(BallotFlag("speaker", f"{ballot_name(ballot)}: {get_name(speech.speaker)} is not a speaker of {get_name(draw[team.side], 'short_name')}"))
+    if len(rankings) > 1:
+        analysis.flags.append(BallotFlag("rank", "Ballots disagree on the result: " + " / ".join(", ".join(ballot_name(b) for b in group) for group in rankings.values())))
+    if len(speakers) > 1:
+        analysis.flags.append(BallotFlag("speaker", "Ballots disagree on the speakers: " + " / ".join(", ".join(ballot_name(b) for b in group) for group in speakers.values())))
+    return analysis
+
+class BallotAnalyzer:
+    """Memoizes the ballot analysis of each pairing until its ballots or the rules change"""
+    __results: dict[str, tuple[Hashable, BallotAnalysis]]
+    
+    def __init__(self):
+        self.__results = {}
+    
+    def analyze(self, pairing: tc.models.RoundPairing, rules: ScoreRules) -> BallotAnalysis:
+        fingerprint = (
+            rules,
+            tuple((get_url(dt.team), dt.side) for dt in pairing.teams),
+            tuple(ballot_signature(ballot) for ballot in pairing._links.ballots),
+        )
+        cached = self.__results.get(pairing.url)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        analysis = analyze_pairing(pairing, rules)
+        self.__results[pairing.url] = (fingerprint, analysis)
+        return analysis
+    
+    def analyze_round(self, round: tc.models.Round, rules: ScoreRules) -> dict[str, BallotAnalysis]:
+        """Analyzes every debate of a round, returns the analyses with flags by pairing URL"""
+        results = {pairing.url: self.analyze(pairing, rules) for pairing in round._links.pairing or ()}
+        return {url: analysis for url, analysis in results.items() if analysis}
+    
+    def clear(self):
+        self.__results.clear()
\ No newline at end of file
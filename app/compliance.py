@@ -0,0 +1,223 @@
+from dataclasses import dataclass
+import logging
+import numpy as np
+from typing import Any, Hashable, Iterable, Literal, Optional
+
+import tabbycat_api as tc
+from .feedback import feedback_signature
+from .verification import FEEDBACK_PATHS, POSITION_INDEX, AdjFeedbackDirection, TeamFeedbackDirection, get_panel, get_url
+
+LOGGER = logging.getLogger(__name__)
+ParticipantKind = Literal["team", "adjudicator"]
+KIND_TEAM = 0
+KIND_ADJUDICATOR = 1
+
+@dataclass
+class ComplianceMatrix:
+    """Feedback owed and submitted by every participant in every round, as (participants, rounds) arrays"""
+    rounds: list[tc.models.Round]
+    participants: list[Any]
+    # KIND_TEAM or KIND_ADJUDICATOR per participant
+    kinds: np.ndarray
+    required: np.ndarray
+    submitted: np.ndarray
+    extra: np.ndarray
+    # Number of debates and of debates with a confirmed ballot per round
+    debates: np.ndarray
+    confirmed_debates: np.ndarray
+    
+    @property
+    def missing(self) -> np.ndarray:
+        return self.required - self.submitted
+    
+    def missing_by_round(self) -> dict[str, int]:
+        """Number of missing feedback per round URL"""
+        return {round.url: int(n) for round, n in zip(self.rounds, self.missing.sum(axis=0))}
+    
+    def totals(self) -> dict[str, int]:
+        return {
+            "required": int(self.required.sum()),
+            "submitted": int(self.submitted.sum()),
+            "missing": int(self.missing.sum()),
+            "extra": int(self.extra.sum()),
+            "debates": int(self.debates.sum()),
+            "confirmed_debates": int(self.confirmed_debates.sum()),
+        }
+    
+    def rows(self, kind: Optional[ParticipantKind] = None, only_missing: bool = False) -> list[int]:
+        """Get the participant indexes, sorted by the number of missing feedback"""
+        mask = np.ones(len(self.participants), dtype=bool)
+        if kind is not None:
+            mask &= self.kinds == (KIND_TEAM if kind == "team" else KIND_ADJUDICATOR)
+        missing = self.missing.sum(axis=1)
+        if only_missing:
+            mask &= (missing > 0) | (self.extra.sum(axis=1) > 0)
+        indexes = np.flatnonzero(mask)
+        return indexes[np.argsort(-missing[indexes], kind="stable")].tolist()
+
+def get_directions(round: tc.models.Round, team_direction: TeamFeedbackDirection, adj_direction: AdjFeedbackDirection) -> tuple[TeamFeedbackDirection, AdjFeedbackDirection]:
+    """Get the feedback rules applying to a round, no feedback from teams in silent rounds and no feedback at all in outrounds"""
+    return (
+        "no-one" if round.silent or round.stage == "E" else team_direction,
+        "no-adjs" if round.stage == "E" else adj_direction,
+    )
+
+def build_compliance(
+    rounds: Iterable[tc.models.Round],
+    feedbacks: Iterable[tc.models.Feedback],
+    team_direction: TeamFeedbackDirection,
+    adj_direction: AdjFeedbackDirection
+) -> ComplianceMatrix:
+    """Builds the required feedback of every pairing from the feedback rules and matches it with the confirmed feedback in one vectorized pass.
+    
+    Feedback from teams under the orallist rule is owed to whichever adjudicator gave the oral adjudication, so it is matched on the debate and the team only.
+    The missing and extra feedback of a debate are the same as those of `verify_pairing`; teams naming different orallists are only reported by the verification.
+    
+    Args:
+        rounds (Iterable[tc.models.Round]): Rounds with their pairings loaded
+        feedbacks (Iterable[tc.models.Feedback]): Feedback of the tournament
+        team_direction (TeamFeedbackDirection): Feedback required from teams (feedback__feedback_from_teams)
+        adj_direction (AdjFeedbackDirection): Feedback required between adjudicators (feedback__feedback_paths)
+    """
+    rounds = list(rounds)
+    participants: list[Any] = []
+    kinds: list[int] = []
+    index: dict[str, int] = {}
+    def participant(obj: Any, kind: int) -> int:
+        url = get_url(obj)
+        if url not in index:
+            index[url] = len(participants)
+            participants.append(obj)
+            kinds.append(kind)
+        return index[url]
+    # Obligations as parallel lists of (round, debate, source, target); target 0 is "the orallist", participants are shifted by 1
+    ob_round: list[int] = []
+    ob_debate: list[int] = []
+    ob_source: list[int] = []
+    ob_target: list[int] = []
+    def oblige(r: int, d: int, source: int, target: int):
+        ob_round.append(r)
+        ob_debate.append(d)
+        ob_source.append(source)
+        ob_target.append(target)
+    debates: dict[str, tuple[int, int]] = {}
+    orallist_rounds: set[int] = set()
+    num_debates = np.zeros(len(rounds), dtype=np.int32)
+    confirmed_debates = np.zeros(len(rounds), dtype=np.int32)
+    for r, round in enumerate(rounds):
+        fb_team, fb_adj = get_directions(round, team_direction, adj_direction)
+        if fb_adj not in FEEDBACK_PATHS:
+            raise ValueError(f"Invalid feedback path: {fb_adj}")
+        if fb_team == "orallist":
+            orallist_rounds.add(r)
+        is_necessary = FEEDBACK_PATHS[fb_adj]
+        for pairing in round._links.pairing or ():
+            d = len(debates)
+            debates[pairing.url] = (r, d)
+            num_debates[r] += 1
+            confirmed_debates[r] += pairing.result_status == "C"
+            panel = [(position, participant(adj, KIND_ADJUDICATOR)) for position, adj in get_panel(pairing)]
+            for dt in pairing.teams:
+                team = participant(dt.team, KIND_TEAM)
+                if fb_team == "orallist":
+                    oblige(r, d, team, 0)
+                elif fb_team == "all-adjs":
+                    for _, adj in panel:
+                        oblige(r, d, team, adj + 1)
+            for p_src, src in panel:
+                for p_dest, dest in panel:
+                    if src != dest and is_necessary[POSITION_INDEX[p_src]][POSITION_INDEX[p_dest]]:
+                        oblige(r, d, src, dest + 1)
+    # Confirmed feedback of the known debates
+    fb_round: list[int] = []
+    fb_debate: list[int] = []
+    fb_source: list[int] = []
+    fb_target: list[int] = []
+    for fb in feedbacks:
+        if not fb.confirmed or (debate := debates.get(get_url(getattr(fb, "debate", None)))) is None:
+            continue
+        r, d = debate
+        is_team = isinstance(fb.source, tc.models.Team)
+        fb_round.append(r)
+        fb_debate.append(d)
+        fb_source.append(participant(fb.source, KIND_TEAM if is_team else KIND_ADJUDICATOR))
+        fb_target.append(0 if is_team and r in orallist_rounds else participant(fb.adjudicator, KIND_ADJUDICATOR) + 1)
+    shape = (len(participants), len(rounds))
+    n = len(participants) + 1
+    ob_round_a, ob_source_a = np.array(ob_round, dtype=np.int64), np.array(ob_source, dtype=np.int64)
+    fb_round_a, fb_source_a = np.array(fb_round, dtype=np.int64), np.array(fb_source, dtype=np.int64)
+    ob_keys = (np.array(ob_debate, dtype=np.int64) * n + ob_source_a) * n + np.array(ob_target, dtype=np.int64)
+    fb_keys = (np.array(fb_debate, dtype=np.int64) * n + fb_source_a) * n + np.array(fb_target, dtype=np.int64)
+    # Feedback on an obligation fulfils it once, any other feedback is extra
+    _, first = np.unique(fb_keys, return_index=True)
+    duplicate = np.ones(len(fb_keys), dtype=bool)
+    duplicate[first] = False
+    is_extra = duplicate | ~np.isin(fb_keys, ob_keys)
+    is_submitted = np.isin(ob_keys, fb_keys)
+    required = np.zeros(shape, dtype=np.int32)
+    submitted = np.zeros(shape, dtype=np.int32)
+    extra = np.zeros(shape, dtype=np.int32)
+    np.add.at(required, (ob_source_a, ob_round_a), 1)
+    np.add.at(submitted, (ob_source_a[is_submitted], ob_round_a[is_submitted]), 1)
+    np.add.at(extra, (fb_source_a[is_extra], fb_round_a[is_extra]), 1)
+    return ComplianceMatrix(
+        rounds,
+        participants,
+        np.array(kinds, dtype=np.int8),
+        required,
+        submitted,
+        extra,
+        num_debates,
+        confirmed_debates
+    )
+
+def compliance_fingerprint(
+    rounds: list[tc.models.Round],
+    feedbacks: Iterable[tc.models.Feedback],
+    team_direction: TeamFeedbackDirection,
+    adj_direction: AdjFeedbackDirection
+) -> Hashable:
+    """Get a value which changes whenever an input of `build_compliance` changes"""
+    return (
+        team_direction,
+        adj_direction,
+        tuple(
+            (
+                round.url,
+                round.silent,
+                round.stage,
+                tuple(
+                    (
+                        pairing.url,
+                        pairing.result_status,
+                        tuple((position, get_url(adj)) for position, adj in get_panel(pairing)),
+                        tuple(get_url(dt.team) for dt in pairing.teams),
+                    ) for pairing in round._links.pairing or ()
+                ),
+            ) for round in rounds
+        ),
+        frozenset((fb.url, feedback_signature(fb)) for fb in feedbacks),
+    )
+
+class ComplianceEngine:
+    """Memoizes the compliance matrix of a tournament until its pairings, feedback or rules change"""
+    __result: Optional[tuple[Hashable, ComplianceMatrix]] = None
+    
+    def build(
+        self,
+        rounds: Iterable[tc.models.Round],
+        feedbacks: Iterable[tc.models.Feedback],
+        team_direction: TeamFeedbackDirection,
+        adj_direction: AdjFeedbackDirection
+    ) -> ComplianceMatrix:
+        """Builds the compliance matrix, reusing the previous one if none of its inputs changed"""
+        rounds, feedbacks = list(rounds), list(feedbacks)
+        fingerprint = compliance_fingerprint(rounds, feedbacks, team_direction, adj_direction)
+        if self.__result is not None and self.__result[0] == fingerprint:
+            return self.__result[1]
+        matrix = build_compliance(rounds, feedbacks, team_direction, adj_direction)
+        self.__result = (fingerprint, matrix)
+        return matrix
+    
+    def clear(self):
+        self.__result = None
\ No newline at end of file
@@ -7,5 +7,7 @@ from .import_adj import AdjudicatorImporterPagelet
 from .round_status import RoundStatusPagelet
 from .manage_logo import LogoManagerPagelet
 from .generate_slides import SlideGeneratorPagelet
+from .compliance import ComplianceSummaryPagelet
+from .diagnostics import DiagnosticsPagelet
 
-__all__ = ["MyAppBar", "MyBottomAppBar", "MyNavDrawer", "TabbycatAuthPagelet", "TeamImporterPagelet", "AdjudicatorImporterPagelet", "RoundStatusPagelet", "LogoManagerPagelet", "SlideGeneratorPagelet"]
\ No newline at end of file
+__all__ = ["MyAppBar", "MyBottomAppBar", "MyNavDrawer", "TabbycatAuthPagelet", "TeamImporterPagelet", "AdjudicatorImporterPagelet", "RoundStatusPagelet", "LogoManagerPagelet", "SlideGeneratorPagelet", "ComplianceSummaryPagelet", "DiagnosticsPagelet"]
\ No newline at end of file
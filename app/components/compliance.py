@@ -0,0 +1,140 @@
+import asyncio
+import flet as ft
+import logging
+from typing import Any, Optional
+from ..base import AppControl, try_string, wait_finish
+from ..compliance import KIND_TEAM, ComplianceMatrix, ParticipantKind
+from ..scheduler import Priority
+
+LOGGER = logging.getLogger(__name__)
+
+class ComplianceDataRow(ft.DataRow):
+    def __init__(self, matrix: ComplianceMatrix, i: int):
+        participant = matrix.participants[i]
+        is_team = matrix.kinds[i] == KIND_TEAM
+        cells = [
+            ft.DataCell(ft.Text(try_string(lambda: participant.short_name if is_team else participant.name))),
+            ft.DataCell(ft.Text("Team" if is_team else "Adjudicator")),
+        ]
+        for r in range(len(matrix.rounds)):
+            required, missing, extra = int(matrix.required[i, r]), int(matrix.missing[i, r]), int(matrix.extra[i, r])
+            text = f"{required - missing}/{required}" if required else "-"
+            if extra:
+                text += f" (+{extra})"
+            cells.append(
+                ft.DataCell(
+                    ft.Text(
+                        text,
+                        color=ft.Colors.RED_ACCENT_700 if missing else ft.Colors.AMBER_800 if extra else None
+                    )
+                )
+            )
+        cells.append(ft.DataCell(ft.Text(str(int(matrix.missing[i].sum())))))
+        cells.append(ft.DataCell(ft.Text(str(int(matrix.extra[i].sum())))))
+        super().__init__(cells)
+
+class ComplianceSummaryPagelet(ft.Pagelet, AppControl):
+    """Tournament-wide view of the feedback owed by each team and adjudicator in each round"""
+    required_collections = ("teams", "adjudicators", "rounds", "feedback", "preferences")
+    topics = ("rounds", "feedback", "round_status")
+    matrix: Optional[ComplianceMatrix] = None
+    
+    def __init__(self):
+        self.text_totals = ft.Text()
+        self.dropdown_kind = ft.Dropdown(
+            label="Participants",
+            options=[
+                ft.DropdownOption(key="all", text="All"),
+                ft.DropdownOption(key="team", text="Teams"),
+                ft.DropdownOption(key="adjudicator", text="Adjudicators"),
+            ],
+            value="all",
+            on_change=self.on_change_filter,
+            width=200
+        )
+        self.switch_missing = ft.Switch(
+            label="Only with missing or extra feedback",
+            value=True,
+            on_change=self.on_change_filter
+        )
+        self.data_table = ft.DataTable(
+            columns=[ft.DataColumn(ft.Text("Name"))],
+            expand=True
+        )
+        super().__init__(
+            ft.Column(
+                [
+                    ft.Row(
+                        [
+                            ft.ElevatedButton(
+                                "Update",
+                                icon=ft.Icons.SYNC,
+                                on_click=self.on_btn_update
+                            ),
+                            self.dropdown_kind,
+                            self.switch_missing,
+                        ]
+                    ),
+                    self.text_totals,
+                    ft.Row([self.data_table], scroll=ft.ScrollMode.AUTO),
+                ],
+                expand=True,
+                scroll=ft.ScrollMode.AUTO
+            ),
+            expand=True
+        )
+    
+    async def set_tabbycat(self):
+        await asyncio.gather(
+            *[self.app.request(round._links.pairing.load, Priority.BULK, label="pairings") for round in self.app.tournament._links.rounds],
+        )
+        self.set_matrix()
+    
+    def set_matrix(self):
+        self.matrix = self.app.compliance()
+        totals = self.matrix.totals()
+        self.text_totals.value = (
+            f"Feedback: {totals['submitted']}/{totals['required']} submitted, {totals['missing']} missing, {totals['extra']} extra. "
+            f"Ballots: {totals['confirmed_debates']}/{totals['debates']} confirmed."
+        )
+        self.set_rows()
+    
+    def set_rows(self):
+        if self.matrix is None:
+            return
+        kind: Optional[ParticipantKind] = None if self.dropdown_kind.value == "all" else self.dropdown_kind.value
+        missing_by_round = self.matrix.missing.sum(axis=0)
+        self.data_table.columns = [
+            ft.DataColumn(ft.Text("Name")),
+            ft.DataColumn(ft.Text("Type")),
+            *[
+                ft.DataColumn(
+                    ft.Text(try_string(lambda: round.abbreviation)),
+                    tooltip=f"{try_string(lambda: round.name)}: {int(n)} missing",
+                    numeric=True
+                ) for round, n in zip(self.matrix.rounds, missing_by_round)
+            ],
+            ft.DataColumn(ft.Text("Missing"), numeric=True),
+            ft.DataColumn(ft.Text("Extra"), numeric=True),
+        ]
+        self.data_table.rows = [
+            ComplianceDataRow(self.matrix, i) for i in self.matrix.rows(kind, self.switch_missing.value)
+        ]
+        self.update()
+    
+    async def on_store_change(self, topic: str, payload: Any):
+        if topic == "rounds":
+            await self.set_tabbycat()
+        else:
+            self.set_matrix()
+    
+    def on_change_filter(self, e):
+        self.set_rows()
+    
+    @wait_finish
+    async def on_btn_update(self, e):
+        await asyncio.gather(
+            self.app.update_feedback(priority=Priority.INTERACTIVE),
+            self.app.load_pairings(self.app.tournament._links.rounds, Priority.INTERACTIVE)
+        )
+        self.set_matrix()
\ No newline at end of file
@@ -0,0 +1,164 @@
+import asyncio
+import flet as ft
+import hmac
+import logging
+import os
+import time
+from ..base import AppControl, wait_finish
+from ..exceptions import ExpectedError
+from ..metrics import EndpointStats, get_metrics
+from ..store import TournamentStore
+
+LOGGER = logging.getLogger(__name__)
+ADMIN_SECRET = os.getenv("ADMIN_SECRET")
+
+def format_bytes(size: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+def format_seconds(seconds: float) -> str:
+    return f"{seconds * 1000:.0f} ms" if seconds < 1 else f"{seconds:.2f} s"
+
+class EndpointDataRow(ft.DataRow):
+    def __init__(self, service: str, endpoint: str, stats: EndpointStats):
+        statuses = ", ".join(f"{status}: {count}" for status, count in sorted(stats.statuses.items()))
+        super().__init__(
+            [
+                ft.DataCell(ft.Text(service)),
+                ft.DataCell(ft.Text(endpoint, tooltip=statuses or None)),
+                ft.DataCell(ft.Text(str(stats.calls))),
+                ft.DataCell(ft.Text(str(stats.errors), color=ft.Colors.RED if stats.errors else None)),
+                ft.DataCell(ft.Text(str(stats.retries))),
+                ft.DataCell(ft.Text(format_seconds(stats.latency_sum))),
+                ft.DataCell(ft.Text(format_seconds(stats.latency_mean))),
+                ft.DataCell(ft.Text(format_seconds(stats.quantile(0.5)))),
+                ft.DataCell(ft.Text(format_seconds(stats.quantile(0.95)))),
+                ft.DataCell(ft.Text(format_seconds(stats.latency_max))),
+                ft.DataCell(ft.Text(format_bytes(stats.bytes))),
+            ]
+        )
+
+def describe_store(store: TournamentStore) -> str:
+    return f"{store.tournament.name}: {len(store.sessions)} sessions, {store.poller.watchers} watching live every {store.poller.interval:.0f}s, {store.scheduler.in_flight} in flight, {store.scheduler.queued} queued, loaded {', '.join(sorted(store.loaded_collections)) or '-'}, failed {', '.join(sorted(store.failed_collections)) or '-'}"
+
+class DiagnosticsPagelet(ft.Pagelet, AppControl):
+    """The tournament store of the session, and the per-endpoint call counts, latencies and errors of the whole process.
+    
+    The process-wide metrics are only shown once unlocked with the ADMIN_SECRET environment variable, and never if it is not set.
+    """
+    unlocked: bool = False
+    
+    def __init__(self):
+        self.text_summary = ft.Text()
+        self.text_stores = ft.Text(selectable=True)
+        self.field_secret = ft.TextField(
+            label="Admin secret",
+            password=True,
+            on_submit=self.on_btn_unlock,
+            width=300
+        )
+        self.row_unlock = ft.Row(
+            [
+                self.field_secret,
+                ft.ElevatedButton(
+                    "Unlock",
+                    icon=ft.Icons.LOCK_OPEN,
+                    on_click=self.on_btn_unlock
+                ),
+            ]
+        ) if ADMIN_SECRET else ft.Row([ft.Text("Set ADMIN_SECRET to show the metrics of the whole server.")])
+        self.data_table = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text("Service")),
+                ft.DataColumn(ft.Text("Endpoint")),
+                ft.DataColumn(ft.Text("Calls"), numeric=True),
+                ft.DataColumn(ft.Text("Errors"), numeric=True),
+                ft.DataColumn(ft.Text("Retries"), numeric=True),
+                ft.DataColumn(ft.Text("Total"), numeric=True),
+                ft.DataColumn(ft.Text("Mean"), numeric=True),
+                ft.DataColumn(ft.Text("p50", tooltip="Upper bound of the histogram bucket"), numeric=True),
+                ft.DataColumn(ft.Text("p95", tooltip="Upper bound of the histogram bucket"), numeric=True),
+                ft.DataColumn(ft.Text("Max"), numeric=True),
+                ft.DataColumn(ft.Text("Payload"), numeric=True),
+            ],
+            expand=True
+        )
+        self.column_metrics = ft.Column(
+            [
+                ft.Row(
+                    [
+                        ft.ElevatedButton(
+                            "Refresh",
+                            icon=ft.Icons.SYNC,
+                            on_click=self.on_btn_refresh
+                        ),
+                        ft.OutlinedButton(
+                            "Reset",
+                            icon=ft.Icons.DELETE_OUTLINE,
+                            on_click=self.on_btn_reset
+                        ),
+                        self.text_summary,
+                    ]
+                ),
+                ft.Row([self.data_table], scroll=ft.ScrollMode.AUTO),
+            ],
+            visible=False
+        )
+        super().__init__(
+            ft.Column(
+                [
+                    self.text_stores,
+                    self.row_unlock,
+                    self.column_metrics,
+                ],
+                expand=True,
+                scroll=ft.ScrollMode.AUTO
+            ),
+            expand=True
+        )
+    
+    def set_tabbycat(self):
+        self.set_metrics()
+    
+    def set_metrics(self):
+        # Only the store of this session, the other tournaments are not the business of its user
+        self.text_stores.value = describe_store(self.app.store) if self.app.store is not None else "No tournament loaded"
+        self.row_unlock.visible = not self.unlocked
+        self.column_metrics.visible = self.unlocked
+        if not self.unlocked:
+            self.update()
+            return
+        metrics = get_metrics()
+        snapshot = metrics.snapshot()
+        self.text_summary.value = f"Since {time.strftime('%Y/%m/%d %H:%M:%S', time.localtime(metrics.started_at))}, {sum(stats.calls for stats in snapshot.values())} calls"
+        # Sorted by the total time spent, so the endpoints where time goes come first
+        self.data_table.rows = [
+            EndpointDataRow(service, endpoint, stats)
+            for (service, endpoint), stats in sorted(snapshot.items(), key=lambda item: item[1].latency_sum, reverse=True)
+        ]
+        self.update()
+    
+    @wait_finish
+    async def on_btn_unlock(self, e):
+        if not ADMIN_SECRET or not hmac.compare_digest(self.field_secret.value.encode(), ADMIN_SECRET.encode()):
+            LOGGER.warning(f"Wrong admin secret from session {self.page.session_id}")
+            # Slows down guessing
+            await asyncio.sleep(1)
+            raise ExpectedError("Wrong admin secret")
+        self.field_secret.value = ""
+        self.unlocked = True
+        self.set_metrics()
+    
+    @wait_finish
+    def on_btn_refresh(self, e):
+        self.set_metrics()
+    
+    @wait_finish
+    def on_btn_reset(self, e):
+        if not self.unlocked:
+            raise ExpectedError("Unlock the diagnostics first")
+        get_metrics().reset()
+        self.set_metrics()
\ No newline at end of file
@@ -1,7 +1,6 @@
 import asyncio
 from dataclasses import dataclass, field
 import flet as ft
-from googleapiclient.discovery import build
 import logging
 import re
 from typing import Literal, Optional
@@ -9,9 +8,15 @@ from typing import Literal, Optional
 import tabbycat_api as tc
 from ...base import AppControl, wait_finish, try_string
 from ...exceptions import ExpectedError
-from ...utils import reversor, ordinal, rank_with_ties, SlideData, create_slides
+from ...google_api import execute_async
+from ...scheduler import Priority
+from ...slides import SlidePipeline
+from ...utils import reversor, ordinal, rank_with_ties, SlideData
 from ..editable_data_cell import EditableDataCell
 from ..google_picker import GoogleFilePicker, GoogleFilePickerResultEvent
+from .dialogs import prompt_slide_settings
+from .local_render import generate_pptx
+from .progress import run_slide_pipeline
 
 LOGGER = logging.getLogger(__name__)
 
@@ -104,6 +109,12 @@ class AdjudicatorTab(ft.Tab, AppControl):
                                 text="Generate",
                                 icon=ft.Icons.AUTO_AWESOME_MOTION,
                                 on_click=self.on_generate
+                            ),
+                            ft.ElevatedButton(
+                                text="Generate PPTX",
+                                icon=ft.Icons.SLIDESHOW,
+                                tooltip="Render the slides to a PowerPoint file from an uploaded template, without Google Slides",
+                                on_click=self.on_generate_pptx
                             )
                         ]
                     ),
@@ -138,8 +149,8 @@ class AdjudicatorTab(ft.Tab, AppControl):
     
     @wait_finish
     async def on_reload(self, e: ft.ControlEvent):
-        await self.app.tournament._links.adjudicators.load(force=True)
-        await self.app.update_feedback()
+        await self.app.update_collection("adjudicators", Priority.INTERACTIVE)
+        await self.app.update_feedback(priority=Priority.INTERACTIVE)
         self.calculate()
         self.calculate_title()
         self.update_table()
@@ -235,102 +246,18 @@ class AdjudicatorTab(ft.Tab, AppControl):
         )
         self.page.open(dlg)
     
-    @wait_finish
-    async def on_generate(self, e: ft.ControlEvent):
-        # Prompt the presentation file
-        future_file = asyncio.Future()
-        dlg_file = GoogleFilePicker(
-            ft.Text("Select a file to edit"),
-            mime_type=["application/vnd.google-apps.presentation"],
-            on_result=future_file.set_result,
-        )
-        if not self.page.auth:
-            raise ExpectedError("Not logged in to Google")
-        self.page.open(dlg_file)
-        result: GoogleFilePickerResultEvent = await future_file
-        if not result.data:
-            return
-        # Get further information
-        future_slide_prompt = asyncio.Future()
-        service = build("slides", "v1", credentials=self.app.oauth_credentials)
-        presentation = service.presentations().get(presentationId=result.data.get("id")).execute()
-        num_institutions: set[int] = {0}.union({len(self.app.logos.get_object_logo_urls(row.adjudicator_data.adjudicator)) for row in self.data_table.rows})
-        fields_slide_inst = {
-            num_inst: ft.TextField(
-                label=f"Slide for {num_inst} institutions",
-                value="1",
-                keyboard_type=ft.KeyboardType.NUMBER,
-                prefix_text="Slide #"
-            ) for num_inst in sorted(num_institutions)
-        }
-        field_slide_insert = ft.TextField(
-            label="Slide to insert after",
-            value=str(len(presentation.get("slides"))),
-            keyboard_type=ft.KeyboardType.NUMBER,
-        )
-        check_ascending = ft.Checkbox(
-            label="Ascending order (1st, 2nd, ...)",
-            value=True,
-        )
-        check_danger = ft.Checkbox(
-            label="Insert danger prevention slides",
-            value=True
-        )
-        @wait_finish
-        def on_confirm_create(e: ft.ControlEvent):
-            slides_institution: dict[int, str] = {}
-            for num_inst, field in fields_slide_inst.items():
-                if 1 <= int(field.value) <= len(presentation.get("slides")):
-                    slides_institution[num_inst] = presentation.get("slides")[int(field.value)-1].get("objectId")
-                else:
-                    raise ValueError(f"Invalid slide number for {num_inst} institutions: {field.value}")
-            if not (0 <= int(field_slide_insert.value) <= len(presentation.get("slides"))):
-                raise ValueError(f"Invalid slide number to insert after: {field_slide_insert.value}")
-            self.page.close(dlg_settings)
-            future_slide_prompt.set_result({
-                "institutions": slides_institution,
-                "insert_position": int(field_slide_insert.value),
-                "ascending": check_ascending.value,
-                "danger": check_danger.value
-            })
-        dlg_settings = ft.AlertDialog(
-            modal=True,
-            title=ft.Text("Select slides"),
-            content=ft.Column(
-                [
-                    ft.Text("After which slide should the slides be inserted? (0=before first)"),
-                    field_slide_insert,
-                    ft.Divider(),
-                    ft.Text("Select the slide template for each number of institution"),
-                    *fields_slide_inst.values(),
-                    ft.Divider(),
-                    check_ascending,
-                    check_danger
-                ],
-                tight=True
-            ),
-            actions=[
-                ft.TextButton(
-                    "Create",
-                    on_click=on_confirm_create
-                ),
-                ft.TextButton(
-                    "Cancel",
-                    on_click=lambda _: (future_slide_prompt.set_result(None), self.page.close(dlg_settings))
-                )
-            ]
-        )
-        self.page.open(dlg_settings)
-        result_settings = await future_slide_prompt
-        if result_settings is None:
-            return
-        # Create the slides
-        datas = list(data for data in self.get_data(ascending=result_settings["ascending"]) if data.title)
+    def num_institutions(self) -> set[int]:
+        """Numbers of institutions of the slides, each needing a template slide"""
+        return {0}.union({len(self.app.logos.get_object_logo_urls(row.adjudicator_data.adjudicator)) for row in self.data_table.rows})
+    
+    def get_slides(self, ascending: bool, danger: bool) -> list[SlideData]:
+        datas = list(data for data in self.get_data(ascending=ascending) if data.title)
         slides: list[SlideData] = []
-        for data in datas:
+        for i, data in enumerate(datas):
             duplicates = [d for d in datas if d.title == data.title]
             duplicate_title = f" ({duplicates.index(data)+1}/{len(duplicates)})" if len(duplicates) > 1 else ""
-            if result_settings["danger"]:
+            participant = try_string(lambda: data.adjudicator.url, f"redacted:{i}")
+            if danger:
                 slides.append(
                     {
                         "texts": {
@@ -338,7 +265,8 @@ class AdjudicatorTab(ft.Tab, AppControl):
                             "{{name}}": "",
                             "{{metrics}}": self.app.pagelets.pg_generate_slides.format_adjudicator_score(data.weighted_score),
                         },
-                        "images": set()
+                        "images": set(),
+                        "key": f"danger:{participant}"
                     }
                 )
             slides.append(
@@ -348,26 +276,60 @@ class AdjudicatorTab(ft.Tab, AppControl):
                         "{{name}}": try_string(lambda: data.adjudicator.name, "Redacted"),
                         "{{metrics}}": self.app.pagelets.pg_generate_slides.format_adjudicator_score(data.weighted_score),
                     },
-                    "images": self.app.logos.get_object_logo_urls(data.adjudicator)
+                    "images": self.app.logos.get_object_logo_urls(data.adjudicator),
+                    "key": f"award:{participant}"
                 }
             )
+        return slides
+    
+    @wait_finish
+    async def on_generate(self, e: ft.ControlEvent):
+        # Prompt the presentation file
+        future_file = asyncio.Future()
+        dlg_file = GoogleFilePicker(
+            ft.Text("Select a file to edit"),
+            mime_type=["application/vnd.google-apps.presentation"],
+            on_result=future_file.set_result,
+        )
+        if not self.page.auth:
+            raise ExpectedError("Not logged in to Google")
+        self.page.open(dlg_file)
+        result: GoogleFilePickerResultEvent = await future_file
+        if not result.data:
+            return
+        # Get further information
+        service = self.app.google_service("slides", "v1")
+        presentation = await execute_async(service.presentations().get(presentationId=result.data.get("id")))
+        settings = await prompt_slide_settings(self.page, len(presentation.get("slides")), self.num_institutions())
+        if settings is None:
+            return
+        # Create the slides
+        slides = self.get_slides(settings.ascending, settings.danger)
         LOGGER.info(f"Creating {len(slides)} speaker slides")
-        create_slides(
-            service,
-            presentation.get("presentationId"),
-            result_settings["institutions"],
-            slides,
-            result_settings["insert_position"],
-            len(presentation.get("slides")),
+        result_slides = await run_slide_pipeline(
+            self.page,
+            SlidePipeline(
+                service,
+                presentation.get("presentationId"),
+                {num_inst: presentation.get("slides")[i].get("objectId") for num_inst, i in settings.templates.items()},
+                slides,
+                settings.position,
+                len(presentation.get("slides")),
+                scope=f"adjudicators:{self.app.tournament.url}"
+            )
         )
-        LOGGER.info(f"Created {len(slides)} speaker slides")
+        LOGGER.info(f"Synchronized {len(slides)} adjudicator slides: {result_slides.created} created, {result_slides.kept} unchanged, {result_slides.deleted} deleted")
         self.page.open(
             ft.SnackBar(
-                ft.Text(f"Created {len(slides)} slides", color=ft.Colors.BLACK),
+                ft.Text(f"{result_slides.created} adjudicator slides created, {result_slides.kept} unchanged, {result_slides.deleted} deleted" + (f", {len(result_slides.skipped_images)} images could not be inserted" if result_slides.skipped_images else ""), color=ft.Colors.BLACK),
                 bgcolor=ft.Colors.GREEN_100
             )
         )
     
+    @wait_finish
+    async def on_generate_pptx(self, e: ft.ControlEvent):
+        await generate_pptx(self, "adjudicators", self.num_institutions(), self.get_slides)
+    
     def update_table(self):
         data_sorted = sorted(
             self.__data.values(),
@@ -387,7 +349,7 @@ class AdjudicatorTab(ft.Tab, AppControl):
     def calculate(self):
         adjudicators = self.app.tournament._links.adjudicators
         dict_data: dict[str, AdjudicatorData] = {adj._href: AdjudicatorData(adj) for adj in adjudicators}
-        for feedback in self.app.tournament._links.feedback:
+        for feedback in self.app.feedback_sync:
             if not feedback.adjudicator:
                 continue
             data = dict_data.get(feedback.adjudicator._href)
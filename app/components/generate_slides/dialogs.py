@@ -0,0 +1,90 @@
+import asyncio
+from dataclasses import dataclass
+import flet as ft
+from typing import Optional
+from ...base import wait_finish
+
+@dataclass
+class SlideSettings:
+    # Index of the template slide for each number of institutions, starting from 0
+    templates: dict[int, int]
+    position: int
+    ascending: bool
+    danger: bool
+
+async def prompt_slide_settings(page: ft.Page, num_slides: int, num_institutions: set[int]) -> Optional[SlideSettings]:
+    """Asks for the template slides, the position and the order of the slides to create
+    
+    Args:
+        page (ft.Page): Page to open the dialog on
+        num_slides (int): Number of slides in the presentation
+        num_institutions (set[int]): Numbers of institutions which need a template slide
+    
+    Returns:
+        Optional[SlideSettings]: The settings, None if cancelled
+    """
+    future_slide_prompt = asyncio.Future()
+    fields_slide_inst = {
+        num_inst: ft.TextField(
+            label=f"Slide for {num_inst} institutions",
+            value="1",
+            keyboard_type=ft.KeyboardType.NUMBER,
+            prefix_text="Slide #"
+        ) for num_inst in sorted(num_institutions)
+    }
+    field_slide_insert = ft.TextField(
+        label="Slide to insert after",
+        value=str(num_slides),
+        keyboard_type=ft.KeyboardType.NUMBER,
+    )
+    check_ascending = ft.Checkbox(
+        label="Ascending order (1st, 2nd, ...)",
+        value=True,
+    )
+    check_danger = ft.Checkbox(
+        label="Insert danger prevention slides",
+        value=True
+    )
+    @wait_finish
+    def on_confirm_create(e: ft.ControlEvent):
+        templates: dict[int, int] = {}
+        for num_inst, field in fields_slide_inst.items():
+            if 1 <= int(field.value) <= num_slides:
+                templates[num_inst] = int(field.value) - 1
+            else:
+                raise ValueError(f"Invalid slide number for {num_inst} institutions: {field.value}")
+        if not (0 <= int(field_slide_insert.value) <= num_slides):
+            raise ValueError(f"Invalid slide number to insert after: {field_slide_insert.value}")
+        page.close(dlg_settings)
+        future_slide_prompt.set_result(
+            SlideSettings(templates, int(field_slide_insert.value), check_ascending.value, check_danger.value)
+        )
+    dlg_settings = ft.AlertDialog(
+        modal=True,
+        title=ft.Text("Select slides"),
+        content=ft.Column(
+            [
+                ft.Text("After which slide should the slides be inserted? (0=before first)"),
+                field_slide_insert,
+                ft.Divider(),
+                ft.Text("Select the slide template for each number of institution"),
+                *fields_slide_inst.values(),
+                ft.Divider(),
+                check_ascending,
+                check_danger
+            ],
+            tight=True
+        ),
+        actions=[
+            ft.TextButton(
+                "Create",
+                on_click=on_confirm_create
+            ),
+            ft.TextButton(
+                "Cancel",
+                on_click=lambda _: (future_slide_prompt.set_result(None), page.close(dlg_settings))
+            )
+        ]
+    )
+    page.open(dlg_settings)
+    return await future_slide_prompt
\ No newline at end of file
@@ -50,6 +50,8 @@ class SlideGeneratorPagelet(ft.Pagelet, AppControl):
     dict_speaker_format: dict[SpeakerMetrics, str]
     num_speaker_metrics_include: int = 2
     adjudicator_format: str
+    required_collections = ("teams", "break_categories", "speakers", "speaker_categories", "adjudicators", "feedback", "preferences")
+    topics = ("break_categories", "speaker_categories", "preferences")
     
     def __init__(self):
         self.tabs = ft.Tabs(
@@ -105,7 +107,7 @@ class SlideGeneratorPagelet(ft.Pagelet, AppControl):
         )
     
     def set_tabbycat(self):
-        has_reply: bool = self.app.tournament._links.preferences.find(identifier="debate_rules__reply_scores_enabled").value
+        has_reply: bool = self.app.preference("debate_rules__reply_scores_enabled")
         tabs = [
             TeamTab(break_category)
             for break_category in self.app.tournament._links.break_categories
@@ -118,6 +120,9 @@ class SlideGeneratorPagelet(ft.Pagelet, AppControl):
         self.tabs.tabs = tabs
         self.update()
     
+    def on_store_change(self, topic: str, payload: Any):
+        self.set_tabbycat()
+    
     def format_team_metrics(self, num_metrics: int, standing: tc.models.TeamStanding) -> str:
         def format_metric(metric: tc.models.TeamStandingMetric) -> Optional[str]:
             if metric.value is None or metric.value is tc.NULL:
@@ -150,8 +155,8 @@ class SlideGeneratorPagelet(ft.Pagelet, AppControl):
     
     @wait_finish
     def on_change_metric(self, e: ft.ControlEvent):
-        team_metrics: list[TeamMetrics] = self.app.tournament._links.preferences.find(identifier="standings__team_standings_precedence").value
-        speaker_metrics: list[SpeakerMetrics] = self.app.tournament._links.preferences.find(identifier="standings__speaker_standings_precedence").value
+        team_metrics: list[TeamMetrics] = self.app.preference("standings__team_standings_precedence")
+        speaker_metrics: list[SpeakerMetrics] = self.app.preference("standings__speaker_standings_precedence")
         dropdown_team = ft.Dropdown(
             value=str(min(self.num_team_metrics_include, len(team_metrics))-1),
             options=[
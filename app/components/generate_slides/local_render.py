@@ -0,0 +1,95 @@
+import asyncio
+from datetime import datetime
+import flet as ft
+import logging
+import os
+import shutil
+from typing import Callable, Optional
+import uuid
+from ...base import AppControl
+from ...downloads import UPLOAD_DIR
+from ...exceptions import ExpectedError
+from ...pptx_renderer import PptxRenderer, count_slides
+from ...slides import SlideData
+from .dialogs import prompt_slide_settings
+from .progress import SlideProgressDialog
+
+LOGGER = logging.getLogger(__name__)
+
+async def upload_template(page: ft.Page) -> Optional[str]:
+    """Asks for a .pptx template and uploads it under a random directory of the uploads, returning its path or None if cancelled"""
+    future_pick = asyncio.Future()
+    future_upload = asyncio.Future()
+    def on_upload(e: ft.FilePickerUploadEvent):
+        if e.error and not future_upload.done():
+            future_upload.set_exception(ExpectedError(f"Upload of {e.file_name} failed: {e.error}"))
+        elif e.progress == 1.0 and not future_upload.done():
+            future_upload.set_result(e.file_name)
+    file_picker = ft.FilePicker(on_result=future_pick.set_result, on_upload=on_upload)
+    page.overlay.append(file_picker)
+    page.update()
+    try:
+        file_picker.pick_files(dialog_title="Select a template presentation", allowed_extensions=["pptx"])
+        result: ft.FilePickerResultEvent = await future_pick
+        if not result.files:
+            return None
+        file = result.files[0]
+        # Sessions uploading templates with the same name do not overwrite each other's
+        upload_name = f"{uuid.uuid4().hex}/{file.name}"
+        file_picker.upload([ft.FilePickerUploadFile(file.name, upload_url=page.get_upload_url(upload_name, 600))])
+        await future_upload
+        return os.path.join(UPLOAD_DIR, upload_name)
+    finally:
+        page.overlay.remove(file_picker)
+        page.update()
+
+async def generate_pptx(control: AppControl, name: str, num_institutions: set[int], get_slides: Callable[[bool, bool], list[SlideData]]):
+    """Renders the slides of a tab to a .pptx file from an uploaded template, and offers it for download.
+    
+    The template is deleted once rendered, and the presentation is served like the other downloads of the session.
+    
+    Args:
+        control (AppControl): Control running the generation
+        name (str): Name of the slides in the file name, e.g. "teams"
+        num_institutions (set[int]): Numbers of institutions which need a template slide
+        get_slides (Callable[[bool, bool], list[SlideData]]): Get the slides to render, in ascending order or not, with danger prevention slides or not
+    """
+    page = control.page
+    template_path = await upload_template(page)
+    if template_path is None:
+        return
+    try:
+        settings = await prompt_slide_settings(page, await asyncio.to_thread(count_slides, template_path), num_institutions)
+        if settings is None:
+            return
+        slides = get_slides(settings.ascending, settings.danger)
+        download = control.app.downloads.create(f"{control.app.tournament.slug}-{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.pptx")
+        dlg_progress = SlideProgressDialog(len(slides))
+        renderer = PptxRenderer(
+            template_path,
+            settings.templates,
+            slides,
+            settings.position,
+            image_cache=control.app.image_cache,
+            on_progress=dlg_progress.set_progress
+        )
+        LOGGER.info(f"Rendering {len(slides)} {name} slides to {download.file_name}")
+        page.open(dlg_progress)
+        try:
+            result = await renderer.render(download.path)
+        except BaseException:
+            control.app.downloads.discard(download)
+            raise
+        finally:
+            page.close(dlg_progress)
+    finally:
+        shutil.rmtree(os.path.dirname(template_path), ignore_errors=True)
+    url = control.app.downloads.publish(download)
+    page.open(
+        ft.SnackBar(
+            ft.Text(f"Rendered {result.created} {name} slides" + (f", {len(result.skipped_images)} images could not be inserted" if result.skipped_images else ""), color=ft.Colors.BLACK),
+            bgcolor=ft.Colors.GREEN_100,
+            action="Download",
+            on_action=lambda _: page.launch_url(url)
+        )
+    )
\ No newline at end of file
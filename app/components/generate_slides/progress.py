@@ -0,0 +1,39 @@
+import flet as ft
+import logging
+from ...slides import SlidePipeline, SlidePipelineResult, SlideProgress
+
+LOGGER = logging.getLogger(__name__)
+
+class SlideProgressDialog(ft.AlertDialog):
+    """Modal dialog showing the batches of a slide pipeline as they complete"""
+    def __init__(self, num_slides: int):
+        self.progress_bar = ft.ProgressBar(value=0, width=400)
+        self.text_progress = ft.Text(f"Creating {num_slides} slides...")
+        super().__init__(
+            modal=True,
+            title=ft.Text("Creating slides"),
+            content=ft.Column(
+                [
+                    self.progress_bar,
+                    self.text_progress
+                ],
+                tight=True
+            )
+        )
+    
+    def set_progress(self, progress: SlideProgress):
+        self.progress_bar.value = progress.batches_done / progress.batches_total
+        self.text_progress.value = f"Batch {progress.batches_done}/{progress.batches_total}: {progress.slides_done}/{progress.slides_total} slides"
+        if progress.images_skipped:
+            self.text_progress.value += f", {progress.images_skipped} images skipped"
+        self.update()
+
+async def run_slide_pipeline(page: ft.Page, pipeline: SlidePipeline) -> SlidePipelineResult:
+    """Runs a slide pipeline off the event loop, with its progress in a dialog"""
+    dlg_progress = SlideProgressDialog(len(pipeline.slides))
+    pipeline.on_progress = dlg_progress.set_progress
+    page.open(dlg_progress)
+    try:
+        return await pipeline.run_async()
+    finally:
+        page.close(dlg_progress)
\ No newline at end of file
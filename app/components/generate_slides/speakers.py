@@ -2,16 +2,22 @@ import asyncio
 from typing import Literal, Optional
 from dataclasses import dataclass, field
 import flet as ft
-from googleapiclient.discovery import build
+from functools import partial
 import logging
 import re
 
 import tabbycat_api as tc
 from ...base import AppControl, wait_finish, try_string
 from ...exceptions import ExpectedError
-from ...utils import ordinal, SlideData, create_slides, reversor
+from ...google_api import execute_async
+from ...scheduler import Priority
+from ...slides import SlidePipeline
+from ...utils import ordinal, SlideData, reversor
 from ..editable_data_cell import EditableDataCell
 from ..google_picker import GoogleFilePicker, GoogleFilePickerResultEvent
+from .dialogs import prompt_slide_settings
+from .local_render import generate_pptx
+from .progress import run_slide_pipeline
 
 LOGGER = logging.getLogger(__name__)
 
@@ -91,6 +97,12 @@ class SpeakerTab(ft.Tab, AppControl):
                                 text="Generate",
                                 icon=ft.Icons.AUTO_AWESOME_MOTION,
                                 on_click=self.on_generate
+                            ),
+                            ft.ElevatedButton(
+                                text="Generate PPTX",
+                                icon=ft.Icons.SLIDESHOW,
+                                tooltip="Render the slides to a PowerPoint file from an uploaded template, without Google Slides",
+                                on_click=self.on_generate_pptx
                             )
                         ]
                     ),
@@ -124,16 +136,16 @@ class SpeakerTab(ft.Tab, AppControl):
     
     async def on_mount(self):
         if not self.is_reply:
-            self.__standings = await self.app.tournament.get_speaker_standings(self.speaker_category)
+            self.__standings = await self.app.request(partial(self.app.tournament.get_speaker_standings, self.speaker_category), label="speaker_standings")
         else:
-            self.__standings = await self.app.tournament.get_reply_standings(self.speaker_category)
+            self.__standings = await self.app.request(partial(self.app.tournament.get_reply_standings, self.speaker_category), label="reply_standings")
         self.calculate()
         self.calculate_title("{} Best Reply Speaker" if self.is_reply else f"{try_string(lambda: self.speaker_category.name)} {{}} Best Speaker" if self.speaker_category else  "{} Best Speaker")
         self.update_table()
     
     @wait_finish
     async def on_reload(self, e: ft.ControlEvent):
-        await self.__standings.load(force=True)
+        await self.app.request(partial(self.__standings.load, force=True), Priority.INTERACTIVE, label="speaker_standings")
         self.calculate()
         self.update_table()
     
@@ -173,102 +185,18 @@ class SpeakerTab(ft.Tab, AppControl):
         )
         self.page.open(dlg)
     
-    @wait_finish
-    async def on_generate(self, e: ft.ControlEvent):
-        # Prompt the presentation file
-        future_file = asyncio.Future()
-        dlg_file = GoogleFilePicker(
-            ft.Text("Select a file to edit"),
-            mime_type=["application/vnd.google-apps.presentation"],
-            on_result=future_file.set_result,
-        )
-        if not self.page.auth:
-            raise ExpectedError("Not logged in to Google")
-        self.page.open(dlg_file)
-        result: GoogleFilePickerResultEvent = await future_file
-        if not result.data:
-            return
-        # Get further information
-        future_slide_prompt = asyncio.Future()
-        service = build("slides", "v1", credentials=self.app.oauth_credentials)
-        presentation = service.presentations().get(presentationId=result.data.get("id")).execute()
-        num_institutions: set[int] = {0}.union({len(self.app.logos.get_object_logo_urls(row.speaker_data.speaker)) for row in self.data_table.rows if row.speaker_data.speaker})
-        fields_slide_inst = {
-            num_inst: ft.TextField(
-                label=f"Slide for {num_inst} institutions",
-                value="1",
-                keyboard_type=ft.KeyboardType.NUMBER,
-                prefix_text="Slide #"
-            ) for num_inst in sorted(num_institutions)
-        }
-        field_slide_insert = ft.TextField(
-            label="Slide to insert after",
-            value=str(len(presentation.get("slides"))),
-            keyboard_type=ft.KeyboardType.NUMBER,
-        )
-        check_ascending = ft.Checkbox(
-            label="Ascending order (1st, 2nd, ...)",
-            value=True,
-        )
-        check_danger = ft.Checkbox(
-            label="Insert danger prevention slides",
-            value=True
-        )
-        @wait_finish
-        def on_confirm_create(e: ft.ControlEvent):
-            slides_institution: dict[int, str] = {}
-            for num_inst, field in fields_slide_inst.items():
-                if 1 <= int(field.value) <= len(presentation.get("slides")):
-                    slides_institution[num_inst] = presentation.get("slides")[int(field.value)-1].get("objectId")
-                else:
-                    raise ValueError(f"Invalid slide number for {num_inst} institutions: {field.value}")
-            if not (0 <= int(field_slide_insert.value) <= len(presentation.get("slides"))):
-                raise ValueError(f"Invalid slide number to insert after: {field_slide_insert.value}")
-            self.page.close(dlg_settings)
-            future_slide_prompt.set_result({
-                "institutions": slides_institution,
-                "insert_position": int(field_slide_insert.value),
-                "ascending": check_ascending.value,
-                "danger": check_danger.value
-            })
-        dlg_settings = ft.AlertDialog(
-            modal=True,
-            title=ft.Text("Select slides"),
-            content=ft.Column(
-                [
-                    ft.Text("After which slide should the slides be inserted? (0=before first)"),
-                    field_slide_insert,
-                    ft.Divider(),
-                    ft.Text("Select the slide template for each number of institution"),
-                    *fields_slide_inst.values(),
-                    ft.Divider(),
-                    check_ascending,
-                    check_danger
-                ],
-                tight=True
-            ),
-            actions=[
-                ft.TextButton(
-                    "Create",
-                    on_click=on_confirm_create
-                ),
-                ft.TextButton(
-                    "Cancel",
-                    on_click=lambda _: (future_slide_prompt.set_result(None), self.page.close(dlg_settings))
-                )
-            ]
-        )
-        self.page.open(dlg_settings)
-        result_settings = await future_slide_prompt
-        if result_settings is None:
-            return
-        # Create the slides
-        datas = list(data for data in self.get_data(ascending=result_settings["ascending"]) if data.title)
+    def num_institutions(self) -> set[int]:
+        """Numbers of institutions of the slides, each needing a template slide"""
+        return {0}.union({len(self.app.logos.get_object_logo_urls(row.speaker_data.speaker)) for row in self.data_table.rows if row.speaker_data.speaker})
+    
+    def get_slides(self, ascending: bool, danger: bool) -> list[SlideData]:
+        datas = list(data for data in self.get_data(ascending=ascending) if data.title)
         slides: list[SlideData] = []
-        for data in datas:
+        for i, data in enumerate(datas):
             duplicates = [d for d in datas if d.title == data.title]
             duplicate_title = f" ({duplicates.index(data)+1}/{len(duplicates)})" if len(duplicates) > 1 else ""
-            if result_settings["danger"]:
+            participant = try_string(lambda: data.speaker.url, f"redacted:{i}")
+            if danger:
                 slides.append(
                     {
                         "texts": {
@@ -277,7 +205,8 @@ class SpeakerTab(ft.Tab, AppControl):
                             "{{team}}": "",
                             "{{metrics}}": self.app.pagelets.pg_generate_slides.format_speaker_metrics(data.num_metrics_include, data.standings),
                         },
-                        "images": set()
+                        "images": set(),
+                        "key": f"danger:{participant}"
                     }
                 )
             slides.append(
@@ -288,26 +217,60 @@ class SpeakerTab(ft.Tab, AppControl):
                         "{{team}}": data.speaker.team.long_name if data.speaker and data.speaker.team else "",
                         "{{metrics}}": self.app.pagelets.pg_generate_slides.format_speaker_metrics(data.num_metrics_include, data.standings),
                     },
-                    "images": self.app.logos.get_object_logo_urls(data.speaker) if data.speaker else set()
+                    "images": self.app.logos.get_object_logo_urls(data.speaker) if data.speaker else set(),
+                    "key": f"award:{participant}"
                 }
             )
+        return slides
+    
+    @wait_finish
+    async def on_generate(self, e: ft.ControlEvent):
+        # Prompt the presentation file
+        future_file = asyncio.Future()
+        dlg_file = GoogleFilePicker(
+            ft.Text("Select a file to edit"),
+            mime_type=["application/vnd.google-apps.presentation"],
+            on_result=future_file.set_result,
+        )
+        if not self.page.auth:
+            raise ExpectedError("Not logged in to Google")
+        self.page.open(dlg_file)
+        result: GoogleFilePickerResultEvent = await future_file
+        if not result.data:
+            return
+        # Get further information
+        service = self.app.google_service("slides", "v1")
+        presentation = await execute_async(service.presentations().get(presentationId=result.data.get("id")))
+        settings = await prompt_slide_settings(self.page, len(presentation.get("slides")), self.num_institutions())
+        if settings is None:
+            return
+        # Create the slides
+        slides = self.get_slides(settings.ascending, settings.danger)
         LOGGER.info(f"Creating {len(slides)} speaker slides")
-        create_slides(
-            service,
-            presentation.get("presentationId"),
-            result_settings["institutions"],
-            slides,
-            result_settings["insert_position"],
-            len(presentation.get("slides")),
+        result_slides = await run_slide_pipeline(
+            self.page,
+            SlidePipeline(
+                service,
+                presentation.get("presentationId"),
+                {num_inst: presentation.get("slides")[i].get("objectId") for num_inst, i in settings.templates.items()},
+                slides,
+                settings.position,
+                len(presentation.get("slides")),
+                scope=f"speakers:{self.app.tournament.url}"
+            )
         )
-        LOGGER.info(f"Created {len(slides)} speaker slides")
+        LOGGER.info(f"Synchronized {len(slides)} speaker slides: {result_slides.created} created, {result_slides.kept} unchanged, {result_slides.deleted} deleted")
         self.page.open(
             ft.SnackBar(
-                ft.Text(f"Created {len(slides)} speaker slides", color=ft.Colors.BLACK),
+                ft.Text(f"{result_slides.created} speaker slides created, {result_slides.kept} unchanged, {result_slides.deleted} deleted" + (f", {len(result_slides.skipped_images)} images could not be inserted" if result_slides.skipped_images else ""), color=ft.Colors.BLACK),
                 bgcolor=ft.Colors.GREEN_100
             )
         )
     
+    @wait_finish
+    async def on_generate_pptx(self, e: ft.ControlEvent):
+        await generate_pptx(self, "speakers", self.num_institutions(), self.get_slides)
+    
     def update_table(self):
         data_sorted = sorted(
             self.__data.values(),
@@ -326,7 +289,7 @@ class SpeakerTab(ft.Tab, AppControl):
     
     def calculate(self):
         dict_data: dict[str, SpeakerData] = {standing.speaker._href if standing.speaker else f"Redacted {i+1}": SpeakerData(standing) for i, standing in enumerate(self.__standings)}
-        metrics_preference: list[SpeakerMetrics] = self.app.tournament._links.preferences.find(identifier="standings__speaker_standings_precedence").value
+        metrics_preference: list[SpeakerMetrics] = self.app.preference("standings__speaker_standings_precedence")
         # Calculate the metrics necessary for display
         for data in dict_data.values():
             filtered: list[SpeakerData] = list(dict_data.values())
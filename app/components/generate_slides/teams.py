@@ -1,16 +1,22 @@
 import asyncio
 from dataclasses import dataclass, field
 import flet as ft
-from googleapiclient.discovery import build
+from functools import partial
 import logging
 import re
 from typing import Literal, Optional
 import tabbycat_api as tc
 from ...base import AppControl, wait_finish, try_string
 from ...exceptions import ExpectedError
-from ...utils import ordinal, create_slides, reversor, SlideData
+from ...google_api import execute_async
+from ...scheduler import Priority
+from ...slides import SlidePipeline
+from ...utils import ordinal, reversor, SlideData
 from ..editable_data_cell import EditableDataCell
 from ..google_picker import GoogleFilePicker, GoogleFilePickerResultEvent
+from .dialogs import prompt_slide_settings
+from .local_render import generate_pptx
+from .progress import run_slide_pipeline
 
 LOGGER = logging.getLogger(__name__)
 
@@ -97,6 +103,12 @@ class TeamTab(ft.Tab, AppControl):
                                 text="Generate",
                                 icon=ft.Icons.AUTO_AWESOME_MOTION,
                                 on_click=self.on_generate
+                            ),
+                            ft.ElevatedButton(
+                                text="Generate PPTX",
+                                icon=ft.Icons.SLIDESHOW,
+                                tooltip="Render the slides to a PowerPoint file from an uploaded template, without Google Slides",
+                                on_click=self.on_generate_pptx
                             )
                         ]
                     ),
@@ -129,16 +141,16 @@ class TeamTab(ft.Tab, AppControl):
         self.page.run_task(self.on_mount)
     
     async def on_mount(self):
-        self.__standings = await self.app.tournament.get_team_standings(self.break_category)
-        self.__breaks = await self.break_category._links.breaking_teams.load()
+        self.__standings = await self.app.request(partial(self.app.tournament.get_team_standings, self.break_category), label="team_standings")
+        self.__breaks = await self.app.request(self.break_category._links.breaking_teams.load, label="breaking_teams")
         self.calculate()
         self.calculate_title(format=f"{try_string(lambda: self.break_category.name)} {{}} Breaking Team", on="break")
         self.update_table()
     
     @wait_finish
     async def on_reload(self, e: ft.ControlEvent):
-        await self.__standings.load(force=True)
-        await self.__breaks.load(force=True)
+        await self.app.request(partial(self.__standings.load, force=True), Priority.INTERACTIVE, label="team_standings")
+        await self.app.request(partial(self.__breaks.load, force=True), Priority.INTERACTIVE, label="breaking_teams")
         self.calculate()
         self.calculate_title(format=f"{try_string(lambda: self.break_category.name)} {{}} Breaking Team", on="break")
         self.update_table()
@@ -205,102 +217,18 @@ class TeamTab(ft.Tab, AppControl):
         )
         self.page.open(dlg)
     
-    @wait_finish
-    async def on_generate(self, e: ft.ControlEvent):
-        # Prompt the presentation file
-        future_file = asyncio.Future()
-        dlg_file = GoogleFilePicker(
-            ft.Text("Select a file to edit"),
-            mime_type=["application/vnd.google-apps.presentation"],
-            on_result=future_file.set_result,
-        )
-        if not self.page.auth:
-            raise ExpectedError("Not logged in to Google")
-        self.page.open(dlg_file)
-        result: GoogleFilePickerResultEvent = await future_file
-        if not result.data:
-            return
-        # Get further information
-        future_slide_prompt = asyncio.Future()
-        service = build("slides", "v1", credentials=self.app.oauth_credentials)
-        presentation = service.presentations().get(presentationId=result.data.get("id")).execute()
-        num_institutions: set[int] = {0}.union({len(self.app.logos.get_object_logo_urls(row.team_data.team)) for row in self.data_table.rows})
-        fields_slide_inst = {
-            num_inst: ft.TextField(
-                label=f"Slide for {num_inst} institutions",
-                value="1",
-                keyboard_type=ft.KeyboardType.NUMBER,
-                prefix_text="Slide #"
-            ) for num_inst in sorted(num_institutions)
-        }
-        field_slide_insert = ft.TextField(
-            label="Slide to insert after",
-            value=str(len(presentation.get("slides"))),
-            keyboard_type=ft.KeyboardType.NUMBER,
-        )
-        check_ascending = ft.Checkbox(
-            label="Ascending order (1st, 2nd, ...)",
-            value=True,
-        )
-        check_danger = ft.Checkbox(
-            label="Insert danger prevention slides",
-            value=True
-        )
-        @wait_finish
-        def on_confirm_create(e: ft.ControlEvent):
-            slides_institution: dict[int, str] = {}
-            for num_inst, field in fields_slide_inst.items():
-                if 1 <= int(field.value) <= len(presentation.get("slides")):
-                    slides_institution[num_inst] = presentation.get("slides")[int(field.value)-1].get("objectId")
-                else:
-                    raise ValueError(f"Invalid slide number for {num_inst} institutions: {field.value}")
-            if not (0 <= int(field_slide_insert.value) <= len(presentation.get("slides"))):
-                raise ValueError(f"Invalid slide number to insert after: {field_slide_insert.value}")
-            self.page.close(dlg_settings)
-            future_slide_prompt.set_result({
-                "institutions": slides_institution,
-                "insert_position": int(field_slide_insert.value),
-                "ascending": check_ascending.value,
-                "danger": check_danger.value
-            })
-        dlg_settings = ft.AlertDialog(
-            modal=True,
-            title=ft.Text("Select slides"),
-            content=ft.Column(
-                [
-                    ft.Text("After which slide should the slides be inserted? (0=before first)"),
-                    field_slide_insert,
-                    ft.Divider(),
-                    ft.Text("Select the slide template for each number of institution"),
-                    *fields_slide_inst.values(),
-                    ft.Divider(),
-                    check_ascending,
-                    check_danger
-                ],
-                tight=True
-            ),
-            actions=[
-                ft.TextButton(
-                    "Create",
-                    on_click=on_confirm_create
-                ),
-                ft.TextButton(
-                    "Cancel",
-                    on_click=lambda _: (future_slide_prompt.set_result(None), self.page.close(dlg_settings))
-                )
-            ]
-        )
-        self.page.open(dlg_settings)
-        result_settings = await future_slide_prompt
-        if result_settings is None:
-            return
-        # Create the slides
-        datas = list(data for data in self.get_data(ascending=result_settings["ascending"]) if data.title)
+    def num_institutions(self) -> set[int]:
+        """Numbers of institutions of the slides, each needing a template slide"""
+        return {0}.union({len(self.app.logos.get_object_logo_urls(row.team_data.team)) for row in self.data_table.rows})
+    
+    def get_slides(self, ascending: bool, danger: bool) -> list[SlideData]:
+        datas = list(data for data in self.get_data(ascending=ascending) if data.title)
         slides: list[SlideData] = []
-        for data in datas:
+        for i, data in enumerate(datas):
             duplicates = [d for d in datas if d.title == data.title]
             duplicate_title = f" ({duplicates.index(data)+1}/{len(duplicates)})" if len(duplicates) > 1 else ""
-            if result_settings["danger"]:
+            participant = data.team.url
+            if danger:
                 slides.append(
                     {
                         "texts": {
@@ -309,7 +237,8 @@ class TeamTab(ft.Tab, AppControl):
                             "{{speakers}}": "",
                             "{{metrics}}": self.app.pagelets.pg_generate_slides.format_team_metrics(data.num_metrics_include, data.standings),
                         },
-                        "images": set()
+                        "images": set(),
+                        "key": f"danger:{participant}"
                     }
                 )
             slides.append(
@@ -320,26 +249,60 @@ class TeamTab(ft.Tab, AppControl):
                         "{{speakers}}": ", ".join(spk.name for spk in data.team.speakers),
                         "{{metrics}}": self.app.pagelets.pg_generate_slides.format_team_metrics(data.num_metrics_include, data.standings),
                     },
-                    "images": self.app.logos.get_object_logo_urls(data.team)
+                    "images": self.app.logos.get_object_logo_urls(data.team),
+                    "key": f"award:{participant}"
                 }
             )
+        return slides
+    
+    @wait_finish
+    async def on_generate(self, e: ft.ControlEvent):
+        # Prompt the presentation file
+        future_file = asyncio.Future()
+        dlg_file = GoogleFilePicker(
+            ft.Text("Select a file to edit"),
+            mime_type=["application/vnd.google-apps.presentation"],
+            on_result=future_file.set_result,
+        )
+        if not self.page.auth:
+            raise ExpectedError("Not logged in to Google")
+        self.page.open(dlg_file)
+        result: GoogleFilePickerResultEvent = await future_file
+        if not result.data:
+            return
+        # Get further information
+        service = self.app.google_service("slides", "v1")
+        presentation = await execute_async(service.presentations().get(presentationId=result.data.get("id")))
+        settings = await prompt_slide_settings(self.page, len(presentation.get("slides")), self.num_institutions())
+        if settings is None:
+            return
+        # Create the slides
+        slides = self.get_slides(settings.ascending, settings.danger)
         LOGGER.info(f"Creating {len(slides)} slides")
-        create_slides(
-            service,
-            presentation.get("presentationId"),
-            result_settings["institutions"],
-            slides,
-            result_settings["insert_position"],
-            len(presentation.get("slides")),
+        result_slides = await run_slide_pipeline(
+            self.page,
+            SlidePipeline(
+                service,
+                presentation.get("presentationId"),
+                {num_inst: presentation.get("slides")[i].get("objectId") for num_inst, i in settings.templates.items()},
+                slides,
+                settings.position,
+                len(presentation.get("slides")),
+                scope=f"teams:{self.app.tournament.url}"
+            )
         )
-        LOGGER.info(f"Created {len(slides)} team slides")
+        LOGGER.info(f"Synchronized {len(slides)} team slides: {result_slides.created} created, {result_slides.kept} unchanged, {result_slides.deleted} deleted")
         self.page.open(
             ft.SnackBar(
-                ft.Text(f"Created {len(slides)} team slides", color=ft.Colors.BLACK),
+                ft.Text(f"{result_slides.created} team slides created, {result_slides.kept} unchanged, {result_slides.deleted} deleted" + (f", {len(result_slides.skipped_images)} images could not be inserted" if result_slides.skipped_images else ""), color=ft.Colors.BLACK),
                 bgcolor=ft.Colors.GREEN_100
             )
         )
     
+    @wait_finish
+    async def on_generate_pptx(self, e: ft.ControlEvent):
+        await generate_pptx(self, "teams", self.num_institutions(), self.get_slides)
+    
     def update_table(self):
         data_sorted = sorted(
             self.__data.values(),
@@ -358,7 +321,7 @@ class TeamTab(ft.Tab, AppControl):
     
     def calculate(self):
         dict_data: dict[str, TeamData] = {standing.team._href: TeamData(standing) for standing in self.__standings}
-        metrics_preference: list[TeamMetrics] = self.app.tournament._links.preferences.find(identifier="standings__team_standings_precedence").value
+        metrics_preference: list[TeamMetrics] = self.app.preference("standings__team_standings_precedence")
         # Calculate the metrics necessary for display
         for data in dict_data.values():
             filtered: list[TeamData] = list(dict_data.values())
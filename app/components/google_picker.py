@@ -2,10 +2,10 @@ import flet as ft
 import inspect
 from typing import Callable, Optional, Any
 import re
-from googleapiclient.discovery import build
 import logging
 import asyncio
 from ..base import AppControl, wait_finish
+from ..google_api import execute_async
 
 LOGGER = logging.getLogger(__name__)
 
@@ -171,13 +171,16 @@ class GoogleFilePicker(ft.AlertDialog, AppControl):
             elif callable(self.__exit_func):
                 self.__exit_func(None)
             return
-        root = self.__service.files().get(
+        self.page.run_task(self.load_root)
+    
+    async def load_root(self):
+        root = await execute_async(self.__service.files().get(
             fileId="root",
             fields="id, name, iconLink, mimeType, parents"
-        ).execute()
+        ))
         self.to_cache(root)
         self.__cache["root"] = root
-        self.page.run_task(self.load_path, "root")
+        await self.load_path("root")
     
     def verify_mime(self, file: dict) -> bool:
         selected_mime = file.get("mimeType")
@@ -190,11 +193,7 @@ class GoogleFilePicker(ft.AlertDialog, AppControl):
     
     def set_credentials(self):
         if self.page.auth:
-            self.__service = build(
-                "drive",
-                "v3",
-                credentials=self.app.oauth_credentials
-            )
+            self.__service = self.app.google_service("drive", "v3")
     
     async def load_path(self, file_id: str):
         if not self.__service:
@@ -205,10 +204,10 @@ class GoogleFilePicker(ft.AlertDialog, AppControl):
             raise Exception("Google Drive service not available.")
         # If parent is undiscovered, get it
         if file_id not in self.__cache:
-            result = self.__service.files().get(
+            result = await execute_async(self.__service.files().get(
                 fileId=file_id,
                 fields="id, name, iconLink, mimeType, parents"
-            ).execute()
+            ))
             self.to_cache(result)
         self.__current_directory = file_id
         q = f"'{file_id}' in parents and trashed = false"
@@ -217,11 +216,11 @@ class GoogleFilePicker(ft.AlertDialog, AppControl):
                 ["mimeType = 'application/vnd.google-apps.folder'"] + [f"mimeType contains '{mime_type}'" for mime_type in self.mime_types]
             )
             q = f"{q} and ({q_mime})"
-        result = self.__service.files().list(
+        result = await execute_async(self.__service.files().list(
             q=q,
             fields="nextPageToken, files(id, name, iconLink, mimeType, parents)",
             orderBy="folder,name_natural"
-        ).execute()
+        ))
         items = result.get("files", [])
         # Set to flet controls
         await self.update_files(items, self.__current_directory)
@@ -302,10 +301,10 @@ class GoogleFilePicker(ft.AlertDialog, AppControl):
         match_id = re.search(r"(?:\/d\/|\/folders\/|id=)([a-zA-Z0-9_-]+)", value)
         # fileId is directly input
         if match_id:
-            result = self.__service.files().get(
+            result = await execute_async(self.__service.files().get(
                 fileId=match_id.group(1),
                 fields="id, name, iconLink, mimeType, parents"
-            ).execute()
+            ))
             self.__current_directory = None
             if not self.verify_mime(result):
                 return await self.update_files([], None)
@@ -327,11 +326,11 @@ class GoogleFilePicker(ft.AlertDialog, AppControl):
             # If not in root, add parent condition
             if self.__current_directory and self.__current_directory != "root" and self.__current_directory != self.__cache.get("root", {}).get("id", None):
                 q = f"{q} and '{self.__current_directory}' in parents"
-            result = self.__service.files().list(
+            result = await execute_async(self.__service.files().list(
                 q=q,
                 fields="nextPageToken, files(id, name, iconLink, mimeType, parents)",
                 orderBy="folder,name_natural"
-            ).execute()
+            ))
             items = result.get("files", [])
             await self.update_files(items, self.__current_directory)
     
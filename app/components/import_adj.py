@@ -1,6 +1,5 @@
 import asyncio
 import flet as ft
-from googleapiclient.discovery import build
 from io import BytesIO
 import logging
 import numpy as np
@@ -10,7 +9,9 @@ from typing import Any, Optional
 import tabbycat_api as tc
 from ..sheet_reader import SheetReader, ExcelReader, CSVReader, to_text, to_bool
 from ..base import AppControl, wait_finish, try_string
+from ..downloads import UPLOAD_DIR
 from ..exceptions import ExpectedError
+from ..google_api import execute_async, run_blocking
 from .google_picker import GoogleFilePicker, GoogleFilePickerResultEvent
 
 FIELD_NAMES = ["name", "institution", "email", "base_score", "independent", "adj_core"]
@@ -51,9 +52,7 @@ class AdjudicatorImporterRow(ft.DataRow, AppControl):
     
     def build(self):
         super().build()
-        if notna(self.drow.get("name")) and self.app.tournament._links.adjudicators.find(
-            lambda adj: adj.name == self.drow.get("name")
-        ):
+        if notna(self.drow.get("name")) and self.app.find("adjudicators", name=self.drow.get("name")):
             self.selected = False
     
     def get_object(self) -> Optional[tc.models.Adjudicator]:
@@ -64,7 +63,7 @@ class AdjudicatorImporterRow(ft.DataRow, AppControl):
             return value if notna(value) else tc.NULL
         return tc.models.Adjudicator(
             name=_value("name"),
-            institution=self.app.institutions.find(code=inst) if (inst:=_value("institution")) is not tc.NULL else None,
+            institution=self.app.find("institutions", code=inst) if (inst:=_value("institution")) is not tc.NULL else None,
             email=_value("email"),
             base_score=v if ((v:=_value("base_score")) is not tc.NULL and not np.isnan(v)) else tc.NULL,
             independent=to_bool(v) if (v:=_value("independent")) is not tc.NULL else tc.NULL,
@@ -76,6 +75,7 @@ class AdjudicatorImporterRow(ft.DataRow, AppControl):
 
 class AdjudicatorImporterPagelet(ft.Pagelet, AppControl):
     reader: SheetReader = None
+    required_collections = ("institutions", "adjudicators")
     def __init__(self):
         self.file_picker = ft.FilePicker(on_result=self.on_result_file_pick, on_upload=self.on_upload_complete)
         self.dropdown_sheet_select = ft.Dropdown(
@@ -141,7 +141,7 @@ class AdjudicatorImporterPagelet(ft.Pagelet, AppControl):
         future = asyncio.Future()
         if not self.page.auth:
             raise ExpectedError("Not logged in to Google")
-        service = build("drive", "v3", credentials=self.app.oauth_credentials)
+        service = self.app.google_service("drive", "v3")
         gp = GoogleFilePicker(
             mime_type=["application/vnd.google-apps.spreadsheet", "application/vnd.ms-excel", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "text/csv"],
             on_result=lambda e: future.set_result(e),
@@ -153,14 +153,14 @@ class AdjudicatorImporterPagelet(ft.Pagelet, AppControl):
         result: GoogleFilePickerResultEvent = await future
         if result.data is not None:
             if result.data.get("mimeType") == "application/vnd.google-apps.spreadsheet":
-                data: bytes = service.files().export(
+                data: bytes = await execute_async(service.files().export(
                     fileId = result.data.get("id"),
                     mimeType = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                ).execute()
+                ))
             else:
-                data: bytes = service.files().get_media(
+                data: bytes = await execute_async(service.files().get_media(
                     fileId = result.data.get("id")
-                ).execute()
+                ))
             if result.data.get("mimeType") == "text/csv":
                 self.reader = CSVReader(BytesIO(data))
             else:
@@ -197,7 +197,7 @@ class AdjudicatorImporterPagelet(ft.Pagelet, AppControl):
                 )
             )
             # Handle file formats
-            file_path = os.path.join(os.getenv("FLET_ASSETS_DIR"), f"uploads/{e.file_name}")
+            file_path = os.path.join(UPLOAD_DIR, e.file_name)
             if e.file_name.endswith(".xlsx") or e.file_name.endswith(".xls"):
                 self.reader = ExcelReader(path=file_path)
             elif e.file_name.endswith(".csv"):
@@ -214,8 +214,10 @@ class AdjudicatorImporterPagelet(ft.Pagelet, AppControl):
             self.set_adjudicator_data()
             self.update()
     
-    def on_select_sheet(self, e):
-        self.reader.set_sheet(self.dropdown_sheet_select.value)
+    @wait_finish
+    async def on_select_sheet(self, e):
+        # A spreadsheet reader fetches the sheet from Google
+        await run_blocking(self.reader.set_sheet, self.dropdown_sheet_select.value)
         self.set_sheet_select()
         self.set_adjudicator_data()
         self.update()
@@ -269,7 +271,7 @@ class AdjudicatorImporterPagelet(ft.Pagelet, AppControl):
             scroll=ft.ScrollMode.AUTO
         )
         # Missing institutions
-        missing_institutions = [inst for inst in institutions_table if self.app.institutions.find(code=inst) is None]
+        missing_institutions = [inst for inst in institutions_table if self.app.find("institutions", code=inst) is None]
         if missing_institutions:
             col.controls.append(
                 ft.ExpansionTile(
@@ -318,7 +320,7 @@ class AdjudicatorImporterPagelet(ft.Pagelet, AppControl):
         tasks: dict[str, asyncio.Task] = {
             **{
                 f"institution \"{inst}\"": asyncio.create_task(
-                    self.app.tournament.create(
+                    self.app.create(
                         tc.models.Institution(
                             name=inst,
                             code=inst
@@ -349,7 +351,7 @@ class AdjudicatorImporterPagelet(ft.Pagelet, AppControl):
         )
         # Create teams
         tasks = {
-            row.drow.get("name"): asyncio.create_task(self.app.tournament.create(obj)) for row in selected_rows
+            row.drow.get("name"): asyncio.create_task(self.app.create(obj)) for row in selected_rows
             if (obj := row.get_object()) is not None
         }
         await asyncio.gather(*tasks.values(), return_exceptions=True)
@@ -1,6 +1,5 @@
 import asyncio
 import flet as ft
-from googleapiclient.discovery import build
 from io import BytesIO
 import logging
 import numpy as np
@@ -12,7 +11,9 @@ from typing import Any, Optional
 import tabbycat_api as tc
 from ..sheet_reader import SheetReader, ExcelReader, CSVReader, to_text, to_snake_case, to_bool
 from ..base import AppControl, wait_finish, try_string
+from ..downloads import UPLOAD_DIR
 from ..exceptions import ExpectedError
+from ..google_api import execute_async, run_blocking
 from .google_picker import GoogleFilePicker, GoogleFilePickerResultEvent
 
 FIELD_NAMES = ["institution", "break_categories", "reference", "short_reference", "use_institution_prefix", "speaker_1_name", "speaker_1_email", "speaker_1_categories", "speaker_2_name", "speaker_2_email", "speaker_2_categories", "speaker_3_name", "speaker_3_email", "speaker_3_categories"]
@@ -46,9 +47,7 @@ class TeamImporterRow(ft.DataRow, AppControl):
     
     def build(self):
         super().build()
-        if notna(self.drow.get("reference")) and notna(self.drow.get("institution")) and self.app.tournament._links.teams.find(
-            lambda team: team.reference == self.drow.get("reference") and team.institution and team.institution.code == self.drow.get("institution")
-        ):
+        if notna(self.drow.get("reference")) and notna(self.drow.get("institution")) and self.app.find("teams", reference_institution=(self.drow.get("reference"), self.drow.get("institution"))):
             self.selected = False
     
     def get_object(self) -> Optional[tc.models.Team]:
@@ -69,12 +68,12 @@ class TeamImporterRow(ft.DataRow, AppControl):
                     tc.models.Speaker(
                         name=_value(f"speaker_{i}_name"),
                         email=_value(f"speaker_{i}_email"),
-                        categories=[self.app.tournament._links.speaker_categories.find(slug=to_snake_case(cat)) for cat in cats] if (cats:=_value(f"speaker_{i}_categories")) is not tc.NULL else [],
+                        categories=[self.app.find("speaker_categories", slug=to_snake_case(cat)) for cat in cats] if (cats:=_value(f"speaker_{i}_categories")) is not tc.NULL else [],
                     )
                 )
         return tc.models.Team(
-            institution=self.app.institutions.find(code=inst) if (inst:=_value("institution")) is not tc.NULL else tc.NULL,
-            break_categories=[self.app.tournament._links.break_categories.find(slug=to_snake_case(cat)) for cat in _value("break_categories")] if (cats:=_value("break_categories")) is not tc.NULL else [],
+            institution=self.app.find("institutions", code=inst) if (inst:=_value("institution")) is not tc.NULL else tc.NULL,
+            break_categories=[self.app.find("break_categories", slug=to_snake_case(cat)) for cat in _value("break_categories")] if (cats:=_value("break_categories")) is not tc.NULL else [],
             reference=_value("reference"),
             short_reference=_value("short_reference") or ref[:35] if (ref:=_value("reference")) is not tc.NULL else tc.NULL,
             use_institution_prefix=to_bool(value) if (value := _value("use_institution_prefix")) is not tc.NULL else tc.NULL,
@@ -83,6 +82,7 @@ class TeamImporterRow(ft.DataRow, AppControl):
 
 class TeamImporterPagelet(ft.Pagelet, AppControl):
     reader: SheetReader = None
+    required_collections = ("institutions", "break_categories", "speaker_categories", "teams", "speakers")
     def __init__(self):
         self.file_picker = ft.FilePicker(on_result=self.on_result_file_pick, on_upload=self.on_upload_complete)
         self.dropdown_sheet_select = ft.Dropdown(
@@ -148,7 +148,7 @@ class TeamImporterPagelet(ft.Pagelet, AppControl):
         future = asyncio.Future()
         if not self.page.auth:
             raise ExpectedError("Not logged in to Google")
-        service = build("drive", "v3", credentials=self.app.oauth_credentials)
+        service = self.app.google_service("drive", "v3")
         gp = GoogleFilePicker(
             mime_type=["application/vnd.google-apps.spreadsheet", "application/vnd.ms-excel", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "text/csv"],
             on_result=lambda e: future.set_result(e),
@@ -160,14 +160,14 @@ class TeamImporterPagelet(ft.Pagelet, AppControl):
         result: GoogleFilePickerResultEvent = await future
         if result.data is not None:
             if result.data.get("mimeType") == "application/vnd.google-apps.spreadsheet":
-                data: bytes = service.files().export(
+                data: bytes = await execute_async(service.files().export(
                     fileId = result.data.get("id"),
                     mimeType = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                ).execute()
+                ))
             else:
-                data: bytes = service.files().get_media(
+                data: bytes = await execute_async(service.files().get_media(
                     fileId = result.data.get("id")
-                ).execute()
+                ))
             if result.data.get("mimeType") == "text/csv":
                 self.reader = CSVReader(BytesIO(data))
             else:
@@ -204,7 +204,7 @@ class TeamImporterPagelet(ft.Pagelet, AppControl):
                 )
             )
             # Handle file formats
-            file_path = os.path.join(os.getenv("FLET_ASSETS_DIR"), f"uploads/{e.file_name}")
+            file_path = os.path.join(UPLOAD_DIR, e.file_name)
             if e.file_name.endswith(".xlsx") or e.file_name.endswith(".xls"):
                 self.reader = ExcelReader(path=file_path)
             elif e.file_name.endswith(".csv"):
@@ -221,8 +221,10 @@ class TeamImporterPagelet(ft.Pagelet, AppControl):
             self.set_team_data()
             self.update()
     
-    def on_select_sheet(self, e):
-        self.reader.set_sheet(self.dropdown_sheet_select.value)
+    @wait_finish
+    async def on_select_sheet(self, e):
+        # A spreadsheet reader fetches the sheet from Google
+        await run_blocking(self.reader.set_sheet, self.dropdown_sheet_select.value)
         self.set_sheet_select()
         self.set_team_data()
         self.update()
@@ -287,7 +289,7 @@ class TeamImporterPagelet(ft.Pagelet, AppControl):
             scroll=ft.ScrollMode.AUTO
         )
         # Missing institutions
-        missing_institutions = [inst for inst in institutions_table if self.app.institutions.find(code=inst) is None]
+        missing_institutions = [inst for inst in institutions_table if self.app.find("institutions", code=inst) is None]
         if missing_institutions:
             col.controls.append(
                 ft.ExpansionTile(
@@ -299,7 +301,7 @@ class TeamImporterPagelet(ft.Pagelet, AppControl):
                 )
             )
         # Missing break categories
-        missing_break_categories = [cat for cat in break_categories_table if self.app.tournament._links.break_categories.find(slug=to_snake_case(cat)) is None]
+        missing_break_categories = [cat for cat in break_categories_table if self.app.find("break_categories", slug=to_snake_case(cat)) is None]
         if missing_break_categories:
             col.controls.append(
                 ft.ExpansionTile(
@@ -311,7 +313,7 @@ class TeamImporterPagelet(ft.Pagelet, AppControl):
                 )
             )
         # Missing speaker categories
-        missing_speaker_categories = [cat for cat in speaker_categories_table if self.app.tournament._links.speaker_categories.find(slug=to_snake_case(cat)) is None]
+        missing_speaker_categories = [cat for cat in speaker_categories_table if self.app.find("speaker_categories", slug=to_snake_case(cat)) is None]
         if missing_speaker_categories:
             col.controls.append(
                 ft.ExpansionTile(
@@ -362,7 +364,7 @@ class TeamImporterPagelet(ft.Pagelet, AppControl):
         tasks: dict[str, asyncio.Task] = {
             **{
                 f"institution \"{inst}\"": asyncio.create_task(
-                    self.app.tournament.create(
+                    self.app.create(
                         tc.models.Institution(
                             name=inst,
                             code=inst
@@ -372,7 +374,7 @@ class TeamImporterPagelet(ft.Pagelet, AppControl):
             },
             **{
                 f"break category \"{bc}\"": asyncio.create_task(
-                    self.app.tournament.create(
+                    self.app.create(
                         tc.models.BreakCategory(
                             name=bc,
                             slug=to_snake_case(bc),
@@ -386,7 +388,7 @@ class TeamImporterPagelet(ft.Pagelet, AppControl):
             },
             **{
                 f"speaker category \"{sc}\"": asyncio.create_task(
-                    self.app.tournament.create(
+                    self.app.create(
                         tc.models.SpeakerCategory(
                             name=sc,
                             slug=to_snake_case(sc),
@@ -418,7 +420,7 @@ class TeamImporterPagelet(ft.Pagelet, AppControl):
         )
         # Create teams
         tasks = {
-            get_name(row.drow): asyncio.create_task(self.app.tournament.create(obj)) for row in selected_rows
+            get_name(row.drow): asyncio.create_task(self.app.create(obj)) for row in selected_rows
             if (obj := row.get_object()) is not None
         }
         await asyncio.gather(*tasks.values(), return_exceptions=True)
@@ -1,12 +1,12 @@
 import asyncio
 import flet as ft
-from googleapiclient.discovery import build
 import logging
 import tabbycat_api as tc
-from typing import Optional, override, Sequence
+from typing import Any, Optional, override, Sequence
 
 from ..base import AppControl, try_string, wait_finish
 from ..exceptions import ExpectedError
+from ..google_api import execute_async
 from ..utils import Logo, LogoData
 from .google_picker import GoogleFilePicker, GoogleFilePickerResultEvent
 
@@ -419,6 +419,9 @@ class TeamLogoTile(ParticipantLogoTile[tc.models.Team]):
         self.page.open(dlg)
 
 class LogoManagerPagelet(ft.Pagelet, AppControl):
+    required_collections = ("institutions", "teams", "speakers", "adjudicators")
+    topics = ("teams", "speakers", "adjudicators")
+    
     def __init__(self):
         self.row_teams = ft.ResponsiveRow(
             [],
@@ -483,6 +486,9 @@ class LogoManagerPagelet(ft.Pagelet, AppControl):
         self.set_list_participants()
         self.update()
     
+    def on_store_change(self, topic: str, payload: Any):
+        self.set_tabbycat()
+    
     def set_list_participants(self):
         col_size = {"xs": 6, "sm": 4, "md": 3}
         self.row_teams.controls = sorted([TeamLogoTile(team, col=col_size) for team in self.app.tournament._links.teams], key=lambda x: x.title_name)
@@ -615,14 +621,14 @@ class LogoManagerPagelet(ft.Pagelet, AppControl):
         def add_alias(e: ft.ControlEvent):
             if not self.page.auth:
                 raise ExpectedError("Not logged in to Google")
-            service = build("drive", "v3", credentials=self.app.oauth_credentials)
-            def on_file_picked(e: GoogleFilePickerResultEvent):
+            service = self.app.google_service("drive", "v3")
+            async def on_file_picked(e: GoogleFilePickerResultEvent):
                 if e.data:
                     if e.data["mimeType"] == "application/vnd.google-apps.folder":
-                        images = service.files().list(
+                        images = (await execute_async(service.files().list(
                             q=f"'{e.data['id']}' in parents and mimeType contains 'image/' and trashed = false",
                             fields="files(id, name, mimeType)"
-                        ).execute().get("files", [])
+                        ))).get("files", [])
                         aliases.update({image.get("name").split(".")[0]: {"type": "file_id", "value": image.get("id")} for image in images})
                     else:
                         aliases[e.data["name"].split(".")[0]] = {"type": "file_id", "value": e.data.get("id")}
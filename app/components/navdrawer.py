@@ -44,6 +44,12 @@ class MyNavDrawer(ft.NavigationDrawer, AppControl):
                     selected_icon=ft.Icons.AUTO_AWESOME_MOTION,
                     disabled=True
                 ),
+                ft.NavigationDrawerDestination(
+                    label="Feedback Compliance",
+                    icon=ft.Icons.FACT_CHECK_OUTLINED,
+                    selected_icon=ft.Icons.FACT_CHECK,
+                    disabled=True
+                ),
             ],
             on_change=self.on_change_item
         )
@@ -65,4 +71,6 @@ class MyNavDrawer(ft.NavigationDrawer, AppControl):
             case 4:
                 self.page.go("/logos")
             case 5:
-                self.page.go("/slides")
\ No newline at end of file
+                self.page.go("/slides")
+            case 6:
+                self.page.go("/compliance")
\ No newline at end of file
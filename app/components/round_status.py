@@ -3,12 +3,43 @@ import tabbycat_api as tc
 import logging
 import asyncio
 from datetime import datetime
-from typing import Literal
+import json
+import math
+import os
+from typing import Any, Callable, Literal, Optional
 from ..base import AppControl, try_string, wait_finish
+from ..downloads import Download
+from ..exceptions import ExpectedError
+from ..export import BALLOT_STATUS_TEXT, CsvReportWriter, ReportWriter, SheetsReportWriter, export_report
+from ..scheduler import Priority
+from ..feedback import feedback_signature
+from ..poller import ballot_signature
+from ..verification import DebateSummary, VerificationResult, debate_status, get_panel
+from .google_picker import GoogleFilePicker, GoogleFilePickerResultEvent
 
 LOGGER = logging.getLogger(__name__)
-TeamFeedbackDirection = Literal["orallist", "all-adjs", "no-one"]
-AdjFeedbackDirection = Literal["minimal", "with-p-on-c", "with-t-on-c", "all-adjs", "with-p-on-p", "no-adjs"]
+ROUND_STATUS_PAGE_SIZE = int(os.getenv("ROUND_STATUS_PAGE_SIZE", 50))
+BALLOT_STATUS_ORDER = {"N": 0, "D": 1, "P": 2, "C": 3}
+# Title, sort key and whether the column is numeric
+SUMMARY_COLUMNS: list[tuple[str, Callable[[DebateSummary], Any], bool]] = [
+    ("Round", lambda s: getattr(s.round, "seq", 0) or 0, False),
+    ("Venue", lambda s: try_string(lambda: s.pairing.venue.display_name), False),
+    ("Teams", lambda s: " vs. ".join(try_string(lambda: dt.team.short_name) for dt in s.pairing.teams), False),
+    ("Status", lambda s: s.status, False),
+    ("Ballot", lambda s: BALLOT_STATUS_ORDER.get(s.result_status, -1), False),
+    ("Missing", lambda s: s.missing_feedback, True),
+    ("Extra", lambda s: s.extra_feedback, True),
+    ("Orallists", lambda s: s.multiple_orallists, False),
+    ("Ballot flags", lambda s: len(s.ballot_flags), True),
+]
+
+def draw_fingerprint(pairing: tc.models.RoundPairing) -> tuple:
+    """Get the values shown in the header of a panel, which change only when the draw is edited"""
+    return (
+        try_string(lambda: pairing.venue.url),
+        tuple((try_string(lambda: dt.side), try_string(lambda: dt.team.url)) for dt in pairing.teams),
+        tuple((position, adj.url) for position, adj in get_panel(pairing)),
+    )
 
 
 class FeedbackTile(ft.ListTile, AppControl):
@@ -172,10 +203,15 @@ class RoundStatusPanel(ft.ExpansionPanel, AppControl):
     ballots: list[tc.models.Ballot]
     feedbacks: list[tc.models.Feedback]
     round: tc.models.Round
+    fingerprint: tuple = None
+    body_built: bool = False
+    # URL of the ballot picked by the user, "" for None, kept while the ballot still exists after a reload
+    selected_ballot: Optional[str] = None
     
     def __init__(self, pairing: tc.models.RoundPairing, round: tc.models.Round):
         self.pairing = pairing
         self.round = round
+        self.draw = draw_fingerprint(pairing)
         self.dropdown_ballot = ft.Dropdown(
             on_change=self.on_select_ballot,
             expand=True
@@ -224,17 +260,62 @@ class RoundStatusPanel(ft.ExpansionPanel, AppControl):
     
     def build(self):
         super().build()
+        self.set_content()
+    
+    def set_content(self):
+        """Sets the status in the header, and the body only if the panel was already expanded"""
+        self.feedbacks = self.app.feedback_sync.for_debate(self.pairing.url)
+        self.fingerprint = self.get_fingerprint()
+        self.set_verify_status()
+        if self.body_built:
+            self.set_body()
+    
+    def set_body(self):
         self.sync_data()
         self.set_ballot(int(self.dropdown_ballot.value))
         self.set_panel()
-        self.set_verify_status()
+        self.body_built = True
+    
+    def build_body(self):
+        """Builds the ballot, team and adjudicator controls the first time the panel is expanded"""
+        if self.body_built:
+            return
+        self.set_body()
+        self.expanded = True
+        self.update()
+    
+    def get_fingerprint(self) -> tuple:
+        """Get a value which changes whenever the ballots, the result status or the feedback shown in the panel change"""
+        return (
+            self.pairing.result_status,
+            tuple(ballot_signature(ballot) for ballot in self.pairing._links.ballots),
+            frozenset((fb.url, feedback_signature(fb)) for fb in self.app.feedback_sync.for_debate(self.pairing.url)),
+            self.round.silent,
+            self.round.stage,
+        )
+    
+    def patch(self, pairing: tc.models.RoundPairing, round: tc.models.Round) -> bool:
+        """Takes the newly loaded pairing and updates the panel in place if anything it shows changed
+        
+        Returns:
+            bool: Whether the panel was updated
+        """
+        self.pairing = pairing
+        self.round = round
+        if self.get_fingerprint() == self.fingerprint:
+            return False
+        self.set_content()
+        self.update()
+        return True
     
     def on_select_ballot(self, e):
-        self.set_ballot(int(self.dropdown_ballot.value))
+        i = int(self.dropdown_ballot.value)
+        self.selected_ballot = self.ballots[i].url if i != -1 else ""
+        self.set_ballot(i)
         self.update()
     
     def set_ballot(self, i: int = -1):
-        num_sides: int = self.app.tournament._links.preferences.find(identifier="debate_rules__teams_in_debate").value
+        num_sides: int = self.app.preference("debate_rules__teams_in_debate")
         # Get the selected ballot, -1 if none
         i = int(self.dropdown_ballot.value)
         # Render team grids
@@ -254,6 +335,7 @@ class RoundStatusPanel(ft.ExpansionPanel, AppControl):
     
     def set_panel(self):
         adj = self.pairing.adjudicators
+        self.grid_adjudicators.controls.clear()
         # Chair
         if adj.chair:
             self.grid_adjudicators.controls.append(
@@ -315,120 +397,19 @@ class RoundStatusPanel(ft.ExpansionPanel, AppControl):
         Returns:
             tuple[int, str]: 0 = unconfirmed, 1 = error, 2 = all correct and error message
         """
-        round_confirmed = (self.pairing.result_status == "C")
-        missing_feedbacks_team, extra_feedbacks_team, orallists = self.verify_status_team("no-one" if self.round.silent or self.round.stage == "E" else None)
-        missing_feedbacks_adj, extra_feedbacks_adj = self.verify_status_adj("no-adjs" if self.round.stage == "E" else None)
-        is_err = False
-        text_error = ""
-        text_missing = [f"{try_string(lambda: src.name)}→{try_string(lambda: dest.name)}" for src, dest in missing_feedbacks_adj]
-        text_missing.extend([f"{try_string(lambda: team.short_name)}→{try_string(lambda: adj.name) if adj!='orallist' else 'orallist'}" for team, adj in missing_feedbacks_team])
-        if text_missing:
-            is_err = True
-            text_error += "Missing feedbacks: " + ", ".join(text_missing) + "\n"
-        text_extra = [f"{try_string(lambda: fb.source.name)}→{try_string(lambda: fb.adjudicator.name)}" for fb in extra_feedbacks_adj+extra_feedbacks_team]
-        if text_extra:
-            is_err = True
-            text_error += "Extra feedbacks: " + ", ".join(text_extra) + "\n"
-        if orallists is not None and len(orallists) != 1:
-            is_err = True
-            text_error += "Multiple orallists: " + ", ".join([try_string(lambda: adj.name) for adj in orallists]) + "\n"
-        if not round_confirmed:
-            return 0, "Round unconfirmed"
-        if is_err:
-            return 1, text_error[:-1]
-        return 2, "All feedbacks are correct"
-    
-    def verify_status_team(self, fb_team: TeamFeedbackDirection|None = None) -> tuple[list[tuple[tc.models.Team, tc.models.Adjudicator|Literal["orallist"]]], list[tc.models.Feedback], list[tc.models.Adjudicator]|None]:
-        if fb_team is None:
-            fb_team = self.app.tournament._links.preferences.find(identifier="feedback__feedback_from_teams").value
-        adjs: list[tuple[Literal["c", "p", "t"], tc.models.Adjudicator]] = []
-        if self.pairing.adjudicators.chair:
-            adjs.append(("c", self.pairing.adjudicators.chair))
-        if self.pairing.adjudicators.panellists:
-            for panellist in self.pairing.adjudicators.panellists:
-                adjs.append(("p", panellist))
-        if self.pairing.adjudicators.trainees:
-            for trainee in self.pairing.adjudicators.trainees:
-                adjs.append(("t", trainee))
-        match fb_team:
-            case "orallist":
-                orallists = {
-                    fb.adjudicator.url for fb in self.feedbacks if fb.confirmed and isinstance(fb.source, tc.models.Team)
-                }
-                missing_feedbacks = [
-                    (dt.team, "orallist")
-                    for dt in self.pairing.teams
-                    if not any(fb.source == dt.team and fb.confirmed for fb in self.feedbacks)
-                ]
-                return missing_feedbacks, [], [self.app.tournament._links.adjudicators.find(url=url) for url in orallists]
-            case "all-adjs":
-                missing_feedbacks = [
-                    (dt.team, adj)
-                    for dt in self.pairing.teams
-                    for _, adj in adjs
-                    if not any(fb.source == dt.team and fb.adjudicator == adj and fb.confirmed for fb in self.feedbacks)
-                ]
-                return missing_feedbacks, [], None
-            case "no-one":
-                return [], [fb for fb in self.feedbacks if isinstance(fb.source, tc.models.Team)], None
-    
-    def verify_status_adj(self, fb_adj: AdjFeedbackDirection|None = None) -> tuple[list[tuple[tc.models.Adjudicator, tc.models.Adjudicator]], list[tc.models.Feedback]]:
-        if fb_adj is None:
-            fb_adj = self.app.tournament._links.preferences.find(identifier="feedback__feedback_paths").value
-        # Check adjudicators
-        adjs: list[tuple[Literal["c", "p", "t"], tc.models.Adjudicator]] = []
-        if self.pairing.adjudicators.chair:
-            adjs.append(("c", self.pairing.adjudicators.chair))
-        if self.pairing.adjudicators.panellists:
-            for panellist in self.pairing.adjudicators.panellists:
-                adjs.append(("p", panellist))
-        if self.pairing.adjudicators.trainees:
-            for trainee in self.pairing.adjudicators.trainees:
-                adjs.append(("t", trainee))
-        is_necessary: tuple[tuple[bool, bool, bool], tuple[bool, bool, bool], tuple[bool, bool, bool]] = None
-        match fb_adj:
-            case "minimal":
-                is_necessary = ((True, True, True), (False, False, False), (False, False, False))
-            case "with-p-on-c":
-                is_necessary = ((True, True, True), (True, False, False), (False, False, False))
-            case "with-t-on-c":
-                is_necessary = ((True, True, True), (True, False, False), (True, False, False))
-            case "all-adjs":
-                is_necessary = ((True, True, True), (True, True, True), (True, True, True))
-            case "with-p-on-p":
-                is_necessary = ((True, True, True), (True, True, False), (True, False, False))
-            case "no-adjs":
-                is_necessary = ((False, False, False), (False, False, False), (False, False, False))
-            case _:
-                raise ValueError(f"Invalid feedback path: {fb_adj}")
-        dict_pos: dict[Literal["c", "p", "t"], int] = {"c": 0, "p": 1, "t": 2}
-        necessity_matrix = {
-            adj_src.url: {
-                adj_dest.url: is_necessary[dict_pos[p_src]][dict_pos[p_dest]] if adj_src != adj_dest else False
-                for p_dest, adj_dest in adjs
-            }
-            for p_src, adj_src in adjs
-        }
-        
-        extra_feedbacks: list[tc.models.Feedback] = []
-        for fb in self.feedbacks:
-            if not fb.confirmed or isinstance(fb.source, tc.models.Team):
-                continue
-            necessity = necessity_matrix[fb.source.url][fb.adjudicator.url]
-            if not necessity:
-                extra_feedbacks.append(fb)
-            necessity_matrix[fb.source.url][fb.adjudicator.url] = False
-        missing_feedbacks: list[tuple[tc.models.Adjudicator, tc.models.Adjudicator]] = [
-            (self.app.tournament._links.adjudicators.find(url=url_src), self.app.tournament._links.adjudicators.find(url=url_dest))
-            for url_src, m in necessity_matrix.items()
-            for url_dest, b in m.items()
-            if b
-        ]
-        return missing_feedbacks, extra_feedbacks
+        result = self.verify()
+        analysis = self.app.analyze_ballots(self.pairing)
+        if not analysis:
+            return result.status, result.message
+        status = debate_status(result, analysis)
+        message = result.error_message if status == 1 and result.has_error else result.message if status == 0 else ""
+        return status, "\n".join(line for line in (message, "Ballots: " + analysis.message) if line)
+    
+    def verify(self) -> VerificationResult:
+        return self.app.verify_debate(self.pairing, self.round)
     
     def sync_data(self):
         self.ballots = list(self.pairing._links.ballots)
-        self.feedbacks = [fb for fb in self.app.tournament._links.feedback if fb.debate == self.pairing]
         def get_ballot_text(ballot: tc.models.Ballot):
             res = ""
             if ballot.confirmed:
@@ -451,21 +432,47 @@ class RoundStatusPanel(ft.ExpansionPanel, AppControl):
                 ) for i, ballot in enumerate(self.ballots)
             ]
         )
-        self.dropdown_ballot.value = next((str(i) for i, ballot in enumerate(self.ballots) if ballot.confirmed), len(self.ballots) - 1)
+        default = next((str(i) for i, ballot in enumerate(self.ballots) if ballot.confirmed), str(len(self.ballots) - 1))
+        if self.selected_ballot == "":
+            self.dropdown_ballot.value = "-1"
+        else:
+            self.dropdown_ballot.value = next((str(i) for i, ballot in enumerate(self.ballots) if ballot.url == self.selected_ballot), default)
 
 class RoundStatusTab(ft.Tab, AppControl):
+    """Tab for a single round, whose debate panels are only built once the tab is selected, one page at a time
+    """
     round: tc.models.Round
+    loaded: bool = False
+    page_index: int = 0
     
     def __init__(self, round: tc.models.Round):
         self.round = round
         self.expansion_panels = ft.ExpansionPanelList(
             [],
             divider_color=ft.Colors.BLACK,
-            expanded_header_padding=ft.padding.symmetric(vertical=24)
-            
+            expanded_header_padding=ft.padding.symmetric(vertical=24),
+            on_change=self.on_change_panel
+        )
+        self.text_page = ft.Text()
+        self.button_prev = ft.IconButton(
+            ft.Icons.CHEVRON_LEFT,
+            on_click=self.on_prev_page
+        )
+        self.button_next = ft.IconButton(
+            ft.Icons.CHEVRON_RIGHT,
+            on_click=self.on_next_page
+        )
+        self.row_pages = ft.Row(
+            [
+                self.button_prev,
+                self.text_page,
+                self.button_next
+            ],
+            visible=False
         )
         self.col_content = ft.Column(
             [
+                self.row_pages,
                 self.expansion_panels
             ],
             expand=True,
@@ -489,27 +496,81 @@ class RoundStatusTab(ft.Tab, AppControl):
             )
         )
     
+    def load(self):
+        """Builds the debate panels the first time the tab is selected"""
+        if self.loaded:
+            return
+        self.loaded = True
+        self.set_debates()
+    
+    def set_status(self):
+        """Sets the tab icon from the verification of every debate of the round, whether or not their panels are built"""
+        ballot_flags = self.app.store.ballot_analysis.analyze_round(self.round, self.app.score_rules())
+        all_ok = all(debate_status(self.app.verify_debate(pairing, self.round), ballot_flags.get(pairing.url)) == 2 for pairing in self.round._links.pairing)
+        name = ft.Icons.CHECK_CIRCLE if all_ok else ft.Icons.ERROR
+        if self.icon_tab.name != name:
+            self.icon_tab.name = name
+            self.icon_tab.color = ft.Colors.GREEN_ACCENT_400 if all_ok else ft.Colors.RED_ACCENT_400
+            self.icon_tab.update()
+    
     def set_debates(self):
-        LOGGER.info(f"Loading debates for round {self.round.name}")
-        panels = [
-            RoundStatusPanel(pairing, self.round) for pairing in self.round._links.pairing
-        ]
-        self.expansion_panels.controls = panels
-        self.update()
-        all_ok = all(p.get_verify_status()[0] == 2 for p in panels)
-        self.icon_tab.name = ft.Icons.CHECK_CIRCLE if all_ok else ft.Icons.ERROR
-        self.icon_tab.color = ft.Colors.GREEN_ACCENT_400 if all_ok else ft.Colors.RED_ACCENT_400
+        """Sets the tab status, and if the tab was opened shows the debates of the current page, creating panels for new or redrawn debates and patching the others only if their data changed"""
+        self.set_status()
+        if not self.loaded:
+            return
+        pairings = list(self.round._links.pairing)
+        num_pages = max(1, math.ceil(len(pairings) / ROUND_STATUS_PAGE_SIZE))
+        self.page_index = min(self.page_index, num_pages - 1)
+        start = self.page_index * ROUND_STATUS_PAGE_SIZE
+        existing: dict[str, RoundStatusPanel] = {panel.pairing.url: panel for panel in self.expansion_panels.controls}
+        panels: list[RoundStatusPanel] = []
+        created, patched = 0, 0
+        for pairing in pairings[start:start + ROUND_STATUS_PAGE_SIZE]:
+            panel = existing.get(pairing.url)
+            if panel is None or panel.draw != draw_fingerprint(pairing):
+                panel = RoundStatusPanel(pairing, self.round)
+                created += 1
+            elif panel.patch(pairing, self.round):
+                patched += 1
+            panels.append(panel)
+        if created or len(panels) != len(self.expansion_panels.controls):
+            self.expansion_panels.controls = panels
+            self.row_pages.visible = num_pages > 1
+            self.text_page.value = f"{start + 1}-{start + len(panels)} of {len(pairings)}"
+            self.button_prev.disabled = self.page_index == 0
+            self.button_next.disabled = self.page_index == num_pages - 1
+            self.update()
+        LOGGER.info(f"Debates of round {self.round.name}: {created} created, {patched} updated, {len(panels) - created - patched} unchanged")
+    
+    def on_change_panel(self, e):
+        index = int(e.data)
+        if 0 <= index < len(self.expansion_panels.controls):
+            self.expansion_panels.controls[index].build_body()
+    
+    def on_prev_page(self, e):
+        self.page_index -= 1
+        self.set_debates()
+    
+    def on_next_page(self, e):
+        self.page_index += 1
+        self.set_debates()
+    
+    def set_missing(self, missing: int):
+        self.icon_tab.badge = ft.Badge(text=str(missing)) if missing else None
+        self.icon_tab.tooltip = f"{missing} feedback missing" if missing else None
         self.icon_tab.update()
     
     @wait_finish
     async def on_refresh(self, e):
         # Load all pairings
-        await asyncio.gather(self.round._links.pairing.load(force=True), self.app.tournament._links.feedback.load(force=True))
-        # Load all ballots
         await asyncio.gather(
-            *[pairing._links.ballots.load(force=True) for pairing in self.round._links.pairing]
+            self.app.load_pairings([self.round], Priority.INTERACTIVE),
+            self.app.update_feedback(priority=Priority.INTERACTIVE)
         )
+        # Reload all ballots of the round
+        await self.app.load_ballots([self.round], full=True, priority=Priority.INTERACTIVE)
         self.set_debates()
+        self.app.publish("round_status", [self.round.url])
         self.page.open(
             ft.SnackBar(
                 content=ft.Text(f"Updated {try_string(lambda: self.round.name)} successfully", color=ft.Colors.BLACK),
@@ -517,24 +578,159 @@ class RoundStatusTab(ft.Tab, AppControl):
             )
         )
 
+class DebateSummaryRow(ft.DataRow):
+    def __init__(self, summary: DebateSummary, on_open: Callable[[DebateSummary], None]):
+        icon, color = [
+            (ft.Icons.ERROR, ft.Colors.RED_ACCENT_400),
+            (ft.Icons.FLAG_CIRCLE, ft.Colors.AMBER_ACCENT_400),
+            (ft.Icons.CHECK_CIRCLE, ft.Colors.GREEN_ACCENT_400),
+        ][summary.status]
+        super().__init__(
+            [
+                ft.DataCell(ft.Text(try_string(lambda: summary.round.abbreviation))),
+                ft.DataCell(ft.Text(SUMMARY_COLUMNS[1][1](summary))),
+                ft.DataCell(ft.Text(SUMMARY_COLUMNS[2][1](summary))),
+                ft.DataCell(ft.Icon(icon, color=color)),
+                ft.DataCell(
+                    ft.Text(
+                        BALLOT_STATUS_TEXT.get(summary.result_status, try_string(lambda: summary.result_status)),
+                        color=ft.Colors.RED_ACCENT_700 if summary.missing_ballot else ft.Colors.AMBER_800 if summary.unconfirmed_ballot else None
+                    )
+                ),
+                ft.DataCell(ft.Text(str(summary.missing_feedback), color=ft.Colors.RED_ACCENT_700 if summary.missing_feedback else None)),
+                ft.DataCell(ft.Text(str(summary.extra_feedback), color=ft.Colors.AMBER_800 if summary.extra_feedback else None)),
+                ft.DataCell(ft.Icon(ft.Icons.WARNING, color=ft.Colors.AMBER_800) if summary.multiple_orallists else ft.Text("")),
+                ft.DataCell(ft.Text(str(len(summary.ballot_flags)), color=ft.Colors.AMBER_800 if summary.ballot_flags else None, tooltip="\n".join(summary.ballot_flags) or None)),
+            ],
+            on_select_changed=lambda e: on_open(summary)
+        )
+
+class RoundStatusSummary(ft.Column, AppControl):
+    """Sortable table of the status of every debate of every round, built from the memoized verification and ballot analysis instead of the debate panels
+    """
+    summaries: list[DebateSummary]
+    sort_column: int = 3
+    sort_ascending: bool = True
+    
+    def __init__(self):
+        self.summaries = []
+        self.switch_problems = ft.Switch(
+            label="Problems only",
+            value=True,
+            on_change=self.on_change_filter
+        )
+        self.text_count = ft.Text()
+        self.data_table = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text(title), numeric=numeric, on_sort=self.on_sort)
+                for title, _, numeric in SUMMARY_COLUMNS
+            ],
+            sort_column_index=self.sort_column,
+            sort_ascending=self.sort_ascending,
+            show_checkbox_column=False,
+            expand=True
+        )
+        super().__init__(
+            [
+                ft.Row([self.switch_problems, self.text_count]),
+                ft.Row([self.data_table], scroll=ft.ScrollMode.AUTO),
+            ],
+            expand=True,
+            scroll=ft.ScrollMode.AUTO,
+            visible=False
+        )
+    
+    def set_summaries(self):
+        self.summaries = self.app.debate_summaries()
+        self.set_rows()
+    
+    def set_rows(self):
+        summaries = [s for s in self.summaries if s.has_problem] if self.switch_problems.value else list(self.summaries)
+        key = SUMMARY_COLUMNS[self.sort_column][1]
+        summaries.sort(key=key, reverse=not self.sort_ascending)
+        self.text_count.value = f"{sum(s.has_problem for s in self.summaries)} of {len(self.summaries)} debates with problems"
+        self.data_table.sort_column_index = self.sort_column
+        self.data_table.sort_ascending = self.sort_ascending
+        self.data_table.rows = [DebateSummaryRow(s, self.open_debate) for s in summaries]
+        self.update()
+    
+    def on_sort(self, e: ft.DataColumnSortEvent):
+        self.sort_column = e.column_index
+        self.sort_ascending = e.ascending
+        self.set_rows()
+    
+    def on_change_filter(self, e):
+        self.set_rows()
+    
+    def open_debate(self, summary: DebateSummary):
+        """Shows the detailed panel of a debate, built only when asked for"""
+        panel = RoundStatusPanel(summary.pairing, summary.round)
+        self.page.open(
+            ft.AlertDialog(
+                title=ft.Text(f"{try_string(lambda: summary.round.name)}: {SUMMARY_COLUMNS[1][1](summary)}"),
+                content=ft.Column(
+                    [ft.ExpansionPanelList([panel])],
+                    width=800,
+                    scroll=ft.ScrollMode.AUTO
+                )
+            )
+        )
+        panel.build_body()
+
 class RoundStatusPagelet(ft.Pagelet, AppControl):
     tab_round: dict[int, RoundStatusTab]
+    required_collections = ("teams", "speakers", "adjudicators", "rounds", "feedback", "preferences")
+    topics = ("rounds", "feedback", "round_status")
     
     def __init__(self):
         self.tabs_round = ft.Tabs(
             [],
             expand=True,
-            scrollable=True
+            scrollable=True,
+            on_change=self.on_change_tab
+        )
+        self.summary = RoundStatusSummary()
+        self.segmented_view = ft.SegmentedButton(
+            segments=[
+                ft.Segment("rounds", label=ft.Text("Rounds"), icon=ft.Icon(ft.Icons.VIEW_AGENDA)),
+                ft.Segment("summary", label=ft.Text("Summary"), icon=ft.Icon(ft.Icons.TABLE_ROWS)),
+            ],
+            selected={"rounds"},
+            on_change=self.on_change_view
+        )
+        self.progress_export = ft.ProgressBar(
+            value=0,
+            width=200,
+            visible=False
+        )
+        self.switch_live = ft.Switch(
+            label="Live",
+            value=False,
+            tooltip="Keep the selected round up to date while ballots are being entered",
+            on_change=self.on_change_live
         )
         super().__init__(
             ft.Column(
                 [
-                    ft.ElevatedButton(
-                        "Update",
-                        icon=ft.Icons.SYNC,
-                        on_click=self.on_btn_update
+                    ft.Row(
+                        [
+                            ft.ElevatedButton(
+                                "Update",
+                                icon=ft.Icons.SYNC,
+                                on_click=self.on_btn_update
+                            ),
+                            ft.OutlinedButton(
+                                "Export",
+                                icon=ft.Icons.DOWNLOAD,
+                                on_click=self.on_btn_export
+                            ),
+                            self.switch_live,
+                            self.segmented_view,
+                            self.progress_export,
+                        ]
                     ),
-                    self.tabs_round
+                    self.tabs_round,
+                    self.summary
                 ],
                 expand=True,
             ),
@@ -543,31 +739,215 @@ class RoundStatusPagelet(ft.Pagelet, AppControl):
     
     async def set_tabbycat(self):
         await asyncio.gather(
-            *[round._links.pairing.load() for round in self.app.tournament._links.rounds],
-        )
-        await asyncio.gather(
-            *[pairing._links.ballots.load() for round in self.app.tournament._links.rounds for pairing in round._links.pairing]
+            *[self.app.request(round._links.pairing.load, Priority.BULK, label="pairings") for round in self.app.tournament._links.rounds],
         )
+        await self.app.load_ballots(self.app.tournament._links.rounds, priority=Priority.BULK)
         self.set_tabs()
     
     def set_tabs(self):
-        tabs = [
-            RoundStatusTab(round) for round in self.app.tournament._links.rounds
-        ]
-        self.tabs_round.tabs = tabs
-        self.update()
+        existing: dict[str, RoundStatusTab] = {tab.round.url: tab for tab in self.tabs_round.tabs}
+        tabs: list[RoundStatusTab] = []
+        for round in self.app.tournament._links.rounds:
+            tab = existing.get(round.url)
+            if tab is None:
+                tab = RoundStatusTab(round)
+            else:
+                tab.round = round
+            tabs.append(tab)
+        if [id(tab) for tab in tabs] != [id(tab) for tab in self.tabs_round.tabs]:
+            self.tabs_round.tabs = tabs
+            self.update()
         for tab in tabs:
             tab.set_debates()
+        if tabs:
+            tabs[min(self.tabs_round.selected_index or 0, len(tabs) - 1)].load()
+        self.set_compliance()
+        self.set_live()
+        if self.summary.visible:
+            self.summary.set_summaries()
+    
+    def on_change_view(self, e):
+        show_summary = "summary" in json.loads(e.data)
+        self.tabs_round.visible = not show_summary
+        self.summary.visible = show_summary
+        self.update()
+        if show_summary:
+            self.summary.set_summaries()
+    
+    def on_change_tab(self, e):
+        self.tabs_round.tabs[self.tabs_round.selected_index].load()
+        self.set_live()
+    
+    def on_change_live(self, e):
+        self.set_live()
+    
+    def set_live(self):
+        """Has the poller of the tournament watch the selected round while live mode is on"""
+        poller = self.app.store.poller
+        tabs = self.tabs_round.tabs
+        if self.switch_live.value and tabs:
+            round = tabs[min(self.tabs_round.selected_index or 0, len(tabs) - 1)].round
+            poller.watch(self.page.session_id, round, lambda: self.visible is not False and self.app.foreground)
+        else:
+            poller.unwatch(self.page.session_id)
+    
+    def set_compliance(self):
+        """Shows the number of missing feedback of each round, from the tournament-wide compliance matrix"""
+        missing = self.app.compliance().missing_by_round()
+        for tab in self.tabs_round.tabs:
+            tab.set_missing(missing.get(tab.round.url, 0))
+    
+    async def on_store_change(self, topic: str, payload: Any):
+        if topic == "rounds":
+            await self.set_tabbycat()
+            return
+        # Pairings and ballots are loaded into the shared round objects, so only the affected tabs have to be rebuilt
+        if topic == "feedback":
+            debates: set[str] = payload.debates
+            rounds = {tab.round.url for tab in self.tabs_round.tabs if any(pairing.url in debates for pairing in tab.round._links.pairing)}
+        else:
+            rounds = set(payload)
+        for tab in self.tabs_round.tabs:
+            if tab.round.url in rounds:
+                tab.set_debates()
+        self.set_compliance()
+        if self.summary.visible:
+            self.summary.set_summaries()
     
     @wait_finish
     async def on_btn_update(self, e):
         # Load all pairings
         await asyncio.gather(
-            self.app.tournament._links.feedback.load(force=True),
-            *[round._links.pairing.load(force=True) for round in self.app.tournament._links.rounds]
-        )
-        # Load all ballots
-        await asyncio.gather(
-            *[pairing._links.ballots.load(force=True) for round in self.app.tournament._links.rounds for pairing in round._links.pairing]
+            self.app.update_feedback(),
+            self.app.load_pairings(self.app.tournament._links.rounds)
         )
+        # Reload all ballots, a confirmed ballot may have been edited without its result status changing
+        await self.app.load_ballots(self.app.tournament._links.rounds, full=True)
         self.set_tabs()
+        self.app.publish("round_status", [round.url for round in self.app.tournament._links.rounds])
+
+    
+    @wait_finish
+    async def on_btn_export(self, e):
+        rounds = list(self.app.tournament._links.rounds)
+        dropdown_rounds = ft.Dropdown(
+            label="Rounds",
+            options=[
+                ft.DropdownOption(key="all", text="All rounds"),
+                *[ft.DropdownOption(key=round.url, text=try_string(lambda: round.name)) for round in rounds]
+            ],
+            value="all"
+        )
+        radio_destination = ft.RadioGroup(
+            ft.Column(
+                [
+                    ft.Radio(value="csv", label="CSV file"),
+                    ft.Radio(value="sheets", label="New sheet in a Google Spreadsheet"),
+                ]
+            ),
+            value="csv"
+        )
+        future_options = asyncio.Future()
+        def on_close(result: Optional[tuple[str, str]]):
+            self.page.close(dlg_options)
+            future_options.set_result(result)
+        dlg_options = ft.AlertDialog(
+            modal=True,
+            title=ft.Text("Export missing feedback and ballots"),
+            content=ft.Column(
+                [
+                    dropdown_rounds,
+                    radio_destination
+                ],
+                tight=True
+            ),
+            actions=[
+                ft.TextButton(
+                    "Export",
+                    on_click=lambda _: on_close((dropdown_rounds.value, radio_destination.value))
+                ),
+                ft.TextButton(
+                    "Cancel",
+                    on_click=lambda _: on_close(None)
+                )
+            ]
+        )
+        self.page.open(dlg_options)
+        options = await future_options
+        if options is None:
+            return
+        scope, destination = options
+        if scope != "all":
+            rounds = [round for round in rounds if round.url == scope]
+        timestamp = datetime.now()
+        if destination == "sheets":
+            if not self.page.auth:
+                raise ExpectedError("Not logged in to Google")
+            future_file = asyncio.Future()
+            self.page.open(
+                GoogleFilePicker(
+                    ft.Text("Select a spreadsheet to export to"),
+                    mime_type=["application/vnd.google-apps.spreadsheet"],
+                    on_result=future_file.set_result
+                )
+            )
+            result: GoogleFilePickerResultEvent = await future_file
+            if not result.data:
+                return
+            writer = SheetsReportWriter(
+                self.app.google_service("sheets", "v4"),
+                result.data.get("id"),
+                f"Feedback report {timestamp.strftime('%Y-%m-%d %H.%M.%S')}"
+            )
+            await writer.open()
+            url = f"https://docs.google.com/spreadsheets/d/{result.data.get('id')}"
+            download = None
+        else:
+            download = self.app.downloads.create(f"{self.app.tournament.slug}-report-{timestamp.strftime('%Y%m%d-%H%M%S')}.csv")
+            writer = CsvReportWriter(download.path)
+            url = None
+        self.page.run_task(self.run_export, rounds, writer, url, download)
+    
+    async def run_export(self, rounds: list[tc.models.Round], writer: ReportWriter, url: Optional[str], download: Optional[Download] = None):
+        """Streams the report in the background, showing the progress in the toolbar
+        
+        Args:
+            rounds (list[tc.models.Round]): Rounds to export
+            writer (ReportWriter): Writer of the rows
+            url (Optional[str]): URL to open the report at, None if it is a file to download
+            download (Optional[Download], optional): File the writer writes to, published once complete. Defaults to None.
+        """
+        self.progress_export.value = 0
+        self.progress_export.visible = True
+        self.progress_export.update()
+        def on_progress(done: int, total: int):
+            # Update the bar every percent only, not on every debate
+            if done == total or done / total - self.progress_export.value >= 0.01:
+                self.progress_export.value = done / total
+                self.progress_export.update()
+        try:
+            num_rows = await export_report(rounds, self.app.verify_debate, writer, on_progress, self.app.analyze_ballots)
+        except Exception as e:
+            LOGGER.error("Failed to export the report", exc_info=e)
+            if download is not None:
+                self.app.downloads.discard(download)
+            self.page.open(
+                ft.SnackBar(
+                    ft.Text(f"Failed to export: {type(e).__name__}: {e}", color=ft.Colors.BLACK),
+                    bgcolor=ft.Colors.RED_100
+                )
+            )
+            return
+        finally:
+            self.progress_export.visible = False
+            self.progress_export.update()
+        if download is not None:
+            url = self.app.downloads.publish(download)
+        self.page.open(
+            ft.SnackBar(
+                ft.Text(f"Exported {num_rows} rows", color=ft.Colors.BLACK),
+                bgcolor=ft.Colors.GREEN_100,
+                action="Open",
+                on_action=lambda _: self.page.launch_url(url)
+            )
+        )
\ No newline at end of file
@@ -34,6 +34,10 @@ class LoginCard(ft.Card, AppControl):
         self.button_slug = ft.ElevatedButton(
             text="Login"
         )
+        self.check_force_reload = ft.Checkbox(
+            label="Force full reload (ignore data cached from the previous session)",
+            value=False
+        )
         self.col_select_tournament = ft.Column(
             [
                 ft.Divider(),
@@ -56,6 +60,7 @@ class LoginCard(ft.Card, AppControl):
                         ft.Text("Login with URL and Token", theme_style=ft.TextThemeStyle.TITLE_MEDIUM),
                         self.input_url,
                         self.input_token,
+                        self.check_force_reload,
                         self.button_load,
                         self.col_select_tournament
                     ],
@@ -126,7 +131,7 @@ class LoginCard(ft.Card, AppControl):
             raise ValueError(f"Tournament {slug} not found")
     
     async def login(self, client: tc.Client, tournament: tc.models.Tournament, storage_key: str):
-        await self.app.set_tabbycat(client, tournament, storage_key)
+        await self.app.set_tabbycat(client, tournament, storage_key, force=self.check_force_reload.value)
         self.page.open(
             ft.SnackBar(
                 content=ft.Text(f"Logged in to {tournament.name}", color=ft.Colors.BLACK),
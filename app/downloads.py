@@ -0,0 +1,90 @@
+import asyncio
+from dataclasses import dataclass
+from functools import cache
+import logging
+import os
+import shutil
+import time
+from typing import Optional
+from urllib.parse import quote
+import uuid
+
+LOGGER = logging.getLogger(__name__)
+PRIVATE_FILES_DIR = os.getenv("PRIVATE_FILES_DIR", "storage/private")
+# Also read by Flet, outside the assets so that uploaded files are not served
+UPLOAD_DIR = os.getenv("FLET_UPLOAD_DIR", "storage/uploads")
+DOWNLOADS_TTL = float(os.getenv("DOWNLOADS_TTL", 600))
+
+def get_downloads_dir() -> str:
+    """Get the directory of the assets which the downloads are served from, as /downloads"""
+    return os.path.join(os.getenv("FLET_ASSETS_DIR", "assets"), "downloads")
+
+@cache
+def purge_stale_downloads(ttl: float = DOWNLOADS_TTL):
+    """Deletes the downloads left by a previous process, once per process"""
+    for root in (PRIVATE_FILES_DIR, get_downloads_dir()):
+        if not os.path.isdir(root):
+            continue
+        for entry in os.scandir(root):
+            if entry.is_dir() and time.time() - entry.stat().st_mtime > ttl:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+@dataclass
+class Download:
+    token: str
+    file_name: str
+    # Where the file is written, outside the assets
+    path: str
+    url: Optional[str] = None
+
+class SessionDownloads:
+    """Files offered for download to a session.
+    
+    A file is written outside the assets, and only moved to `/downloads/<random token>/<file name>` once complete, so it can only be fetched by whoever was given its URL.
+    It is deleted `ttl` seconds after being published, when discarded or when the session closes.
+    """
+    ttl: float
+    __downloads: dict[str, Download]
+    __timers: dict[str, asyncio.TimerHandle]
+    
+    def __init__(self, ttl: float = DOWNLOADS_TTL):
+        self.ttl = ttl
+        self.__downloads = {}
+        self.__timers = {}
+        purge_stale_downloads(ttl)
+    
+    def create(self, file_name: str) -> Download:
+        """Reserves a private path to write a file to, to be published or discarded"""
+        token = uuid.uuid4().hex
+        download = Download(token, file_name, os.path.join(PRIVATE_FILES_DIR, token, file_name))
+        os.makedirs(os.path.dirname(download.path), exist_ok=True)
+        self.__downloads[token] = download
+        return download
+    
+    def publish(self, download: Download) -> str:
+        """Moves a written file to its download URL, which expires after `ttl` seconds
+        
+        Returns:
+            str: URL of the file
+        """
+        directory = os.path.join(get_downloads_dir(), download.token)
+        os.makedirs(directory, exist_ok=True)
+        shutil.move(download.path, os.path.join(directory, download.file_name))
+        shutil.rmtree(os.path.dirname(download.path), ignore_errors=True)
+        download.url = f"/downloads/{download.token}/{quote(download.file_name)}"
+        self.__timers[download.token] = asyncio.get_running_loop().call_later(self.ttl, self.discard, download)
+        LOGGER.info(f"Published {download.file_name} for {self.ttl:.0f}s")
+        return download.url
+    
+    def discard(self, download: Download):
+        """Deletes a file, whether it was published or not"""
+        if (timer := self.__timers.pop(download.token, None)) is not None:
+            timer.cancel()
+        self.__downloads.pop(download.token, None)
+        shutil.rmtree(os.path.dirname(download.path), ignore_errors=True)
+        shutil.rmtree(os.path.join(get_downloads_dir(), download.token), ignore_errors=True)
+    
+    def close(self):
+        """Deletes every file of the session"""
+        for download in list(self.__downloads.values()):
+            self.discard(download)
\ No newline at end of file
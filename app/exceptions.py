@@ -1,2 +1,13 @@
 class ExpectedError(Exception):
-    """Expected error for @wait_finish decorator"""
\ No newline at end of file
+    """Expected error for @wait_finish decorator"""
+
+class PipelineCancelled(Exception):
+    """A slide pipeline was cancelled, it stopped before its next batch"""
+
+class CollectionLoadError(ExpectedError):
+    """Some collections of a tournament failed to load, the others were loaded"""
+    failed: dict[str, Exception]
+    
+    def __init__(self, failed: dict[str, Exception]):
+        self.failed = failed
+        super().__init__(f"Failed to load {', '.join(sorted(failed))}")
\ No newline at end of file
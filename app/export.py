@@ -0,0 +1,153 @@
+import asyncio
+import csv
+import logging
+import os
+from typing import Any, Callable, Iterable, Optional, Protocol
+
+import tabbycat_api as tc
+from .ballot_analysis import BallotAnalysis
+from .base import try_string
+from .google_api import execute_async
+from .verification import VerificationResult, get_name
+
+LOGGER = logging.getLogger(__name__)
+EXPORT_SHEETS_BATCH_ROWS = int(os.getenv("EXPORT_SHEETS_BATCH_ROWS", 500))
+REPORT_HEADER = ["Round", "Venue", "Teams", "Ballot", "Issue", "From", "To"]
+BALLOT_STATUS_TEXT = {"N": "Missing", "D": "Unconfirmed", "C": "Confirmed", "P": "Postponed"}
+
+def report_rows(round: tc.models.Round, pairing: tc.models.RoundPairing, result: VerificationResult, analysis: Optional[BallotAnalysis] = None) -> list[list[str]]:
+    """Get the rows of a debate: one for a ballot which is not confirmed, one per missing or extra feedback, and one per ballot flag"""
+    debate = [
+        try_string(lambda: round.abbreviation),
+        try_string(lambda: pairing.venue.display_name),
+        " vs. ".join(try_string(lambda: dt.team.short_name) for dt in pairing.teams),
+        BALLOT_STATUS_TEXT.get(pairing.result_status, try_string(lambda: pairing.result_status)),
+    ]
+    rows: list[list[str]] = []
+    if pairing.result_status in ("N", "D"):
+        rows.append(debate + [f"Ballot {BALLOT_STATUS_TEXT.get(pairing.result_status, 'unknown').lower()}", "", ""])
+    for team, adj in result.missing_team:
+        rows.append(debate + ["Missing feedback", get_name(team, "short_name"), "Orallist" if adj == "orallist" else get_name(adj)])
+    for src, dest in result.missing_adj:
+        rows.append(debate + ["Missing feedback", get_name(src), get_name(dest)])
+    for fb in result.extra_team + result.extra_adj:
+        rows.append(debate + ["Extra feedback", get_name(fb.source, "short_name" if isinstance(fb.source, tc.models.Team) else "name"), get_name(fb.adjudicator)])
+    if result.orallists is not None and len(result.orallists) > 1:
+        rows.append(debate + ["Multiple orallists", "", ", ".join(get_name(adj) for adj in result.orallists)])
+    for flag in analysis.flags if analysis else ():
+        rows.append(debate + [f"Ballot flag ({flag.kind})", flag.message, ""])
+    return rows
+
+class ReportWriter(Protocol):
+    async def write(self, rows: list[list[str]]): ...
+    async def close(self): ...
+
+class CsvReportWriter:
+    """Writes the rows to a CSV file as they come"""
+    path: str
+    
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.__file = open(path, "w", newline="", encoding="utf-8-sig")
+        self.__writer = csv.writer(self.__file)
+    
+    async def write(self, rows: list[list[str]]):
+        self.__writer.writerows(rows)
+    
+    async def close(self):
+        self.__file.close()
+
+class SheetsReportWriter:
+    """Writes the rows to a new sheet of a spreadsheet, in `values.batchUpdate` calls of up to `batch_rows` rows"""
+    service: Any
+    spreadsheet_id: str
+    title: str
+    batch_rows: int
+    __sheet_id: Optional[int] = None
+    __row_count: int = 0
+    __next_row: int = 1
+    __buffer: list[list[str]]
+    
+    def __init__(self, service: Any, spreadsheet_id: str, title: str, batch_rows: int = EXPORT_SHEETS_BATCH_ROWS):
+        self.service = service
+        self.spreadsheet_id = spreadsheet_id
+        self.title = title
+        self.batch_rows = batch_rows
+        self.__buffer = []
+    
+    async def open(self):
+        """Adds the sheet to write to"""
+        response = await execute_async(self.service.spreadsheets().batchUpdate(
+            spreadsheetId=self.spreadsheet_id,
+            body={"requests": [{"addSheet": {"properties": {"title": self.title}}}]}
+        ))
+        properties = response["replies"][0]["addSheet"]["properties"]
+        self.__sheet_id = properties["sheetId"]
+        self.__row_count = properties["gridProperties"]["rowCount"]
+    
+    async def write(self, rows: list[list[str]]):
+        self.__buffer.extend(rows)
+        if len(self.__buffer) >= self.batch_rows:
+            await self.flush()
+    
+    async def flush(self):
+        if not self.__buffer:
+            return
+        rows, self.__buffer = self.__buffer, []
+        missing_rows = self.__next_row + len(rows) - 1 - self.__row_count
+        if missing_rows > 0:
+            # values.batchUpdate does not grow the grid, so the sheet is extended by at least a batch
+            await execute_async(self.service.spreadsheets().batchUpdate(
+                spreadsheetId=self.spreadsheet_id,
+                body={"requests": [{"appendDimension": {"sheetId": self.__sheet_id, "dimension": "ROWS", "length": max(missing_rows, self.batch_rows)}}]}
+            ))
+            self.__row_count += max(missing_rows, self.batch_rows)
+        await execute_async(self.service.spreadsheets().values().batchUpdate(
+            spreadsheetId=self.spreadsheet_id,
+            body={
+                "valueInputOption": "RAW",
+                "data": [{"range": f"'{self.title}'!A{self.__next_row}", "majorDimension": "ROWS", "values": rows}]
+            }
+        ))
+        self.__next_row += len(rows)
+    
+    async def close(self):
+        await self.flush()
+
+async def export_report(
+    rounds: Iterable[tc.models.Round],
+    verify: Callable[[tc.models.RoundPairing, tc.models.Round], VerificationResult],
+    writer: ReportWriter,
+    on_progress: Optional[Callable[[int, int], Any]] = None,
+    analyze: Optional[Callable[[tc.models.RoundPairing], BallotAnalysis]] = None
+) -> int:
+    """Streams the missing and extra feedback, the unconfirmed ballots and the ballot flags of the rounds to a writer, debate by debate
+    
+    Args:
+        rounds (Iterable[tc.models.Round]): Rounds with their pairings loaded
+        verify (Callable[[tc.models.RoundPairing, tc.models.Round], VerificationResult]): Verification of a debate, e.g. `TabbycatApp.verify_debate`
+        writer (ReportWriter): Destination of the rows
+        on_progress (Optional[Callable[[int, int], Any]], optional): Called with the number of debates done and the total. Defaults to None.
+        analyze (Optional[Callable[[tc.models.RoundPairing], BallotAnalysis]], optional): Ballot analysis of a debate, e.g. `TabbycatApp.analyze_ballots`. Defaults to None, without ballot flags.
+    
+    Returns:
+        int: Number of rows written, without the header
+    """
+    debates = [(round, pairing) for round in rounds for pairing in round._links.pairing or ()]
+    num_rows = 0
+    try:
+        await writer.write([REPORT_HEADER])
+        for i, (round, pairing) in enumerate(debates):
+            rows = report_rows(round, pairing, verify(pairing, round), analyze(pairing) if analyze is not None else None)
+            if rows:
+                await writer.write(rows)
+                num_rows += len(rows)
+            if on_progress is not None:
+                on_progress(i + 1, len(debates))
+            # Let the UI and the other sessions run between debates
+            await asyncio.sleep(0)
+    finally:
+        await writer.close()
+    LOGGER.info(f"Exported {num_rows} rows for {len(debates)} debates")
+    return num_rows
\ No newline at end of file
@@ -0,0 +1,147 @@
+import asyncio
+from dataclasses import dataclass, field
+import logging
+import os
+import time
+from typing import Any, Hashable, Iterator, Optional
+
+import tabbycat_api as tc
+from .scheduler import Priority, RequestScheduler
+
+LOGGER = logging.getLogger(__name__)
+FEEDBACK_SYNC_INTERVAL = float(os.getenv("FEEDBACK_SYNC_INTERVAL", 2))
+
+def feedback_signature(feedback: tc.models.Feedback) -> tuple:
+    """Get the values of a feedback which change when it is resubmitted, confirmed or ignored"""
+    return (
+        getattr(feedback, "version", None),
+        getattr(feedback, "timestamp", None),
+        getattr(feedback, "confirmed", None),
+        getattr(feedback, "ignored", None),
+    )
+
+def debate_url(feedback: tc.models.Feedback) -> Optional[str]:
+    return getattr(getattr(feedback, "debate", None), "url", None)
+
+@dataclass
+class FeedbackDelta:
+    """Feedback added, changed or removed by a single sync"""
+    added: list[tc.models.Feedback] = field(default_factory=list)
+    changed: list[tc.models.Feedback] = field(default_factory=list)
+    removed: list[tc.models.Feedback] = field(default_factory=list)
+    full: bool = False
+    
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+    
+    @property
+    def debates(self) -> set[str]:
+        """URLs of the debates whose feedback changed"""
+        return {url for fb in self.added + self.changed + self.removed if (url := debate_url(fb))}
+
+class FeedbackSync:
+    """Change detector over the feedback of a tournament, merging each load into the previously loaded objects.
+    
+    tabbycat_api only lists the whole feedback collection, with no filter by round, debate or time, so every sync transfers all of it.
+    What is saved is the work downstream: each sync reports which feedback was added, changed or removed, and only the debates it touches need to be re-checked.
+    Feedback whose signature did not change keeps the object loaded first, so references held by the dependent views stay valid.
+    The tournament store serves this as the "feedback" collection, so every view sees the same objects.
+    Concurrent syncs are joined instead of restarted, and syncs within `FEEDBACK_SYNC_INTERVAL` seconds of the last one are skipped.
+    The feedback is also grouped by debate, updated from the delta of each sync, so that views can get the feedback of a debate in O(1).
+    """
+    collection: Any
+    scheduler: RequestScheduler
+    last_synced: Optional[float] = None
+    __objects: dict[str, tc.models.Feedback]
+    __signatures: dict[str, tuple]
+    __by_debate: dict[str, dict[str, tc.models.Feedback]]
+    __task: Optional[asyncio.Task] = None
+    
+    def __init__(self, collection: Any, scheduler: RequestScheduler):
+        self.collection = collection
+        self.scheduler = scheduler
+        self.__objects = {}
+        self.__signatures = {}
+        self.__by_debate = {}
+    
+    def __iter__(self) -> Iterator[tc.models.Feedback]:
+        return iter(list(self.__objects.values()))
+    
+    def __len__(self) -> int:
+        return len(self.__objects)
+    
+    def get(self, url: str) -> Optional[tc.models.Feedback]:
+        return self.__objects.get(url)
+    
+    def find(self, **kwargs) -> Optional[tc.models.Feedback]:
+        """Finds the first feedback whose attributes have the given values, like `find` of a paginated collection"""
+        if len(kwargs) == 1 and "url" in kwargs:
+            return self.get(kwargs["url"])
+        return next((fb for fb in self.__objects.values() if all(getattr(fb, key, None) == value for key, value in kwargs.items())), None)
+    
+    def for_debate(self, url: str) -> list[tc.models.Feedback]:
+        """Get the feedback submitted for a debate (pairing) by its URL"""
+        return list(self.__by_debate.get(url, {}).values())
+    
+    def __index(self, fb: tc.models.Feedback):
+        if (url := debate_url(fb)) is not None:
+            self.__by_debate.setdefault(url, {})[fb.url] = fb
+    
+    def __unindex(self, fb: tc.models.Feedback):
+        if (url := debate_url(fb)) is not None and (feedbacks := self.__by_debate.get(url)) is not None:
+            feedbacks.pop(fb.url, None)
+            if not feedbacks:
+                del self.__by_debate[url]
+    
+    async def sync(self, full: bool = False, priority: Priority = Priority.NORMAL, owner: Hashable = None) -> FeedbackDelta:
+        """Loads the feedback and merges it into the known objects.
+        
+        Args:
+            full (bool, optional): Reload even if a sync has just finished, and report every feedback as added. Defaults to False.
+            priority (Priority, optional): Priority of the request. Defaults to Priority.NORMAL.
+            owner (Hashable, optional): Owner of the request for fair queuing. Defaults to None.
+        
+        Returns:
+            FeedbackDelta: Feedback added, changed or removed since the last sync
+        """
+        if self.__task is not None and not self.__task.done():
+            LOGGER.debug("Feedback sync in progress, joining")
+            return await asyncio.shield(self.__task)
+        if not full and self.last_synced is not None and time.time() - self.last_synced < FEEDBACK_SYNC_INTERVAL:
+            return FeedbackDelta()
+        self.__task = asyncio.create_task(self.__sync(full, priority, owner))
+        return await asyncio.shield(self.__task)
+    
+    async def __sync(self, full: bool, priority: Priority, owner: Hashable) -> FeedbackDelta:
+        await self.scheduler.submit(lambda: self.collection.load(force=True), priority=priority, owner=owner, label="feedback")
+        if full:
+            self.__objects.clear()
+            self.__signatures.clear()
+            self.__by_debate.clear()
+        delta = FeedbackDelta(full=full)
+        objects: dict[str, tc.models.Feedback] = {}
+        signatures: dict[str, tuple] = {}
+        for fb in self.collection:
+            signature = feedback_signature(fb)
+            known = self.__objects.get(fb.url)
+            if known is None:
+                delta.added.append(fb)
+            elif self.__signatures[fb.url] != signature:
+                delta.changed.append(fb)
+            else:
+                fb = known
+            objects[fb.url] = fb
+            signatures[fb.url] = signature
+        delta.removed.extend(fb for url, fb in self.__objects.items() if url not in objects)
+        for fb in delta.removed:
+            self.__unindex(fb)
+        for fb in delta.changed:
+            self.__unindex(self.__objects[fb.url])
+            self.__index(fb)
+        for fb in delta.added:
+            self.__index(fb)
+        self.__objects = objects
+        self.__signatures = signatures
+        self.last_synced = time.time()
+        LOGGER.info(f"Synced feedback: {len(delta.added)} added, {len(delta.changed)} changed, {len(delta.removed)} removed")
+        return delta
\ No newline at end of file
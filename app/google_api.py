@@ -0,0 +1,135 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+from google.auth.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest, build_http
+import httplib2
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from .metrics import get_metrics
+
+LOGGER = logging.getLogger(__name__)
+GOOGLE_API_MAX_WORKERS = int(os.getenv("GOOGLE_API_MAX_WORKERS", 8))
+GOOGLE_API_TIMEOUT = float(os.getenv("GOOGLE_API_TIMEOUT", 60))
+GOOGLE_API_PIPELINE_WORKERS = int(os.getenv("GOOGLE_API_PIPELINE_WORKERS", 2))
+_executor: Optional[ThreadPoolExecutor] = None
+_pipeline_executor: Optional[ThreadPoolExecutor] = None
+_local = threading.local()
+
+@functools.cache
+def get_discovery_document(service_name: str, version: str) -> dict:
+    """Loads the discovery document bundled with googleapiclient once per process
+    
+    The parsed document is shared by every service built from it, `build_from_document` only adds the same default parameters to it.
+    """
+    document = get_static_doc(service_name, version)
+    if document is None:
+        raise ValueError(f"No bundled discovery document for {service_name} {version}")
+    return json.loads(document)
+
+def get_thread_http() -> httplib2.Http:
+    """Get the HTTP connections of the current thread, kept open between calls as httplib2 is not thread-safe"""
+    http = getattr(_local, "http", None)
+    if http is None:
+        http = _local.http = build_http()
+    return http
+
+class ThreadLocalHttpRequest(HttpRequest):
+    """Request sent on the connections of the thread executing it, authorized with the credentials of its service"""
+    def execute(self, http=None, num_retries=0):
+        if http is None:
+            http = get_thread_http()
+            credentials = getattr(self.http, "credentials", None)
+            if credentials is not None:
+                http = AuthorizedHttp(credentials, http=http)
+        return super().execute(http=http, num_retries=num_retries)
+
+def build_service(service_name: str, version: str, credentials: Credentials) -> Any:
+    """Builds a Google API service from the cached discovery document, without any network access
+    
+    Args:
+        service_name (str): e.g. "drive"
+        version (str): e.g. "v3"
+        credentials (Credentials): Credentials to authorize the requests with, refreshed by the requests when expired
+    """
+    return build_from_document(
+        get_discovery_document(service_name, version),
+        credentials=credentials,
+        requestBuilder=ThreadLocalHttpRequest
+    )
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get the thread pool shared by every session to run the blocking Google API calls"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=GOOGLE_API_MAX_WORKERS, thread_name_prefix="google-api")
+    return _executor
+
+def get_pipeline_executor() -> ThreadPoolExecutor:
+    """Get the thread pool running long jobs made of many calls, such as slide pipelines with their backoffs, so they never hold the threads of the calls made from the UI"""
+    global _pipeline_executor
+    if _pipeline_executor is None:
+        _pipeline_executor = ThreadPoolExecutor(max_workers=GOOGLE_API_PIPELINE_WORKERS, thread_name_prefix="google-api-pipeline")
+    return _pipeline_executor
+
+async def run_blocking(fn: Callable[..., Any], *args, timeout: Optional[float] = None, executor: Optional[ThreadPoolExecutor] = None, **kwargs) -> Any:
+    """Runs a blocking function on a Google API thread pool without blocking the event loop
+    
+    A thread cannot be interrupted: if the timeout expires or the caller is cancelled, the call keeps running in its thread until it finishes, but its result is discarded.
+    Long jobs have to check for cancellation themselves, like `SlidePipeline`.
+    
+    Args:
+        fn (Callable[..., Any]): Function to run
+        timeout (Optional[float], optional): Seconds to wait for the result. Defaults to None, waiting until it finishes.
+        executor (Optional[ThreadPoolExecutor], optional): Thread pool to run on. Defaults to the pool of the calls made from the UI.
+    
+    Raises:
+        TimeoutError: If the function did not finish within `timeout` seconds
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(executor or get_executor(), functools.partial(fn, *args, **kwargs))
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        LOGGER.warning(f"{getattr(fn, '__qualname__', fn)} timed out after {timeout}s, discarding its result")
+        raise TimeoutError(f"Google API call timed out after {timeout}s")
+
+def execute(request: HttpRequest, **kwargs) -> Any:
+    """Executes a Google API request, recording its latency, payload size and errors under its method id (e.g. slides.presentations.batchUpdate)"""
+    metrics = get_metrics()
+    endpoint = getattr(request, "methodId", None) or "unknown"
+    size = 0
+    postproc = getattr(request, "postproc", None)
+    def measured_postproc(response, content):
+        nonlocal size
+        size = len(content or b"")
+        return postproc(response, content)
+    if postproc is not None:
+        request.postproc = measured_postproc
+    start = time.perf_counter()
+    try:
+        result = request.execute(**kwargs)
+    except HttpError as e:
+        metrics.record("google", endpoint, time.perf_counter() - start, size=size, status=str(e.status_code), error=True)
+        raise
+    except Exception as e:
+        metrics.record("google", endpoint, time.perf_counter() - start, size=size, status=type(e).__name__, error=True)
+        raise
+    finally:
+        if postproc is not None:
+            request.postproc = postproc
+    metrics.record("google", endpoint, time.perf_counter() - start, size=size, status="200")
+    return result
+
+async def execute_async(request: HttpRequest, *, timeout: Optional[float] = GOOGLE_API_TIMEOUT, **kwargs) -> Any:
+    """Executes a Google API request on the thread pool, see `execute` and `run_blocking`"""
+    return await run_blocking(execute, request, timeout=timeout, **kwargs)
\ No newline at end of file
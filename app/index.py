@@ -0,0 +1,64 @@
+import logging
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+import tabbycat_api as tc
+
+LOGGER = logging.getLogger(__name__)
+
+IndexKey = Callable[[Any], Hashable]
+
+def attribute_key(name: str) -> IndexKey:
+    return lambda obj: getattr(obj, name, None)
+
+def team_reference_institution_key(team: tc.models.Team) -> tuple:
+    """Key of a team by (reference, institution code), which is how the team importer identifies teams"""
+    return (team.reference, team.institution.code if team.institution else None)
+
+INDEX_KEYS: dict[str, dict[str, IndexKey]] = {
+    "institutions": {"url": attribute_key("url"), "code": attribute_key("code")},
+    "teams": {"url": attribute_key("url"), "reference": attribute_key("reference"), "reference_institution": team_reference_institution_key},
+    "break_categories": {"url": attribute_key("url"), "slug": attribute_key("slug")},
+    "speaker_categories": {"url": attribute_key("url"), "slug": attribute_key("slug")},
+    "adjudicators": {"url": attribute_key("url"), "name": attribute_key("name")},
+    "preferences": {"identifier": attribute_key("identifier")},
+}
+DEFAULT_INDEX_KEYS: dict[str, IndexKey] = {"url": attribute_key("url")}
+
+class CollectionIndex:
+    """Hash indexes over a loaded paginated collection, replacing the linear scan of `find(key=value)`.
+    
+    The index is a snapshot of the collection and has to be rebuilt after the collection is reloaded.
+    When several objects share a key, the first one wins, like `find`.
+    """
+    __indexes: dict[str, dict[Hashable, Any]]
+    
+    def __init__(self, objects: Iterable[Any], keys: dict[str, IndexKey]):
+        self.__indexes = {name: {} for name in keys}
+        for obj in objects:
+            for name, key in keys.items():
+                try:
+                    value = key(obj)
+                    if value is None or value is tc.NULL:
+                        continue
+                    self.__indexes[name].setdefault(value, obj)
+                except (AttributeError, TypeError):
+                    # Unhashable or missing values are not indexed
+                    continue
+    
+    @classmethod
+    def for_collection(cls, name: str, objects: Iterable[Any]) -> "CollectionIndex":
+        return cls(objects, INDEX_KEYS.get(name, DEFAULT_INDEX_KEYS))
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.__indexes
+    
+    def get(self, key: str, value: Hashable) -> Optional[Any]:
+        """Get the object whose `key` is `value`, None if there is none
+        
+        Raises:
+            KeyError: If `key` is not indexed
+        """
+        try:
+            return self.__indexes[key].get(value)
+        except TypeError:
+            return None
\ No newline at end of file
@@ -0,0 +1,244 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Iterator, Optional
+
+LOGGER = logging.getLogger(__name__)
+METRICS_PORT = os.getenv("METRICS_PORT")
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+@dataclass
+class EndpointStats:
+    """Counters and latency histogram of a single endpoint"""
+    calls: int = 0
+    errors: int = 0
+    retries: int = 0
+    bytes: int = 0
+    latency_sum: float = 0.0
+    latency_max: float = 0.0
+    # Count per bucket of LATENCY_BUCKETS, the last one is +Inf
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    statuses: dict[str, int] = field(default_factory=dict)
+    
+    @property
+    def latency_mean(self) -> float:
+        return self.latency_sum / self.calls if self.calls else 0.0
+    
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket containing the quantile, the maximum for the +Inf bucket"""
+        if not self.calls:
+            return 0.0
+        rank = q * self.calls
+        count = 0
+        for i, n in enumerate(self.buckets):
+            count += n
+            if count >= rank:
+                return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.latency_max
+        return self.latency_max
+    
+    def copy(self) -> "EndpointStats":
+        return EndpointStats(
+            self.calls,
+            self.errors,
+            self.retries,
+            self.bytes,
+            self.latency_sum,
+            self.latency_max,
+            list(self.buckets),
+            dict(self.statuses)
+        )
+
+class MetricsRegistry:
+    """Process-wide per-endpoint metrics of the outgoing calls.
+    
+    Endpoints are keyed by service (e.g. `tabbycat`, `google`, `images`, `ui`) and a low cardinality endpoint name.
+    Recording is a lock and a few integer additions, so it is left on in production.
+    """
+    __stats: dict[tuple[str, str], EndpointStats]
+    __lock: threading.Lock
+    started_at: float
+    
+    def __init__(self):
+        self.__stats = {}
+        self.__lock = threading.Lock()
+        self.started_at = time.time()
+    
+    def __get(self, service: str, endpoint: str) -> EndpointStats:
+        stats = self.__stats.get((service, endpoint))
+        if stats is None:
+            stats = self.__stats[(service, endpoint)] = EndpointStats()
+        return stats
+    
+    def record(self, service: str, endpoint: str, latency: float, *, size: int = 0, status: Optional[str] = None, error: bool = False):
+        """Records a finished call
+        
+        Args:
+            service (str): Service called
+            endpoint (str): Endpoint name, without ids
+            latency (float): Duration in seconds
+            size (int, optional): Response payload in bytes. Defaults to 0.
+            status (str, optional): Status code or exception name. Defaults to None.
+            error (bool, optional): Whether the call failed. Defaults to False.
+        """
+        with self.__lock:
+            stats = self.__get(service, endpoint)
+            stats.calls += 1
+            stats.errors += error
+            stats.bytes += size
+            stats.latency_sum += latency
+            stats.latency_max = max(stats.latency_max, latency)
+            stats.buckets[bisect_left(LATENCY_BUCKETS, latency)] += 1
+            if status is not None:
+                stats.statuses[status] = stats.statuses.get(status, 0) + 1
+    
+    def record_retry(self, service: str, endpoint: str):
+        with self.__lock:
+            self.__get(service, endpoint).retries += 1
+    
+    @contextmanager
+    def timer(self, service: str, endpoint: str) -> Iterator[None]:
+        """Records the duration of the `with` block, as an error if it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            self.record(service, endpoint, time.perf_counter() - start, status=type(e).__name__, error=True)
+            raise
+        self.record(service, endpoint, time.perf_counter() - start)
+    
+    def snapshot(self) -> dict[tuple[str, str], EndpointStats]:
+        """Get a copy of the stats of every endpoint"""
+        with self.__lock:
+            return {key: stats.copy() for key, stats in self.__stats.items()}
+    
+    def reset(self):
+        with self.__lock:
+            self.__stats.clear()
+            self.started_at = time.time()
+    
+    def render_prometheus(self) -> str:
+        """Renders the metrics in the Prometheus text exposition format"""
+        def escape(value: str) -> str:
+            return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        snapshot = sorted(self.snapshot().items())
+        lines = []
+        for name, kind, help, value in [
+            ("tcm_calls_total", "counter", "Calls per endpoint", lambda s: s.calls),
+            ("tcm_errors_total", "counter", "Failed calls per endpoint", lambda s: s.errors),
+            ("tcm_retries_total", "counter", "Retried calls per endpoint", lambda s: s.retries),
+            ("tcm_response_bytes_total", "counter", "Response payload bytes per endpoint", lambda s: s.bytes),
+        ]:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (service, endpoint), stats in snapshot:
+                lines.append(f"{name}{{service=\"{escape(service)}\",endpoint=\"{escape(endpoint)}\"}} {value(stats)}")
+        lines.append("# HELP tcm_latency_seconds Latency per endpoint")
+        lines.append("# TYPE tcm_latency_seconds histogram")
+        for (service, endpoint), stats in snapshot:
+            labels = f"service=\"{escape(service)}\",endpoint=\"{escape(endpoint)}\""
+            count = 0
+            for bound, n in zip(LATENCY_BUCKETS + (float("inf"),), stats.buckets):
+                count += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"tcm_latency_seconds_bucket{{{labels},le=\"{le}\"}} {count}")
+            lines.append(f"tcm_latency_seconds_sum{{{labels}}} {stats.latency_sum}")
+            lines.append(f"tcm_latency_seconds_count{{{labels}}} {stats.calls}")
+        return "\n".join(lines) + "\n"
+
+@cache
+def get_metrics() -> MetricsRegistry:
+    """Get the process-wide metrics registry"""
+    return MetricsRegistry()
+
+def tabbycat_endpoint(request: httpx.Request) -> str:
+    """Normalizes a Tabbycat API request, e.g. GET /api/v1/tournaments/{slug}/rounds/{id}/pairings"""
+    path = re.sub(r"/\d+(?=/|$)", "/{id}", request.url.path)
+    path = re.sub(r"(/tournaments/)[^/{]+", r"\1{slug}", path)
+    return f"{request.method} {path}"
+
+def host_endpoint(request: httpx.Request) -> str:
+    """Names a request by its host only, for arbitrary URLs such as images"""
+    return f"{request.method} {request.url.host}"
+
+def instrument_httpx(client: httpx.AsyncClient, service: str, endpoint: Callable[[httpx.Request], str] = host_endpoint):
+    """Records every request of an httpx client through event hooks
+    
+    Args:
+        client (httpx.AsyncClient): Client to instrument, only the first call has an effect
+        service (str): Service name of the requests
+        endpoint (Callable[[httpx.Request], str], optional): Names the endpoint of a request. Defaults to host_endpoint.
+    """
+    metrics = get_metrics()
+    
+    async def on_request(request: httpx.Request):
+        request.extensions["metrics_start"] = time.perf_counter()
+    
+    async def on_response(response: httpx.Response):
+        # Read the body here so that the latency and size include the payload; httpx keeps it for the caller
+        await response.aread()
+        start = response.request.extensions.get("metrics_start")
+        metrics.record(
+            service,
+            endpoint(response.request),
+            time.perf_counter() - start if start is not None else 0.0,
+            size=len(response.content),
+            status=str(response.status_code),
+            error=response.is_error
+        )
+    
+    if getattr(client, "_metrics_service", None) is not None:
+        return
+    hooks = client.event_hooks
+    client.event_hooks = {"request": [*hooks["request"], on_request], "response": [*hooks["response"], on_response]}
+    client._metrics_service = service
+
+def find_httpx_client(obj: Any) -> Optional[httpx.AsyncClient]:
+    """Finds the httpx client held by an API client, such as `tc.Client`"""
+    for value in vars(obj).values():
+        if isinstance(value, httpx.AsyncClient):
+            return value
+    return None
+
+def instrument_tabbycat(client: Any):
+    """Records the requests of a `tc.Client`, if it exposes its httpx client"""
+    if (httpx_client := find_httpx_client(client)) is None:
+        LOGGER.debug("No httpx client found on the Tabbycat client, only the scheduler metrics are recorded")
+        return
+    instrument_httpx(httpx_client, "tabbycat", tabbycat_endpoint)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = get_metrics().render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        LOGGER.debug(format, *args)
+
+def start_metrics_server(port: Optional[int] = None, host: str = METRICS_HOST) -> Optional[ThreadingHTTPServer]:
+    """Serves the metrics in the Prometheus text format on a daemon thread. Does nothing if no port is given or set in METRICS_PORT.
+    
+    Only listens on localhost by default, set METRICS_HOST (e.g. 0.0.0.0) to let a scraper on another host in.
+    """
+    port = port or (int(METRICS_PORT) if METRICS_PORT else None)
+    if not port:
+        return None
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    LOGGER.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return server
\ No newline at end of file
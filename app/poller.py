@@ -0,0 +1,136 @@
+from __future__ import annotations
+import asyncio
+from dataclasses import dataclass
+import logging
+import os
+from typing import Callable, Hashable, Optional, TYPE_CHECKING
+
+import tabbycat_api as tc
+from .scheduler import Priority
+if TYPE_CHECKING:
+    from .store import TournamentStore
+
+LOGGER = logging.getLogger(__name__)
+LIVE_POLL_MIN_INTERVAL = float(os.getenv("LIVE_POLL_MIN_INTERVAL", 5))
+LIVE_POLL_MAX_INTERVAL = float(os.getenv("LIVE_POLL_MAX_INTERVAL", 60))
+# Result statuses of a debate whose ballot entry is finished: confirmed or postponed
+FINISHED_RESULT_STATUSES = ("C", "P")
+
+def ballot_signature(ballot: tc.models.Ballot) -> tuple:
+    return (
+        ballot.url,
+        getattr(ballot, "version", None),
+        getattr(ballot, "timestamp", None),
+        getattr(ballot, "confirmed", None),
+        getattr(ballot, "discarded", None),
+    )
+
+def round_signature(round: tc.models.Round) -> tuple:
+    """Get a value which changes whenever a debate of the round, its result status or its ballots change"""
+    return tuple(
+        (pairing.url, pairing.result_status, tuple(ballot_signature(ballot) for ballot in pairing._links.ballots))
+        for pairing in round._links.pairing
+    )
+
+@dataclass
+class _Watcher:
+    round_url: str
+    is_visible: Callable[[], bool]
+
+class LivePoller:
+    """Polls the pairings, ballots and feedback of the rounds watched by the sessions of a tournament.
+    
+    There is one poller per store, so several sessions watching the same round share the same requests.
+    Polls run one after the other and go through the coalescing loads of the store, so a slow server makes the poller wait instead of stacking requests.
+    The interval is `LIVE_POLL_MIN_INTERVAL` while ballots are missing or something changed, and doubles up to `LIVE_POLL_MAX_INTERVAL` while the rounds are complete, no watcher is visible or the polls fail.
+    Changes are published as "round_status" with the URLs of the changed rounds, and "feedback" by the feedback sync.
+    """
+    store: TournamentStore
+    interval: float
+    __watchers: dict[Hashable, _Watcher]
+    __signatures: dict[str, tuple]
+    __task: Optional[asyncio.Task] = None
+    __wakeup: asyncio.Event
+    
+    def __init__(self, store: TournamentStore):
+        self.store = store
+        self.interval = LIVE_POLL_MIN_INTERVAL
+        self.__watchers = {}
+        self.__signatures = {}
+        self.__wakeup = asyncio.Event()
+    
+    @property
+    def running(self) -> bool:
+        return self.__task is not None and not self.__task.done()
+    
+    @property
+    def watchers(self) -> int:
+        return len(self.__watchers)
+    
+    def watch(self, session: Hashable, round: tc.models.Round, is_visible: Callable[[], bool] = lambda: True):
+        """Starts polling a round for a session, replacing the round it watched before
+        
+        Args:
+            session (Hashable): Session watching the round
+            round (tc.models.Round): Round to poll
+            is_visible (Callable[[], bool], optional): Whether the session currently shows the round. Defaults to always.
+        """
+        self.__watchers[session] = _Watcher(round.url, is_visible)
+        self.interval = LIVE_POLL_MIN_INTERVAL
+        self.__wakeup.set()
+        if not self.running:
+            LOGGER.info(f"Starting live polling of {self.store.key}")
+            self.__task = asyncio.create_task(self.__run())
+    
+    def unwatch(self, session: Hashable):
+        if self.__watchers.pop(session, None) is not None and not self.__watchers and self.running:
+            LOGGER.info(f"Stopping live polling of {self.store.key}")
+            self.__task.cancel()
+            # The cancelled task only stops at its next await, a watch in the meantime has to start a new one
+            self.__task = None
+            self.__signatures.clear()
+    
+    async def __run(self):
+        while self.__watchers:
+            self.__wakeup.clear()
+            try:
+                changed, complete = await self.poll()
+                if changed or not complete:
+                    self.interval = LIVE_POLL_MIN_INTERVAL
+                else:
+                    self.interval = min(self.interval * 2, LIVE_POLL_MAX_INTERVAL)
+            except Exception as e:
+                self.interval = min(self.interval * 2, LIVE_POLL_MAX_INTERVAL)
+                LOGGER.warning(f"Live polling of {self.store.key} failed, retrying in {self.interval:.0f}s ({type(e).__name__}: {e})")
+            if not any(watcher.is_visible() for watcher in self.__watchers.values()):
+                self.interval = LIVE_POLL_MAX_INTERVAL
+            try:
+                await asyncio.wait_for(self.__wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def poll(self) -> tuple[bool, bool]:
+        """Reloads the watched rounds and the feedback once, and publishes the rounds which changed
+        
+        Returns:
+            tuple[bool, bool]: Whether anything changed, and whether every debate of the watched rounds has a finished result
+        """
+        urls = {watcher.round_url for watcher in self.__watchers.values()}
+        rounds = [round for url in urls if (round := self.store.find("rounds", url=url)) is not None]
+        await asyncio.gather(
+            *[self.store.load_pairings(round, Priority.BULK, owner=self) for round in rounds]
+        )
+        results = await asyncio.gather(
+            self.store.sync_feedback(priority=Priority.BULK, owner=self),
+            *[self.store.load_ballots(round, priority=Priority.BULK, owner=self) for round in rounds]
+        )
+        changed_rounds: list[str] = []
+        for round in rounds:
+            signature = round_signature(round)
+            if self.__signatures.get(round.url) != signature:
+                changed_rounds.append(round.url)
+            self.__signatures[round.url] = signature
+        if changed_rounds:
+            self.store.publish("round_status", changed_rounds)
+        complete = all(pairing.result_status in FINISHED_RESULT_STATUSES for round in rounds for pairing in round._links.pairing)
+        return bool(changed_rounds or results[0]), complete
\ No newline at end of file
@@ -0,0 +1,347 @@
+import asyncio
+import copy
+from dataclasses import dataclass, field
+import hashlib
+import httpx
+import ipaddress
+import logging
+import os
+import socket
+from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE_TYPE
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.slide import Slide
+from pptx.util import Emu
+from typing import Any, Callable, Iterator, Optional
+from urllib.parse import unquote, urljoin, urlparse
+
+from .slides import SlideData, SlideProgress, image_placeholder
+
+LOGGER = logging.getLogger(__name__)
+PPTX_IMAGE_CACHE_DIR = os.getenv("PPTX_IMAGE_CACHE_DIR", "storage/cache/images")
+PPTX_CHUNK_SLIDES = int(os.getenv("PPTX_CHUNK_SLIDES", 20))
+PPTX_MAX_DOWNLOADS = int(os.getenv("PPTX_MAX_DOWNLOADS", 8))
+PPTX_MAX_REDIRECTS = int(os.getenv("PPTX_MAX_REDIRECTS", 5))
+PPTX_MAX_IMAGE_BYTES = int(os.getenv("PPTX_MAX_IMAGE_BYTES", 10 * 1024 * 1024))
+# Reading images from the server's own files is only for rendering offline on a trusted machine
+PPTX_ALLOW_LOCAL_IMAGES = os.getenv("PPTX_ALLOW_LOCAL_IMAGES", "").lower() in ("1", "true", "yes")
+R_NAMESPACE = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+
+def is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address)
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+class ImageCache:
+    """Downloads images to files named after the hash of their URL, so each image is fetched once across renders and read from disk when used.
+    
+    The image URLs come from the users, so only http(s) URLs of hosts resolving to public addresses are fetched, and every redirect is checked the same way.
+    The connection is made to the checked address, so the host cannot resolve to another address in between, and downloads larger than `max_bytes` are abandoned.
+    Local paths and file:// URLs are only used with `allow_local`, which allows rendering offline.
+    """
+    directory: str
+    allow_local: bool
+    max_redirects: int
+    max_bytes: int
+    __client: Optional[httpx.AsyncClient]
+    __fetching: dict[str, asyncio.Task]
+    __semaphore: asyncio.Semaphore
+    
+    def __init__(
+        self,
+        directory: str = PPTX_IMAGE_CACHE_DIR,
+        client: Optional[httpx.AsyncClient] = None,
+        max_downloads: int = PPTX_MAX_DOWNLOADS,
+        *,
+        allow_local: bool = PPTX_ALLOW_LOCAL_IMAGES,
+        max_redirects: int = PPTX_MAX_REDIRECTS,
+        max_bytes: int = PPTX_MAX_IMAGE_BYTES
+    ):
+        """
+        Args:
+            directory (str, optional): Directory of the cached images. Defaults to PPTX_IMAGE_CACHE_DIR.
+            client (Optional[httpx.AsyncClient], optional): Client to download with, images are only looked up in the cache if None. Defaults to None.
+            max_downloads (int, optional): Maximum number of concurrent downloads. Defaults to PPTX_MAX_DOWNLOADS.
+            allow_local (bool, optional): Read local paths and file:// URLs from the server's files. Defaults to PPTX_ALLOW_LOCAL_IMAGES.
+            max_redirects (int, optional): Maximum number of redirects followed by a download. Defaults to PPTX_MAX_REDIRECTS.
+            max_bytes (int, optional): Maximum size of a downloaded image. Defaults to PPTX_MAX_IMAGE_BYTES.
+        """
+        self.directory = directory
+        self.allow_local = allow_local
+        self.max_redirects = max_redirects
+        self.max_bytes = max_bytes
+        self.__client = client
+        self.__fetching = {}
+        self.__semaphore = asyncio.Semaphore(max_downloads)
+        os.makedirs(directory, exist_ok=True)
+    
+    def path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(url.encode()).hexdigest())
+    
+    async def fetch(self, url: str) -> Optional[str]:
+        """Get the path of an image, downloading it if needed, None if it is not available"""
+        parsed = urlparse(url)
+        if parsed.scheme in ("", "file"):
+            if not self.allow_local:
+                LOGGER.warning(f"Skipped local image {url}, set PPTX_ALLOW_LOCAL_IMAGES to allow them")
+                return None
+            local_path = unquote(parsed.path) if parsed.scheme == "file" else url
+            return local_path if os.path.isfile(local_path) else None
+        if parsed.scheme not in ("http", "https"):
+            LOGGER.warning(f"Skipped image {url}, only http and https URLs are fetched")
+            return None
+        path = self.path(url)
+        if os.path.isfile(path):
+            return path
+        if self.__client is None:
+            return None
+        # Renders running at the same time share a download
+        if url not in self.__fetching:
+            self.__fetching[url] = asyncio.create_task(self.__download(url, path))
+        try:
+            return await self.__fetching[url]
+        finally:
+            self.__fetching.pop(url, None)
+    
+    async def check_url(self, url: str) -> str:
+        """Checks that a URL is http(s) and that its host only resolves to public addresses
+        
+        Returns:
+            str: Address of the host to connect to
+        
+        Raises:
+            ValueError: If the URL may not be fetched
+        """
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise ValueError(f"Not an http(s) URL: {url}")
+        infos = await asyncio.get_running_loop().getaddrinfo(parsed.hostname, parsed.port or (443 if parsed.scheme == "https" else 80), type=socket.SOCK_STREAM)
+        addresses = [sockaddr[0] for *_, sockaddr in infos]
+        if not addresses:
+            raise ValueError(f"{parsed.hostname} does not resolve")
+        for address in addresses:
+            if not is_public_address(address):
+                raise ValueError(f"{parsed.hostname} resolves to the non-public address {address}")
+        return addresses[0]
+    
+    def pinned_request(self, url: str, address: str) -> httpx.Request:
+        """Builds a request for a URL connecting to the given address of its host, with the Host header and TLS server name of the host"""
+        original = httpx.URL(url)
+        return self.__client.build_request(
+            "GET",
+            original.copy_with(host=address),
+            headers={"Host": original.netloc.decode("ascii")},
+            extensions={"sni_hostname": original.raw_host.decode("ascii")}
+        )
+    
+    async def __download(self, url: str, path: str) -> Optional[str]:
+        try:
+            async with self.__semaphore:
+                # Redirects are followed one by one, so a public URL cannot redirect to an internal one
+                location = url
+                for _ in range(self.max_redirects + 1):
+                    address = await self.check_url(location)
+                    response = await self.__client.send(self.pinned_request(location, address), stream=True, follow_redirects=False)
+                    if not response.is_redirect:
+                        break
+                    await response.aclose()
+                    location = urljoin(location, response.headers["Location"])
+                else:
+                    raise ValueError(f"More than {self.max_redirects} redirects")
+                try:
+                    response.raise_for_status()
+                    if int(response.headers.get("Content-Length") or 0) > self.max_bytes:
+                        raise ValueError(f"Larger than {self.max_bytes} bytes")
+                    # Streamed to another name first, so neither a large nor a failed download is held in memory or left truncated in the cache
+                    size = 0
+                    with open(f"{path}.part", "wb") as f:
+                        async for chunk in response.aiter_bytes():
+                            size += len(chunk)
+                            if size > self.max_bytes:
+                                raise ValueError(f"Larger than {self.max_bytes} bytes")
+                            f.write(chunk)
+                finally:
+                    await response.aclose()
+            os.replace(f"{path}.part", path)
+            return path
+        except Exception as e:
+            LOGGER.warning(f"Failed to download image {url} ({type(e).__name__}: {e})")
+            if os.path.exists(f"{path}.part"):
+                os.remove(f"{path}.part")
+            return None
+
+@dataclass
+class PptxRenderResult:
+    path: str
+    # (index of the slide, URL of the image) which could not be inserted
+    skipped_images: list[tuple[int, str]] = field(default_factory=list)
+    created: int = 0
+
+def count_slides(path: str) -> int:
+    return len(Presentation(path).slides)
+
+def iter_text_shapes(shapes: Any) -> Iterator[Any]:
+    """Iterates over the shapes with text, including those in groups and tables"""
+    for shape in shapes:
+        if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+            yield from iter_text_shapes(shape.shapes)
+        elif getattr(shape, "has_table", False) and shape.has_table:
+            for row in shape.table.rows:
+                yield from row.cells
+        elif shape.has_text_frame:
+            yield shape
+
+def replace_text(shape: Any, texts: dict[str, str]):
+    """Replaces the placeholders in the paragraphs of a shape, even when PowerPoint split them across runs.
+    
+    A paragraph whose runs are merged keeps the formatting of its first run.
+    """
+    for paragraph in shape.text_frame.paragraphs:
+        runs = paragraph.runs
+        if not runs:
+            continue
+        text = "".join(run.text for run in runs)
+        replaced = text
+        for key, value in texts.items():
+            replaced = replaced.replace(key, value)
+        if replaced == text:
+            continue
+        runs[0].text = replaced
+        for run in runs[1:]:
+            run._r.getparent().remove(run._r)
+
+def duplicate_slide(presentation: Any, template: Slide) -> Slide:
+    """Appends a copy of a slide, with its shapes, background and relationships such as images"""
+    slide = presentation.slides.add_slide(template.slide_layout)
+    rids: dict[str, str] = {}
+    for rid, rel in template.part.rels.items():
+        if rel.reltype in (RT.SLIDE_LAYOUT, RT.NOTES_SLIDE):
+            continue
+        if rel.is_external:
+            rids[rid] = slide.part.rels.get_or_add_ext_rel(rel.reltype, rel.target_ref)
+        else:
+            rids[rid] = slide.part.rels.get_or_add(rel.reltype, rel.target_part)
+    c_sld = copy.deepcopy(template.element.cSld)
+    for element in c_sld.iter():
+        for key, value in element.attrib.items():
+            if key.startswith(R_NAMESPACE) and value in rids:
+                element.set(key, rids[value])
+    # The shapes are swapped inside the tree of the new slide, which `slide.shapes` is bound to
+    tree = slide.element.cSld.spTree
+    for element in list(tree):
+        tree.remove(element)
+    tree.extend(list(c_sld.spTree))
+    if c_sld.bg is not None:
+        slide.element.cSld.insert(0, c_sld.bg)
+    return slide
+
+def fit_picture(slide: Slide, path: str, box: Any):
+    """Adds a picture scaled to fit inside a shape and centered in it, like CENTER_INSIDE in Google Slides"""
+    picture = slide.shapes.add_picture(path, box.left, box.top)
+    scale = min(box.width / picture.width, box.height / picture.height)
+    picture.width, picture.height = Emu(int(picture.width * scale)), Emu(int(picture.height * scale))
+    picture.left = Emu(box.left + (box.width - picture.width) // 2)
+    picture.top = Emu(box.top + (box.height - picture.height) // 2)
+
+class PptxRenderer:
+    """Renders slides to a .pptx file locally from a template presentation, without Google Slides.
+    
+    Like `SlidePipeline`, each slide copies the template for its number of images, replaces the `{{placeholder}}` texts and puts the images into the shapes containing `{{imageN}}`, scaled to fit.
+    The slides are rendered in chunks of `chunk_slides`: the images of a chunk are fetched through the image cache, then the chunk is rendered in a worker thread, which bounds the concurrent downloads.
+    python-pptx keeps every inserted image in memory until the presentation is saved, so a render holds one copy of each distinct image of the deck, up to `PPTX_MAX_IMAGE_BYTES` each, plus the slides themselves.
+    """
+    template_path: str
+    template_slides: dict[int, int]
+    slides: list[SlideData]
+    position: int
+    image_cache: ImageCache
+    chunk_slides: int
+    on_progress: Optional[Callable[[SlideProgress], Any]]
+    result: Optional[PptxRenderResult] = None
+    
+    def __init__(
+        self,
+        template_path: str,
+        template_slides: dict[int, int],
+        slides: list[SlideData],
+        position: int = 0,
+        *,
+        image_cache: Optional[ImageCache] = None,
+        chunk_slides: int = PPTX_CHUNK_SLIDES,
+        on_progress: Optional[Callable[[SlideProgress], Any]] = None
+    ):
+        """
+        Args:
+            template_path (str): Path of the template .pptx file
+            template_slides (dict[int, int]): Index of the template slide to use for each number of institutions, starting from 0
+            slides (list[SlideData]): list of SlideData to render
+            position (int, optional): Position to insert the slides at. Defaults to 0.
+            image_cache (Optional[ImageCache], optional): Cache to get the images from. Defaults to an offline cache in PPTX_IMAGE_CACHE_DIR.
+            chunk_slides (int, optional): Number of slides rendered at a time. Defaults to PPTX_CHUNK_SLIDES.
+            on_progress (Optional[Callable[[SlideProgress], Any]], optional): Called after every chunk. Defaults to None.
+        """
+        self.template_path = template_path
+        self.template_slides = template_slides
+        self.slides = slides
+        self.position = position
+        self.image_cache = image_cache or ImageCache()
+        self.chunk_slides = chunk_slides
+        self.on_progress = on_progress
+    
+    async def render(self, output_path: str) -> PptxRenderResult:
+        """Renders the slides and saves the presentation to `output_path`"""
+        self.result = PptxRenderResult(output_path)
+        presentation = await asyncio.to_thread(Presentation, self.template_path)
+        num_slides = len(presentation.slides)
+        for index in self.template_slides.values():
+            if not 0 <= index < num_slides:
+                raise ValueError(f"Template slide {index + 1} is not in the presentation of {num_slides} slides")
+        if not 0 <= self.position <= num_slides:
+            raise ValueError(f"Invalid slide number to insert after: {self.position}")
+        chunks = [range(start, min(start + self.chunk_slides, len(self.slides))) for start in range(0, len(self.slides), self.chunk_slides)]
+        for n, chunk in enumerate(chunks):
+            paths = await asyncio.gather(
+                *[asyncio.gather(*[self.image_cache.fetch(url) for url in self.slides[i]["images"]]) for i in chunk]
+            )
+            await asyncio.to_thread(self.render_chunk, presentation, chunk, paths)
+            self.result.created += len(chunk)
+            if self.on_progress is not None:
+                self.on_progress(SlideProgress(n + 1, len(chunks), self.result.created, len(self.slides), len(self.result.skipped_images)))
+        await asyncio.to_thread(self.save, presentation, num_slides, output_path)
+        LOGGER.info(f"Rendered {self.result.created} slides in {len(chunks)} chunks to {output_path}, {len(self.result.skipped_images)} images skipped")
+        return self.result
+    
+    def render_chunk(self, presentation: Any, chunk: range, paths: list[list[Optional[str]]]):
+        templates = presentation.slides
+        for i, image_paths in zip(chunk, paths):
+            slide_data = self.slides[i]
+            slide = duplicate_slide(presentation, templates[self.template_slides[len(slide_data["images"])]])
+            slots = {image_placeholder(j): (url, path) for j, (url, path) in enumerate(zip(slide_data["images"], image_paths))}
+            for shape in list(iter_text_shapes(slide.shapes)):
+                # Table cells cannot hold a picture
+                text = shape.text_frame.text if hasattr(shape, "shape_type") else ""
+                slot = next((slot for placeholder, slot in slots.items() if placeholder in text), None)
+                if slot is not None:
+                    url, path = slot
+                    if path is not None:
+                        try:
+                            fit_picture(slide, path, shape)
+                            shape.element.getparent().remove(shape.element)
+                            continue
+                        except Exception as e:
+                            LOGGER.warning(f"Image {url} of slide {i+1} failed ({type(e).__name__}: {e})")
+                    self.result.skipped_images.append((i, url))
+                    shape.text_frame.text = ""
+                    continue
+                replace_text(shape, slide_data["texts"])
+    
+    def save(self, presentation: Any, num_slides: int, output_path: str):
+        """Moves the rendered slides to the position and saves the presentation"""
+        slide_ids = presentation.slides._sldIdLst
+        rendered = list(slide_ids)[num_slides:]
+        for k, element in enumerate(rendered):
+            slide_ids.remove(element)
+            slide_ids.insert(self.position + k, element)
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        presentation.save(output_path)
\ No newline at end of file
@@ -0,0 +1,173 @@
+import asyncio
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from enum import IntEnum
+from functools import cache
+import httpx
+import logging
+import os
+import random
+import time
+from typing import Awaitable, Callable, Hashable, Optional
+
+from .metrics import get_metrics
+
+LOGGER = logging.getLogger(__name__)
+TABBYCAT_MAX_IN_FLIGHT = int(os.getenv("TABBYCAT_MAX_IN_FLIGHT", 8))
+TABBYCAT_MAX_RETRIES = int(os.getenv("TABBYCAT_MAX_RETRIES", 3))
+TABBYCAT_RETRY_BACKOFF = float(os.getenv("TABBYCAT_RETRY_BACKOFF", 0.5))
+TABBYCAT_MAX_RETRY_AFTER = float(os.getenv("TABBYCAT_MAX_RETRY_AFTER", 30))
+
+class Priority(IntEnum):
+    """Priority lanes of the scheduler, lower values are dispatched first"""
+    INTERACTIVE = 0
+    NORMAL = 1
+    BULK = 2
+
+@dataclass
+class _Job:
+    factory: Callable[[], Awaitable]
+    future: asyncio.Future
+    priority: Priority
+    owner: Hashable
+    label: str
+    retry: bool
+    attempt: int = 0
+    task: Optional[asyncio.Task] = None
+    queued_at: float = 0.0
+
+def get_retry_delay(e: Exception, attempt: int, backoff: float = TABBYCAT_RETRY_BACKOFF, max_retry_after: float = TABBYCAT_MAX_RETRY_AFTER) -> Optional[float]:
+    """Get the delay before retrying a failed request, None if it should not be retried
+    
+    Args:
+        e (Exception): Exception raised by the request
+        attempt (int): Number of retries so far
+        backoff (float, optional): Base delay in seconds. Defaults to TABBYCAT_RETRY_BACKOFF.
+        max_retry_after (float, optional): Maximum delay in seconds taken from a Retry-After header. Defaults to TABBYCAT_MAX_RETRY_AFTER.
+    """
+    if isinstance(e, httpx.HTTPStatusError):
+        status = e.response.status_code
+        if status != 429 and status < 500:
+            return None
+        retry_after = e.response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            # A server asking for a longer wait would hold the request and its slot for that long
+            return min(float(retry_after), max_retry_after)
+    elif not isinstance(e, httpx.TransportError):
+        return None
+    return backoff * 2 ** attempt * (1 + random.random() / 2)
+
+class RequestScheduler:
+    """Dispatches requests to a Tabbycat instance with a bounded number in flight.
+    
+    Requests are queued in priority lanes and dispatched from the highest priority lane first.
+    Within a lane, owners (usually sessions) take turns so that one session's bulk load cannot starve the others.
+    Requests failing with 429, 5xx or a transport error are retried with exponential backoff.
+    """
+    max_in_flight: int
+    max_retries: int
+    __lanes: dict[Priority, OrderedDict[Hashable, deque[_Job]]]
+    __in_flight: int
+    
+    def __init__(self, max_in_flight: int = TABBYCAT_MAX_IN_FLIGHT, max_retries: int = TABBYCAT_MAX_RETRIES):
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.__lanes = {priority: OrderedDict() for priority in Priority}
+        self.__in_flight = 0
+    
+    @property
+    def in_flight(self) -> int:
+        return self.__in_flight
+    
+    @property
+    def queued(self) -> int:
+        return sum(len(jobs) for lane in self.__lanes.values() for jobs in lane.values())
+    
+    async def submit[T](
+        self,
+        factory: Callable[[], Awaitable[T]],
+        *,
+        priority: Priority = Priority.NORMAL,
+        owner: Hashable = None,
+        label: str = "",
+        retry: bool = True
+    ) -> T:
+        """Queues a request and waits for its result.
+        
+        Args:
+            factory (Callable[[], Awaitable[T]]): Function creating the request coroutine, called again on every retry
+            priority (Priority, optional): Lane to queue in. Defaults to Priority.NORMAL.
+            owner (Hashable, optional): Owner of the request for fair queuing. Defaults to None.
+            label (str, optional): Label for logging. Defaults to "".
+            retry (bool, optional): Whether to retry on failure. Disable for requests which are not idempotent. Defaults to True.
+        """
+        job = _Job(factory, asyncio.get_running_loop().create_future(), priority, owner, label, retry, queued_at=time.perf_counter())
+        job.future.add_done_callback(lambda f: job.task.cancel() if f.cancelled() and job.task else None)
+        self.__enqueue(job)
+        self.__dispatch()
+        return await job.future
+    
+    def __enqueue(self, job: _Job, front: bool = False):
+        jobs = self.__lanes[job.priority].setdefault(job.owner, deque())
+        if front:
+            jobs.appendleft(job)
+        else:
+            jobs.append(job)
+    
+    def __dequeue(self) -> Optional[_Job]:
+        for lane in self.__lanes.values():
+            while lane:
+                owner, jobs = next(iter(lane.items()))
+                job = jobs.popleft()
+                # Move the owner to the end of the lane to take turns
+                del lane[owner]
+                if jobs:
+                    lane[owner] = jobs
+                if not job.future.done():
+                    return job
+        return None
+    
+    def __dispatch(self):
+        while self.__in_flight < self.max_in_flight and (job := self.__dequeue()) is not None:
+            self.__in_flight += 1
+            job.task = asyncio.create_task(self.__run(job))
+    
+    def __requeue(self, job: _Job):
+        if job.future.done():
+            return
+        job.queued_at = time.perf_counter()
+        self.__enqueue(job, front=True)
+        self.__dispatch()
+    
+    async def __run(self, job: _Job):
+        metrics = get_metrics()
+        endpoint = job.label or "request"
+        start = time.perf_counter()
+        metrics.record("scheduler_queue", endpoint, start - job.queued_at)
+        try:
+            result = await job.factory()
+            metrics.record("scheduler", endpoint, time.perf_counter() - start)
+            if not job.future.done():
+                job.future.set_result(result)
+        except asyncio.CancelledError:
+            job.future.cancel()
+        except Exception as e:
+            status = str(e.response.status_code) if isinstance(e, httpx.HTTPStatusError) else type(e).__name__
+            metrics.record("scheduler", endpoint, time.perf_counter() - start, status=status, error=True)
+            delay = get_retry_delay(e, job.attempt) if job.retry and job.attempt < self.max_retries else None
+            if delay is None:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                job.attempt += 1
+                metrics.record_retry("scheduler", endpoint)
+                LOGGER.warning(f"Request {job.label or job.factory} failed ({type(e).__name__}: {e}), retry {job.attempt}/{self.max_retries} in {delay:.1f}s")
+                asyncio.get_running_loop().call_later(delay, self.__requeue, job)
+        finally:
+            self.__in_flight -= 1
+            self.__dispatch()
+
+@cache
+def get_scheduler(base_url: str) -> RequestScheduler:
+    """Get the process-wide scheduler for a Tabbycat instance"""
+    return RequestScheduler()
\ No newline at end of file
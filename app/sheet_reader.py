@@ -3,7 +3,7 @@ import numpy as np
 import re
 from typing import Any, Callable, Self, override, Optional
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from .google_api import build_service, execute
 
 def to_snake_case(string: str) -> str:
     # Replace spaces and hyphens with underscores
@@ -104,8 +104,8 @@ class SpreadsheetReader(SheetReader):
             spreadsheet_id = url_or_id
         self.spreadsheet_id = spreadsheet_id
         credentials = Credentials(token=access_token)
-        self.service = build("sheets", "v4", credentials=credentials)
-        spreadsheet = self.service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
+        self.service = build_service("sheets", "v4", credentials)
+        spreadsheet = execute(self.service.spreadsheets().get(spreadsheetId=spreadsheet_id))
         self._data = {
             sheet["properties"]["title"]: (sheet["properties"]["gridProperties"]["rowCount"], sheet["properties"]["gridProperties"]["columnCount"]) for sheet in spreadsheet["sheets"]
         }
@@ -121,7 +121,7 @@ class SpreadsheetReader(SheetReader):
         else:
             raise ValueError("Sheet name must be a string or an integer.")
         range = f"{sheet_name}!A1:{column_index_to_letter(size[1])}{size[0]}"
-        _data = self.service.spreadsheets().values().get(spreadsheetId=self.spreadsheet_id, range=range, majorDimension="ROWS").execute()["values"]
+        _data = execute(self.service.spreadsheets().values().get(spreadsheetId=self.spreadsheet_id, range=range, majorDimension="ROWS"))["values"]
         max_length = max([len(row) for row in _data])
         _data = [row + [np.nan] * (max_length - len(row)) for row in _data]
         header = [to_snake_case(cell) if cell and pd.notna(cell) else f"column_{i}" for i, cell in enumerate(_data[0])]
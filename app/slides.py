@@ -0,0 +1,416 @@
+import asyncio
+from dataclasses import dataclass, field
+from googleapiclient.errors import HttpError
+import hashlib
+from httplib2 import HttpLib2Error
+import json
+import logging
+import os
+import random
+import threading
+from typing import Any, Callable, NotRequired, Optional, TypedDict
+import uuid
+
+from .exceptions import PipelineCancelled
+from .google_api import execute, get_pipeline_executor, run_blocking
+
+LOGGER = logging.getLogger(__name__)
+SLIDES_BATCH_REQUESTS = int(os.getenv("SLIDES_BATCH_REQUESTS", 200))
+SLIDES_MAX_RETRIES = int(os.getenv("SLIDES_MAX_RETRIES", 3))
+SLIDES_RETRY_BACKOFF = float(os.getenv("SLIDES_RETRY_BACKOFF", 1.0))
+
+class SlideData(TypedDict):
+    texts: dict[str, str]
+    images: set[str]
+    # Identifies the slide across re-generations within a scope, e.g. "award:<team URL>"
+    key: NotRequired[str]
+
+@dataclass
+class SlideProgress:
+    batches_done: int
+    batches_total: int
+    slides_done: int
+    slides_total: int
+    images_skipped: int
+
+@dataclass
+class SlidePipelineResult:
+    slide_ids: list[str] = field(default_factory=list)
+    # (index of the slide, URL of the image) which could not be inserted
+    skipped_images: list[tuple[int, str]] = field(default_factory=list)
+    substituted_images: list[tuple[int, str]] = field(default_factory=list)
+    created: int = 0
+    kept: int = 0
+    deleted: int = 0
+    calls: int = 0
+    retries: int = 0
+
+def get_retry_delay(e: Exception, attempt: int, backoff: float = SLIDES_RETRY_BACKOFF) -> Optional[float]:
+    """Get the delay before retrying a failed batch, None if it should not be retried"""
+    if isinstance(e, HttpError):
+        if e.status_code != 429 and e.status_code < 500:
+            return None
+    elif not isinstance(e, (TimeoutError, ConnectionError, HttpLib2Error)):
+        return None
+    return backoff * 2 ** attempt * (1 + random.random() / 2)
+
+def digest(value: str, length: int) -> str:
+    return hashlib.sha1(value.encode()).hexdigest()[:length]
+
+def scope_prefix(scope: str) -> str:
+    """Get the prefix of the object IDs of the slides generated in a scope"""
+    return f"tm{digest(scope, 8)}_"
+
+def slide_object_id(scope: str, slide: SlideData, template_id: str) -> str:
+    """Get the object ID of a slide, derived from its scope, key and content so that an unchanged slide keeps its ID"""
+    content = json.dumps([template_id, slide["texts"], sorted(slide["images"])], sort_keys=True)
+    return f"{scope_prefix(scope)}{digest(slide['key'], 12)}_{digest(content, 12)}"
+
+def image_placeholder(i: int) -> str:
+    return f"{{{{image{i+1}}}}}"
+
+def structure_requests(slide: SlideData, slide_id: str, template_id: str, insertion_index: int) -> list[dict]:
+    """Requests duplicating the template of a slide, moving it to the end and replacing its texts"""
+    requests: list[dict] = [
+        {
+            "duplicateObject": {
+                "objectId": template_id,
+                "objectIds": {
+                    template_id: slide_id,
+                }
+            }
+        },
+        # Move slides to the end to avoid confusion when changing position later
+        {
+            "updateSlidesPosition": {
+                "slideObjectIds": [slide_id],
+                "insertionIndex": insertion_index
+            }
+        },
+    ]
+    requests.extend(
+        {
+            "replaceAllText": {
+                "replaceText": replace_str,
+                "pageObjectIds": [slide_id],
+                "containsText": {
+                    "text": key,
+                    "matchCase": True
+                }
+            }
+        } for key, replace_str in slide["texts"].items()
+    )
+    return requests
+
+def image_request(slide_id: str, i: int, url: str) -> dict:
+    return {
+        "replaceAllShapesWithImage": {
+            "imageReplaceMethod": "CENTER_INSIDE",
+            "pageObjectIds": [slide_id],
+            "containsText": {
+                "text": image_placeholder(i),
+                "matchCase": True
+            },
+            "imageUrl": url
+        },
+    }
+
+def clear_placeholder_request(slide_id: str, i: int) -> dict:
+    return {
+        "replaceAllText": {
+            "replaceText": "",
+            "pageObjectIds": [slide_id],
+            "containsText": {
+                "text": image_placeholder(i),
+                "matchCase": True
+            }
+        }
+    }
+
+class SlidePipeline:
+    """Creates slides from templates in size-bounded `batchUpdate` calls.
+    
+    Each batch duplicates, moves and fills a run of slides whose requests fit in `max_requests`, and is retried with exponential backoff on 429, 5xx and transport errors.
+    If a batch is rejected and contains images, it is resent without them and the images are inserted slide by slide, then image by image, so an unreachable image only affects itself.
+    A failing image is replaced by `fallback_image` if given, otherwise its placeholder is cleared.
+    The slides are finally moved to `position` together.
+    
+    With a `scope`, every slide needs a `key` and gets an ID derived from it and its content, so running the pipeline again only deletes the slides of the scope which changed or are gone and creates their replacements.
+    The slides keep the place of the first slide of the scope in the presentation, and are only moved if they are out of order.
+    """
+    service: Any
+    presentation_id: str
+    template_slides: dict[int, str]
+    slides: list[SlideData]
+    position: int
+    num_slides: Optional[int]
+    max_requests: int
+    max_retries: int
+    backoff: float
+    fallback_image: Optional[str]
+    scope: Optional[str]
+    on_progress: Optional[Callable[[SlideProgress], Any]]
+    result: SlidePipelineResult
+    __cancelled: threading.Event
+    
+    def __init__(
+        self,
+        service: Any,
+        presentation_id: str,
+        template_slides: dict[int, str],
+        slides: list[SlideData],
+        position: int = 0,
+        num_slides: Optional[int] = None,
+        *,
+        max_requests: int = SLIDES_BATCH_REQUESTS,
+        max_retries: int = SLIDES_MAX_RETRIES,
+        backoff: float = SLIDES_RETRY_BACKOFF,
+        fallback_image: Optional[str] = None,
+        scope: Optional[str] = None,
+        on_progress: Optional[Callable[[SlideProgress], Any]] = None
+    ):
+        """
+        Args:
+            service (Any): Google Slides API Service
+            presentation_id (str): Presentation file ID to create in
+            template_slides (dict[int, str]): The template slide to use for each number of institutions
+            slides (list[SlideData]): list of SlideData to create
+            position (int, optional): Position to insert slide at. Defaults to 0.
+            num_slides (Optional[int], optional): Number of slides in the presentation, fetched if None. Defaults to None.
+            max_requests (int, optional): Maximum number of requests in a batch. Defaults to SLIDES_BATCH_REQUESTS.
+            max_retries (int, optional): Maximum number of retries of a batch. Defaults to SLIDES_MAX_RETRIES.
+            backoff (float, optional): Base delay between retries in seconds. Defaults to SLIDES_RETRY_BACKOFF.
+            fallback_image (Optional[str], optional): Image URL to use instead of the images which fail. Defaults to None.
+            scope (Optional[str], optional): Set of slides to synchronize with the presentation, e.g. "teams:<tournament URL>". Defaults to None, creating every slide.
+            on_progress (Optional[Callable[[SlideProgress], Any]], optional): Called after every batch. Defaults to None.
+        """
+        self.service = service
+        self.presentation_id = presentation_id
+        self.template_slides = template_slides
+        self.slides = slides
+        self.position = position
+        self.num_slides = num_slides
+        self.max_requests = max_requests
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.fallback_image = fallback_image
+        self.scope = scope
+        self.on_progress = on_progress
+        self.result = SlidePipelineResult()
+        self.__cancelled = threading.Event()
+    
+    def cancel(self):
+        """Stops the pipeline before its next batch or retry, from any thread. The slides created so far are still moved to the position."""
+        self.__cancelled.set()
+    
+    def batches(self, indices: list[int]) -> list[list[int]]:
+        """Splits the slides into runs of consecutive slides whose requests fit in a batch"""
+        batches: list[list[int]] = []
+        size = 0
+        for i in indices:
+            slide = self.slides[i]
+            slide_size = 2 + len(slide["texts"]) + len(slide["images"])
+            if batches and size + slide_size <= self.max_requests:
+                batches[-1].append(i)
+                size += slide_size
+            else:
+                batches.append([i])
+                size = slide_size
+        return batches
+    
+    def run(self) -> SlidePipelineResult:
+        """Creates the slides, blocking until done
+        
+        Raises:
+            HttpError: If a batch failed for another reason than its images, or still failed after the retries. The slides created so far are moved to the position.
+            PipelineCancelled: If cancelled. The slides created so far are moved to the position.
+        """
+        current: Optional[list[str]] = None
+        if self.scope is None:
+            if self.num_slides is None:
+                self.num_slides = len(self.call(self.service.presentations().get(presentationId=self.presentation_id))["slides"])
+            self.result.slide_ids = [uuid.uuid4().hex for _ in self.slides]
+            to_create, to_delete, position = list(range(len(self.slides))), [], self.position
+        else:
+            current = [slide.get("objectId") for slide in self.call(self.service.presentations().get(presentationId=self.presentation_id, fields="slides.objectId")).get("slides", ())]
+            to_create, to_delete, position = self.plan(current)
+            # The deletions are sent first, in the first batch
+            self.num_slides = len(current) - len(to_delete)
+        batches = self.batches(to_create)
+        deletions = [{"deleteObject": {"objectId": object_id}} for object_id in to_delete]
+        created: list[str] = []
+        try:
+            if deletions and not batches:
+                self.batch_update(deletions)
+            for n, batch in enumerate(batches):
+                if self.__cancelled.is_set():
+                    raise PipelineCancelled(f"Cancelled after {len(created)} of {len(to_create)} slides")
+                self.run_batch(batch, len(created), deletions if n == 0 else [])
+                created.extend(self.result.slide_ids[i] for i in batch)
+                self.result.deleted = len(to_delete)
+                self.report(n + 1, len(batches), self.result.kept + len(created))
+            self.result.deleted = len(to_delete)
+        finally:
+            self.result.created = len(created)
+            if current is None:
+                arrangement = None
+            else:
+                deleted = set(to_delete) if self.result.deleted else set()
+                arrangement = [object_id for object_id in current if object_id not in deleted] + created
+            self.arrange(arrangement, position, created)
+        LOGGER.info(f"Created {len(created)}, kept {self.result.kept} and deleted {self.result.deleted} slides in {len(batches)} batches, {self.result.calls} calls, {self.result.retries} retries, {len(self.result.skipped_images)} images skipped")
+        return self.result
+    
+    def plan(self, current: list[str]) -> tuple[list[int], list[str], int]:
+        """Compares the slides with the slides of the scope in the presentation
+        
+        Args:
+            current (list[str]): Object IDs of the slides in the presentation, in order
+        
+        Returns:
+            tuple[list[int], list[str], int]: Indices of the slides to create, object IDs of the slides to delete, and position of the slides
+        """
+        if any("key" not in slide for slide in self.slides):
+            raise ValueError("Every slide needs a key to be synchronized")
+        if len({slide["key"] for slide in self.slides}) != len(self.slides):
+            raise ValueError("The keys of the slides are not unique")
+        prefix = scope_prefix(self.scope)
+        self.result.slide_ids = [slide_object_id(self.scope, slide, self.template_slides[len(slide["images"])]) for slide in self.slides]
+        existing, wanted = set(current), set(self.result.slide_ids)
+        to_create = [i for i, object_id in enumerate(self.result.slide_ids) if object_id not in existing]
+        to_delete = [object_id for object_id in current if object_id.startswith(prefix) and object_id not in wanted]
+        self.result.kept = len(self.slides) - len(to_create)
+        # Slides before the first slide of the scope are not in the scope, so none of them is deleted
+        first = next((i for i, object_id in enumerate(current) if object_id.startswith(prefix)), None)
+        return to_create, to_delete, self.position if first is None else first
+    
+    def arrange(self, arrangement: Optional[list[str]], position: int, created: list[str]):
+        """Moves the slides in the presentation to the position in their order, unless they are already there
+        
+        Args:
+            arrangement (Optional[list[str]]): Object IDs of the slides in the presentation, None if only the created slides are to be moved
+            position (int): Position to move the slides to
+            created (list[str]): Object IDs of the slides created
+        """
+        if arrangement is None:
+            ordered = created
+        else:
+            present = set(arrangement)
+            ordered = [object_id for object_id in self.result.slide_ids if object_id in present]
+            if arrangement[position:position + len(ordered)] == ordered:
+                return
+        if ordered:
+            self.call(self.service.presentations().batchUpdate(
+                presentationId=self.presentation_id,
+                body={"requests": [{"updateSlidesPosition": {"slideObjectIds": ordered, "insertionIndex": position}}]}
+            ))
+    
+    async def run_async(self) -> SlidePipelineResult:
+        """Creates the slides on the pipeline thread pool, calling `on_progress` on the event loop
+        
+        The pipeline runs apart from the calls made from the UI, so its batches and backoffs never hold their threads.
+        If the caller is cancelled, the pipeline stops before its next batch or retry.
+        """
+        loop = asyncio.get_running_loop()
+        on_progress = self.on_progress
+        if on_progress is not None:
+            self.on_progress = lambda progress: loop.call_soon_threadsafe(on_progress, progress)
+        try:
+            # No timeout, the batches have their own retries
+            return await run_blocking(self.run, executor=get_pipeline_executor())
+        except asyncio.CancelledError:
+            self.cancel()
+            raise
+        finally:
+            self.on_progress = on_progress
+    
+    def report(self, batches_done: int, batches_total: int, slides_done: int):
+        if self.on_progress is not None:
+            self.on_progress(SlideProgress(batches_done, batches_total, slides_done, len(self.slides), len(self.result.skipped_images)))
+    
+    def run_batch(self, batch: list[int], num_created: int, deletions: list[dict]):
+        structure: list[dict] = list(deletions)
+        images: list[dict] = []
+        for k, i in enumerate(batch):
+            slide, slide_id = self.slides[i], self.result.slide_ids[i]
+            structure.extend(structure_requests(slide, slide_id, self.template_slides[len(slide["images"])], self.num_slides + num_created + k + 1))
+            images.extend(image_request(slide_id, j, url) for j, url in enumerate(slide["images"]))
+        try:
+            self.batch_update(structure + images, self.result.slide_ids[batch[0]])
+        except HttpError as e:
+            if not images or e.status_code != 400:
+                raise
+            LOGGER.warning(f"Batch of {len(batch)} slides rejected ({e}), inserting the images separately")
+            self.batch_update(structure, self.result.slide_ids[batch[0]])
+            for i in batch:
+                self.insert_images(i)
+    
+    def insert_images(self, i: int):
+        """Inserts the images of a slide, then one by one if they fail together"""
+        slide_id, urls = self.result.slide_ids[i], list(self.slides[i]["images"])
+        if not urls:
+            return
+        try:
+            self.batch_update([image_request(slide_id, j, url) for j, url in enumerate(urls)])
+            return
+        except HttpError as e:
+            if e.status_code != 400:
+                raise
+        for j, url in enumerate(urls):
+            try:
+                self.batch_update([image_request(slide_id, j, url)])
+                continue
+            except HttpError as e:
+                if e.status_code != 400:
+                    raise
+                LOGGER.warning(f"Image {url} of slide {i+1} failed ({e})")
+            if self.fallback_image is not None:
+                try:
+                    self.batch_update([image_request(slide_id, j, self.fallback_image)])
+                    self.result.substituted_images.append((i, url))
+                    continue
+                except HttpError as e:
+                    if e.status_code != 400:
+                        raise
+            self.batch_update([clear_placeholder_request(slide_id, j)])
+            self.result.skipped_images.append((i, url))
+    
+    def batch_update(self, requests: list[dict], created_id: Optional[str] = None):
+        """Sends a batchUpdate, retrying it on 429, 5xx and transport errors
+        
+        Args:
+            requests (list[dict]): Requests of the batch
+            created_id (Optional[str], optional): ID of an object the batch creates, to find out whether a batch which timed out was applied. Defaults to None.
+        """
+        timed_out = False
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.call(self.service.presentations().batchUpdate(
+                    presentationId=self.presentation_id,
+                    body={"requests": requests}
+                ))
+            except HttpError as e:
+                # A batch whose response was lost may have been applied, and fails on its duplicated IDs when retried
+                if timed_out and created_id is not None and e.status_code == 400 and self.exists(created_id):
+                    LOGGER.info(f"Batch creating {created_id} was applied before timing out")
+                    return None
+                delay = get_retry_delay(e, attempt, self.backoff)
+                if delay is None or attempt == self.max_retries:
+                    raise
+            except Exception as e:
+                delay = get_retry_delay(e, attempt, self.backoff)
+                if delay is None or attempt == self.max_retries:
+                    raise
+                timed_out = True
+            self.result.retries += 1
+            LOGGER.warning(f"Batch of {len(requests)} requests failed, retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            if self.__cancelled.wait(delay):
+                raise PipelineCancelled(f"Cancelled while waiting to retry a batch of {len(requests)} requests")
+    
+    def exists(self, object_id: str) -> bool:
+        presentation = self.call(self.service.presentations().get(presentationId=self.presentation_id, fields="slides.objectId"))
+        return any(slide.get("objectId") == object_id for slide in presentation.get("slides", ()))
+    
+    def call(self, request: Any) -> Any:
+        self.result.calls += 1
+        return execute(request)
\ No newline at end of file
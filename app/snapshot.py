@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+import os
+import time
+
+SNAPSHOT_MAX_AGE = float(os.getenv("SNAPSHOT_MAX_AGE", 300))
+
+@dataclass
+class CollectionFreshness:
+    """Freshness metadata of a single loaded collection.
+    
+    This is not a persistent snapshot of the data: the loaded tabbycat_api objects are bound to their client and are only reused in memory by the tournament store while the process runs, so their freshness is kept in memory with them.
+    """
+    name: str
+    loaded_at: float
+    duration: float
+    count: int
+    
+    @property
+    def age(self) -> float:
+        return time.time() - self.loaded_at
+    
+    def is_fresh(self, max_age: float = SNAPSHOT_MAX_AGE) -> bool:
+        return self.age <= max_age
\ No newline at end of file
@@ -0,0 +1,417 @@
+import asyncio
+from functools import cache, partial
+import hashlib
+import inspect
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Literal, Optional
+
+import tabbycat_api as tc
+from .ballot_analysis import BallotAnalyzer
+from .compliance import ComplianceEngine
+from .exceptions import CollectionLoadError
+from .feedback import FeedbackDelta, FeedbackSync
+from .index import CollectionIndex
+from .metrics import instrument_tabbycat
+from .poller import LivePoller
+from .scheduler import Priority, RequestScheduler, get_scheduler
+from .snapshot import SNAPSHOT_MAX_AGE, CollectionFreshness
+from .verification import VerificationEngine
+
+LOGGER = logging.getLogger(__name__)
+STORE_GRACE_PERIOD = float(os.getenv("STORE_GRACE_PERIOD", 300))
+COLLECTION_NAMES = ("institutions", "teams", "break_categories", "speakers", "speaker_categories", "adjudicators", "rounds", "motions", "venues", "venue_categories", "feedback_questions", "feedback", "preferences")
+
+StoreCallback = Callable[[str, Any], Optional[Awaitable]]
+# unloaded: never loaded, fresh: last load succeeded, stale: reload failed but the previous data is kept, failed: first load failed
+CollectionState = Literal["unloaded", "fresh", "stale", "failed"]
+# Result statuses whose ballots rarely change without the status changing: no ballot submitted yet, or confirmed
+SETTLED_RESULT_STATUSES = ("N", "C")
+# A confirmed ballot can still be edited, so the ballots of settled debates are reloaded once they are older than this
+BALLOTS_SETTLED_MAX_AGE = float(os.getenv("BALLOTS_SETTLED_MAX_AGE", 120))
+
+def token_hash(client: tc.Client) -> str:
+    """Get a hash of the API token of a client, so that stores are only shared by sessions using the same token"""
+    return hashlib.sha256((client._config.api_token or "").encode()).hexdigest()[:16]
+
+class TournamentStore:
+    """Tournament data shared by every session managing the same tournament.
+    
+    Collections are loaded on demand by `ensure_loaded`, so only the data needed by the pages opened so far is fetched.
+    A store requests Tabbycat with the client it was created with, so it is only shared by the sessions logged in with the same API token.
+    Sessions attach to the store and subscribe to topics (collection names, or custom topics such as "round_status") to be notified when the data is reloaded by another session.
+    Concurrent reloads of the same collection are coalesced into a single request.
+    A collection failing to load does not affect the others; it is recorded as failed so that only the failed collections are retried.
+    """
+    base_url: str
+    slug: str
+    token_hash: str
+    client: tc.Client
+    tournament: tc.models.Tournament
+    institutions: Optional[tc.models.PaginatedInstitutions] = None
+    feedback: FeedbackSync
+    scheduler: RequestScheduler
+    verification: VerificationEngine
+    compliance: ComplianceEngine
+    ballot_analysis: BallotAnalyzer
+    poller: LivePoller
+    __loaded: set[str]
+    __sessions: set[Hashable]
+    __subscribers: dict[Hashable, dict[str, list[StoreCallback]]]
+    __loads: dict[str, asyncio.Task]
+    __indexes: dict[str, CollectionIndex]
+    __failed: dict[str, Exception]
+    # Result status of each debate when its ballots were last loaded, and when
+    __ballot_statuses: dict[str, tuple[str, float]]
+    __freshness: dict[str, CollectionFreshness]
+    
+    def __init__(self, client: tc.Client, tournament: tc.models.Tournament):
+        self.base_url = client._config.base_url
+        self.slug = tournament.slug
+        self.token_hash = token_hash(client)
+        self.client = client
+        self.tournament = tournament
+        self.scheduler = get_scheduler(self.base_url)
+        instrument_tabbycat(client)
+        self.feedback = FeedbackSync(tournament._links.feedback, self.scheduler)
+        self.verification = VerificationEngine()
+        self.compliance = ComplianceEngine()
+        self.ballot_analysis = BallotAnalyzer()
+        self.poller = LivePoller(self)
+        self.__loaded = set()
+        self.__sessions = set()
+        self.__subscribers = {}
+        self.__loads = {}
+        self.__indexes = {}
+        self.__failed = {}
+        self.__ballot_statuses = {}
+        self.__freshness = {}
+    
+    @property
+    def key(self) -> str:
+        return f"{self.base_url}#{self.slug}#{self.token_hash}"
+    
+    @property
+    def loaded_collections(self) -> frozenset[str]:
+        return frozenset(self.__loaded)
+    
+    @property
+    def sessions(self) -> frozenset[Hashable]:
+        return frozenset(self.__sessions)
+    
+    @property
+    def failed_collections(self) -> dict[str, Exception]:
+        """Collections whose last load failed, with the error"""
+        return dict(self.__failed)
+    
+    def collection_state(self, name: str) -> CollectionState:
+        if name in self.__failed:
+            return "stale" if name in self.__loaded else "failed"
+        return "fresh" if name in self.__loaded else "unloaded"
+    
+    def attach(self, session: Hashable):
+        self.__sessions.add(session)
+    
+    def detach(self, session: Hashable) -> bool:
+        """Detaches a session and drops its subscriptions, returns True if no session is attached anymore"""
+        self.__sessions.discard(session)
+        self.__subscribers.pop(session, None)
+        self.poller.unwatch(session)
+        return not self.__sessions
+    
+    def subscribe(self, session: Hashable, topics: Iterable[str], callback: StoreCallback):
+        """Calls `callback(topic, payload)` whenever one of the topics is published. The callback may be a coroutine function."""
+        subscriptions = self.__subscribers.setdefault(session, {})
+        for topic in topics:
+            subscriptions.setdefault(topic, []).append(callback)
+    
+    def publish(self, topic: str, payload: Any = None, source: Hashable = None):
+        """Notifies the subscribers of a topic, except those of the session which caused the change"""
+        for session, subscriptions in list(self.__subscribers.items()):
+            if source is not None and session == source:
+                continue
+            for callback in subscriptions.get(topic, []):
+                asyncio.create_task(self.__notify(callback, topic, payload))
+    
+    async def __notify(self, callback: StoreCallback, topic: str, payload: Any):
+        try:
+            result = callback(topic, payload)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            LOGGER.warning(f"Subscriber of {topic} failed", exc_info=e)
+    
+    def get_collection(self, name: str) -> Any:
+        """Get the loaded paginated collection by name"""
+        if name == "institutions":
+            return self.institutions
+        # Merged by the sync, whose objects differ from those of the raw collection
+        if name == "feedback":
+            return self.feedback
+        return getattr(self.tournament._links, name)
+    
+    def index(self, name: str) -> CollectionIndex:
+        """Get the hash indexes of a loaded collection, rebuilt whenever it is reloaded"""
+        if name not in self.__indexes:
+            self.__indexes[name] = CollectionIndex.for_collection(name, self.get_collection(name) or ())
+        return self.__indexes[name]
+    
+    def find(self, name: str, **kwargs) -> Optional[Any]:
+        """Finds an object of a loaded collection, in O(1) if looking up by a single indexed key.
+        
+        Args:
+            name (str): Name of the collection
+            **kwargs: Attribute to look up and its value, e.g. `url=...` or `code=...`
+        """
+        index = self.index(name)
+        if len(kwargs) == 1 and (key := next(iter(kwargs))) in index:
+            return index.get(key, kwargs[key])
+        return self.get_collection(name).find(**kwargs)
+    
+    async def open(self, force: bool = False, owner: Hashable = None) -> list[str]:
+        """Opens the store for a new session.
+        
+        Args:
+            force (bool, optional): Reload every loaded collection. Defaults to False.
+            owner (Hashable, optional): Owner of the requests for fair queuing. Defaults to None.
+        
+        Returns:
+            list[str]: Loaded collections which are stale
+        
+        Raises:
+            CollectionLoadError: If forced and some collections failed to reload. The others are reloaded.
+        """
+        if force:
+            await self.load(full=True, owner=owner)
+            return []
+        return self.stale_collections()
+    
+    async def ensure_loaded(self, names: Iterable[str], priority: Priority = Priority.NORMAL, owner: Hashable = None):
+        """Loads the collections which have not been loaded yet
+        
+        Raises:
+            CollectionLoadError: If some collections failed to load. The others are loaded.
+        """
+        # Read twice below, so a generator is consumed once
+        names = list(names)
+        if unknown := set(names) - set(COLLECTION_NAMES):
+            raise ValueError(f"Unknown collections: {', '.join(sorted(unknown))}")
+        missing = [name for name in names if name not in self.__loaded]
+        if missing:
+            LOGGER.info(f"Loading {', '.join(missing)}")
+            await self.__refresh_all(missing, priority, owner)
+    
+    async def retry_failed(self, priority: Priority = Priority.INTERACTIVE, owner: Hashable = None):
+        """Reloads only the collections whose last load failed
+        
+        Raises:
+            CollectionLoadError: If some collections failed again
+        """
+        if failed := sorted(self.__failed):
+            LOGGER.info(f"Retrying {', '.join(failed)}")
+            await self.__refresh_all(failed, priority, owner)
+    
+    async def __refresh_all(self, names: list[str], priority: Priority, owner: Hashable, full: bool = False):
+        results = await asyncio.gather(
+            *[self.refresh(name, priority, owner, owner, full=full) for name in names],
+            return_exceptions=True
+        )
+        if failed := {name: result for name, result in zip(names, results) if isinstance(result, Exception)}:
+            raise CollectionLoadError(failed)
+    
+    async def load(self, full: bool = False, priority: Priority = Priority.NORMAL, owner: Hashable = None):
+        """Reloads every loaded collection. Joins the reload in progress if there is one."""
+        task = self.__loads.get("*")
+        if task is None or task.done():
+            task = self.__loads["*"] = asyncio.create_task(self.__load(full, priority, owner))
+        await asyncio.shield(task)
+    
+    async def __load(self, full: bool, priority: Priority, owner: Hashable):
+        if full:
+            self.__freshness.clear()
+        names = sorted(self.__loaded | self.__failed.keys())
+        await self.__refresh_all(names, priority, owner, full=full)
+        LOGGER.info(f"Reloaded {len(names)} collections of {self.tournament.name} ({len(self.__sessions)} sessions attached)")
+    
+    async def refresh(self, name: str, priority: Priority = Priority.NORMAL, owner: Hashable = None, source: Hashable = None, full: bool = False):
+        """Reloads a collection once for every session and notifies the subscribers.
+        
+        Args:
+            name (str): Name of the collection
+            priority (Priority, optional): Priority of the request. Defaults to Priority.NORMAL.
+            owner (Hashable, optional): Owner of the request for fair queuing. Defaults to None.
+            source (Hashable, optional): Session requesting the reload, which is not notified. Defaults to None.
+            full (bool, optional): Resync the feedback from scratch. Defaults to False.
+        """
+        if name == "feedback":
+            await self.sync_feedback(full, priority, owner, source)
+            return
+        task = self.__loads.get(name)
+        if task is None or task.done():
+            task = self.__loads[name] = asyncio.create_task(self.__refresh(name, priority, owner, source))
+        await asyncio.shield(task)
+    
+    async def __refresh(self, name: str, priority: Priority, owner: Hashable, source: Hashable):
+        start = time.time()
+        try:
+            if name == "institutions" and self.institutions is None:
+                self.institutions = await self.scheduler.submit(self.client.get_institutions, priority=priority, owner=owner, label=name)
+            else:
+                collection = self.get_collection(name)
+                await self.scheduler.submit(lambda: collection.load(force=True), priority=priority, owner=owner, label=name)
+        except Exception as e:
+            self.set_failed(name, e)
+            raise
+        self.__failed.pop(name, None)
+        self.__loaded.add(name)
+        self.__indexes.pop(name, None)
+        self.set_freshness(name, start)
+        self.publish(name, source=source)
+    
+    async def sync_feedback(self, full: bool = False, priority: Priority = Priority.NORMAL, owner: Hashable = None, source: Hashable = None) -> FeedbackDelta:
+        """Reloads the feedback and notifies the subscribers if anything changed"""
+        start = time.time()
+        try:
+            delta = await self.feedback.sync(full=full, priority=priority, owner=owner)
+        except Exception as e:
+            self.set_failed("feedback", e)
+            raise
+        self.__failed.pop("feedback", None)
+        self.__loaded.add("feedback")
+        self.set_freshness("feedback", start)
+        if delta:
+            self.__indexes.pop("feedback", None)
+            self.publish("feedback", delta, source=source)
+        return delta
+    
+    async def load_pairings(self, round: tc.models.Round, priority: Priority = Priority.NORMAL, owner: Hashable = None):
+        """Reloads the pairings of a round, joining the reload in progress if there is one"""
+        key = f"pairings:{round.url}"
+        task = self.__loads.get(key)
+        if task is None or task.done():
+            task = self.__loads[key] = asyncio.create_task(
+                self.scheduler.submit(partial(round._links.pairing.load, force=True), priority=priority, owner=owner, label="pairings")
+            )
+        await asyncio.shield(task)
+    
+    async def load_ballots(self, round: tc.models.Round, full: bool = False, priority: Priority = Priority.NORMAL, owner: Hashable = None) -> int:
+        """Loads the ballots of every debate of a round, whose pairings must be loaded.
+        
+        Tabbycat only lists ballots per debate, so the debates are fanned out through the scheduler, which bounds the requests in flight and reuses the connections of the client.
+        Ballots of debates whose result status is settled ("N" or "C") and unchanged since their last load are not requested again, unless they were loaded more than `BALLOTS_SETTLED_MAX_AGE` seconds ago, so that edits of a confirmed ballot are still picked up.
+        Concurrent loads of the same round are joined.
+        
+        Args:
+            round (tc.models.Round): Round with its pairings loaded
+            full (bool, optional): Reload the ballots of every debate. Defaults to False.
+            priority (Priority, optional): Priority of the requests. Defaults to Priority.NORMAL.
+            owner (Hashable, optional): Owner of the requests for fair queuing. Defaults to None.
+        
+        Returns:
+            int: Number of debates whose ballots were reloaded
+        """
+        key = f"ballots:{round.url}"
+        task = self.__loads.get(key)
+        if task is None or task.done():
+            task = self.__loads[key] = asyncio.create_task(self.__load_ballots(round, full, priority, owner))
+        return await asyncio.shield(task)
+    
+    def ballots_stale(self, pairing: tc.models.RoundPairing) -> bool:
+        """Whether the ballots of a debate have to be reloaded: its result is not settled, changed, or was loaded too long ago"""
+        if pairing.result_status not in SETTLED_RESULT_STATUSES or (loaded := self.__ballot_statuses.get(pairing.url)) is None:
+            return True
+        status, loaded_at = loaded
+        return status != pairing.result_status or time.time() - loaded_at > BALLOTS_SETTLED_MAX_AGE
+    
+    async def __load_ballots(self, round: tc.models.Round, full: bool, priority: Priority, owner: Hashable) -> int:
+        pairings = list(round._links.pairing)
+        stale = [pairing for pairing in pairings if full or self.ballots_stale(pairing)]
+        stale_urls = {pairing.url for pairing in stale}
+        # Recently loaded settled debates are loaded without force, which only requests pairing objects whose ballots were never loaded
+        results = await asyncio.gather(
+            *[
+                self.scheduler.submit(
+                    partial(pairing._links.ballots.load, force=True) if pairing.url in stale_urls else pairing._links.ballots.load,
+                    priority=priority,
+                    owner=owner,
+                    label="ballots"
+                ) for pairing in pairings
+            ],
+            return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, Exception)]
+        for pairing, result in zip(pairings, results):
+            if not isinstance(result, Exception):
+                if pairing.url in stale_urls:
+                    self.__ballot_statuses[pairing.url] = (pairing.result_status, time.time())
+        LOGGER.info(f"Loaded ballots of {len(stale)}/{len(pairings)} debates of {round.name}, {len(errors)} failed")
+        if errors:
+            raise errors[0]
+        return len(stale)
+    
+    def set_failed(self, name: str, e: Exception):
+        self.__failed[name] = e
+        LOGGER.warning(f"Failed to load {name} of {self.key}, {'keeping the previous data' if name in self.__loaded else 'unavailable'} ({type(e).__name__}: {e})")
+    
+    def set_freshness(self, name: str, start: float):
+        self.__freshness[name] = CollectionFreshness(name, time.time(), time.time() - start, len(self.get_collection(name) or ()))
+    
+    def stale_collections(self, max_age: float = SNAPSHOT_MAX_AGE) -> list[str]:
+        """Get the loaded collections which are older than `max_age` seconds"""
+        return [name for name in sorted(self.__loaded) if name not in self.__freshness or not self.__freshness[name].is_fresh(max_age)]
+
+class StoreRegistry:
+    """Process-wide registry of the tournament stores, keyed by (base_url, slug, hash of the API token).
+    
+    A store is evicted `grace_period` seconds after its last session detached, so that a session logging in again shortly after reuses the loaded data.
+    """
+    grace_period: float
+    __stores: dict[tuple[str, str, str], TournamentStore]
+    __evictions: dict[tuple[str, str, str], asyncio.TimerHandle]
+    
+    def __init__(self, grace_period: float = STORE_GRACE_PERIOD):
+        self.grace_period = grace_period
+        self.__stores = {}
+        self.__evictions = {}
+    
+    def __len__(self) -> int:
+        return len(self.__stores)
+    
+    @property
+    def stores(self) -> list[TournamentStore]:
+        return list(self.__stores.values())
+    
+    def acquire(self, client: tc.Client, tournament: tc.models.Tournament, session: Hashable) -> TournamentStore:
+        """Attaches a session to the store of the tournament for its API token, creating the store if necessary"""
+        key = (client._config.base_url, tournament.slug, token_hash(client))
+        store = self.__stores.get(key)
+        if store is None:
+            LOGGER.info(f"Creating store for {tournament.name}")
+            store = self.__stores[key] = TournamentStore(client, tournament)
+        if (handle := self.__evictions.pop(key, None)) is not None:
+            handle.cancel()
+        store.attach(session)
+        return store
+    
+    def release(self, store: TournamentStore, session: Hashable):
+        """Detaches a session from the store, scheduling the eviction of the store if it was the last one"""
+        if not store.detach(session):
+            return
+        key = (store.base_url, store.slug, store.token_hash)
+        if self.grace_period <= 0:
+            self.__evict(key)
+        else:
+            LOGGER.info(f"Last session detached from {store.key}, evicting in {self.grace_period:.0f}s")
+            self.__evictions[key] = asyncio.get_running_loop().call_later(self.grace_period, self.__evict, key)
+    
+    def __evict(self, key: tuple[str, str, str]):
+        self.__evictions.pop(key, None)
+        store = self.__stores.get(key)
+        if store is not None and not store.sessions:
+            LOGGER.info(f"Evicting store {store.key}")
+            del self.__stores[key]
+
+@cache
+def get_store_registry() -> StoreRegistry:
+    return StoreRegistry()
\ No newline at end of file
@@ -4,7 +4,7 @@ from flet.auth import OAuthProvider
 from typing import TypedDict, Literal, Optional, Iterable, Callable, Any
 import tabbycat_api as tc
 import tomllib
-import uuid
+from .slides import SlideData, SlidePipeline, SlidePipelineResult
 
 def get_version(path = "pyproject.toml") -> Optional[str]:
     """Get the version of the app"""
@@ -152,12 +152,8 @@ def rank_with_ties[T](items: Iterable[T], key: Callable[[T], Any]=lambda x: x):
         current_rank = i + 2  # next available rank
     return ranks
 
-class SlideData(TypedDict):
-    texts: dict[str, str]
-    images: set[str]
-
-def create_slides(service: Any, presentation_id: str, template_slides: dict[int, str], slides: list[SlideData], position: int = 0, num_slides: Optional[int] = None):
-    """Create slides
+def create_slides(service: Any, presentation_id: str, template_slides: dict[int, str], slides: list[SlideData], position: int = 0, num_slides: Optional[int] = None) -> SlidePipelineResult:
+    """Create slides, in size-bounded and retried batches (see `SlidePipeline`)
 
     Args:
         service (Any): Google Slides API Service
@@ -166,72 +162,4 @@ def create_slides(service: Any, presentation_id: str, template_slides: dict[int,
         slides (list[SlideData]): list of SlideData to create
         position (int, optional): Position to insert slide at. Defaults to 0.
     """
-    # Get the total number of slides in the presentation
-    if num_slides is None:
-        presentation = service.presentations().get(presentationId=presentation_id).execute()
-        num_slides = len(presentation["slides"])
-    list_requests: list[dict] = []
-    slide_uuids = []
-    for slide in slides:
-        slide_uuid = uuid.uuid4().hex
-        slide_uuids.append(slide_uuid)
-        # Duplicate slides
-        list_requests.append(
-            {
-                "duplicateObject": {
-                    "objectId": template_slides[len(slide["images"])],
-                    "objectIds": {
-                        template_slides[len(slide["images"])]: slide_uuid,
-                    }
-                }
-            }
-        )
-        # Move slides to the end to avoid confusion when changing position later
-        list_requests.append(
-            {
-                "updateSlidesPosition": {
-                    "slideObjectIds": [slide_uuid],
-                    "insertionIndex": num_slides+len(slide_uuids)
-                }
-            }
-        )
-        # Replace texts
-        list_requests.extend(
-            {
-                "replaceAllText": {
-                    "replaceText": replace_str,
-                    "pageObjectIds": [slide_uuid],
-                    "containsText": {
-                        "text": key,
-                        "matchCase": True
-                    }
-                }
-            } for key, replace_str in slide["texts"].items()
-        )
-        # Replace images
-        list_requests.extend(
-            {
-                "replaceAllShapesWithImage": {
-                    "imageReplaceMethod": "CENTER_INSIDE",
-                    "pageObjectIds": [slide_uuid],
-                    "containsText": {
-                        "text": f"{{{{image{i+1}}}}}",
-                        "matchCase": True
-                    },
-                    "imageUrl": url
-                },
-            } for i, url in enumerate(slide["images"])
-        )
-    # Move slides to the correct position
-    list_requests.append(
-        {
-            "updateSlidesPosition": {
-                "slideObjectIds": slide_uuids,
-                "insertionIndex": position
-            }
-        }
-    )
-    service.presentations().batchUpdate(
-        presentationId=presentation_id,
-        body={"requests": list_requests}
-    ).execute()
\ No newline at end of file
+    return SlidePipeline(service, presentation_id, template_slides, slides, position, num_slides).run()
\ No newline at end of file
@@ -0,0 +1,247 @@
+from dataclasses import dataclass, field
+import logging
+from typing import Any, Hashable, Literal, Optional, TYPE_CHECKING
+
+import tabbycat_api as tc
+from .feedback import feedback_signature
+if TYPE_CHECKING:
+    from .ballot_analysis import BallotAnalysis
+
+LOGGER = logging.getLogger(__name__)
+TeamFeedbackDirection = Literal["orallist", "all-adjs", "no-one"]
+AdjFeedbackDirection = Literal["minimal", "with-p-on-c", "with-t-on-c", "all-adjs", "with-p-on-p", "no-adjs"]
+AdjudicatorPosition = Literal["c", "p", "t"]
+# Whether feedback from the source position (row) on the target position (column) is required, in the order chair, panellist, trainee
+FEEDBACK_PATHS: dict[AdjFeedbackDirection, tuple[tuple[bool, bool, bool], tuple[bool, bool, bool], tuple[bool, bool, bool]]] = {
+    "minimal": ((True, True, True), (False, False, False), (False, False, False)),
+    "with-p-on-c": ((True, True, True), (True, False, False), (False, False, False)),
+    "with-t-on-c": ((True, True, True), (True, False, False), (True, False, False)),
+    "all-adjs": ((True, True, True), (True, True, True), (True, True, True)),
+    "with-p-on-p": ((True, True, True), (True, True, False), (True, False, False)),
+    "no-adjs": ((False, False, False), (False, False, False), (False, False, False)),
+}
+POSITION_INDEX: dict[AdjudicatorPosition, int] = {"c": 0, "p": 1, "t": 2}
+
+def get_name(obj: Any, attr: str = "name") -> str:
+    try:
+        return str(getattr(obj, attr))
+    except Exception:
+        return "Unknown"
+
+def get_url(obj: Any) -> Optional[str]:
+    return getattr(obj, "url", None)
+
+def get_panel(pairing: tc.models.RoundPairing) -> list[tuple[AdjudicatorPosition, tc.models.Adjudicator]]:
+    """Get the adjudicators of a pairing with their positions, chair first"""
+    adjudicators = pairing.adjudicators
+    panel: list[tuple[AdjudicatorPosition, tc.models.Adjudicator]] = []
+    if adjudicators.chair:
+        panel.append(("c", adjudicators.chair))
+    panel.extend(("p", panellist) for panellist in adjudicators.panellists or ())
+    panel.extend(("t", trainee) for trainee in adjudicators.trainees or ())
+    return panel
+
+@dataclass
+class VerificationResult:
+    """Feedback verification of a single pairing"""
+    confirmed: bool
+    missing_team: list[tuple[tc.models.Team, tc.models.Adjudicator|Literal["orallist"]]] = field(default_factory=list)
+    extra_team: list[tc.models.Feedback] = field(default_factory=list)
+    orallists: Optional[list[tc.models.Adjudicator]] = None
+    missing_adj: list[tuple[tc.models.Adjudicator, tc.models.Adjudicator]] = field(default_factory=list)
+    extra_adj: list[tc.models.Feedback] = field(default_factory=list)
+    
+    @property
+    def has_error(self) -> bool:
+        return bool(self.missing_team or self.missing_adj or self.extra_team or self.extra_adj or (self.orallists is not None and len(self.orallists) != 1))
+    
+    @property
+    def status(self) -> int:
+        """0 = unconfirmed, 1 = error, 2 = all correct"""
+        if not self.confirmed:
+            return 0
+        return 1 if self.has_error else 2
+    
+    @property
+    def error_message(self) -> str:
+        lines = []
+        text_missing = [f"{get_name(src)}→{get_name(dest)}" for src, dest in self.missing_adj]
+        text_missing.extend(f"{get_name(team, 'short_name')}→{get_name(adj) if adj != 'orallist' else 'orallist'}" for team, adj in self.missing_team)
+        if text_missing:
+            lines.append("Missing feedbacks: " + ", ".join(text_missing))
+        text_extra = [f"{get_name(fb.source)}→{get_name(fb.adjudicator)}" for fb in self.extra_adj + self.extra_team]
+        if text_extra:
+            lines.append("Extra feedbacks: " + ", ".join(text_extra))
+        if self.orallists is not None and len(self.orallists) != 1:
+            lines.append("Multiple orallists: " + ", ".join(get_name(adj) for adj in self.orallists))
+        return "\n".join(lines)
+    
+    @property
+    def message(self) -> str:
+        match self.status:
+            case 0:
+                return "Round unconfirmed"
+            case 1:
+                return self.error_message
+            case _:
+                return "All feedbacks are correct"
+
+def debate_status(result: VerificationResult, analysis: Optional["BallotAnalysis"] = None) -> int:
+    """Get the status of a debate from its feedback and its ballots: 0 = unconfirmed, 1 = error, 2 = all correct
+    
+    Discrepancies between the ballots are errors even if the feedback is correct.
+    """
+    return min(result.status, 1) if analysis else result.status
+
+@dataclass
+class DebateSummary:
+    """Status of a debate for the triage table, derived from its memoized verification and ballot analysis"""
+    round: tc.models.Round
+    pairing: tc.models.RoundPairing
+    status: int
+    result_status: str
+    missing_feedback: int
+    extra_feedback: int
+    multiple_orallists: bool
+    ballot_flags: list[str] = field(default_factory=list)
+    
+    @property
+    def missing_ballot(self) -> bool:
+        return self.result_status == "N"
+    
+    @property
+    def unconfirmed_ballot(self) -> bool:
+        return self.result_status == "D"
+    
+    @property
+    def has_problem(self) -> bool:
+        return self.status != 2
+
+def summarize_debate(round: tc.models.Round, pairing: tc.models.RoundPairing, result: VerificationResult, analysis: Optional["BallotAnalysis"] = None) -> DebateSummary:
+    return DebateSummary(
+        round,
+        pairing,
+        debate_status(result, analysis),
+        pairing.result_status,
+        len(result.missing_team) + len(result.missing_adj),
+        len(result.extra_team) + len(result.extra_adj),
+        result.orallists is not None and len(result.orallists) > 1,
+        [flag.message for flag in analysis.flags] if analysis else [],
+    )
+
+def verify_pairing(
+    pairing: tc.models.RoundPairing,
+    feedbacks: list[tc.models.Feedback],
+    team_direction: TeamFeedbackDirection,
+    adj_direction: AdjFeedbackDirection
+) -> VerificationResult:
+    """Verifies the feedback of a pairing against the feedback rules in a single pass over the feedback
+    
+    Only confirmed feedback counts. Feedback which is not required, from outside the debate or on a path already covered is extra, the same way as in `build_compliance`.
+    Under the orallist rule, a team's first feedback names its orallist and any later one is extra; teams naming different orallists are reported as multiple orallists, without anything missing or extra.
+    
+    Args:
+        pairing (tc.models.RoundPairing): Pairing with its teams and adjudicators
+        feedbacks (list[tc.models.Feedback]): Feedback submitted for the pairing
+        team_direction (TeamFeedbackDirection): Feedback required from teams (feedback__feedback_from_teams)
+        adj_direction (AdjFeedbackDirection): Feedback required between adjudicators (feedback__feedback_paths)
+    """
+    if adj_direction not in FEEDBACK_PATHS:
+        raise ValueError(f"Invalid feedback path: {adj_direction}")
+    panel = get_panel(pairing)
+    teams = [dt.team for dt in pairing.teams]
+    team_urls = {get_url(team) for team in teams}
+    result = VerificationResult(confirmed=pairing.result_status == "C")
+    # (source url, target url) of the confirmed feedback
+    team_sources: set[str] = set()
+    team_pairs: set[tuple[str, str]] = set()
+    adj_pairs: set[tuple[str, str]] = set()
+    orallists: dict[str, tc.models.Adjudicator] = {}
+    is_necessary = FEEDBACK_PATHS[adj_direction]
+    positions = {get_url(adj): position for position, adj in panel}
+    for fb in feedbacks:
+        source, target = get_url(fb.source), get_url(fb.adjudicator)
+        if not fb.confirmed:
+            continue
+        if isinstance(fb.source, tc.models.Team):
+            if team_direction == "no-one" or source not in team_urls:
+                result.extra_team.append(fb)
+            elif team_direction == "orallist":
+                if source in team_sources:
+                    result.extra_team.append(fb)
+                else:
+                    orallists.setdefault(target, fb.adjudicator)
+                team_sources.add(source)
+            else:
+                if target not in positions or (source, target) in team_pairs:
+                    result.extra_team.append(fb)
+                team_pairs.add((source, target))
+            continue
+        p_src, p_dest = positions.get(source), positions.get(target)
+        necessary = p_src is not None and p_dest is not None and source != target and is_necessary[POSITION_INDEX[p_src]][POSITION_INDEX[p_dest]]
+        # Feedback on the same path twice is extra
+        if not necessary or (source, target) in adj_pairs:
+            result.extra_adj.append(fb)
+        adj_pairs.add((source, target))
+    match team_direction:
+        case "orallist":
+            result.missing_team = [(team, "orallist") for team in teams if get_url(team) not in team_sources]
+            result.orallists = list(orallists.values())
+        case "all-adjs":
+            result.missing_team = [
+                (team, adj)
+                for team in teams
+                for _, adj in panel
+                if (get_url(team), get_url(adj)) not in team_pairs
+            ]
+    result.missing_adj = [
+        (src, dest)
+        for p_src, src in panel
+        for p_dest, dest in panel
+        if get_url(src) != get_url(dest)
+        and is_necessary[POSITION_INDEX[p_src]][POSITION_INDEX[p_dest]]
+        and (get_url(src), get_url(dest)) not in adj_pairs
+    ]
+    return result
+
+def pairing_fingerprint(
+    pairing: tc.models.RoundPairing,
+    feedbacks: list[tc.models.Feedback],
+    team_direction: TeamFeedbackDirection,
+    adj_direction: AdjFeedbackDirection
+) -> Hashable:
+    """Get a value which changes whenever an input of `verify_pairing` changes"""
+    return (
+        pairing.result_status,
+        tuple((position, get_url(adj)) for position, adj in get_panel(pairing)),
+        tuple(get_url(dt.team) for dt in pairing.teams),
+        team_direction,
+        adj_direction,
+        frozenset((fb.url, feedback_signature(fb)) for fb in feedbacks),
+    )
+
+class VerificationEngine:
+    """Memoizes the verification of each pairing until its inputs change"""
+    __results: dict[str, tuple[Hashable, VerificationResult]]
+    
+    def __init__(self):
+        self.__results = {}
+    
+    def verify(
+        self,
+        pairing: tc.models.RoundPairing,
+        feedbacks: list[tc.models.Feedback],
+        team_direction: TeamFeedbackDirection,
+        adj_direction: AdjFeedbackDirection
+    ) -> VerificationResult:
+        """Verifies a pairing, reusing the previous result if neither the pairing, its feedback nor the rules changed"""
+        fingerprint = pairing_fingerprint(pairing, feedbacks, team_direction, adj_direction)
+        cached = self.__results.get(pairing.url)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        result = verify_pairing(pairing, feedbacks, team_direction, adj_direction)
+        self.__results[pairing.url] = (fingerprint, result)
+        return result
+    
+    def clear(self):
+        self.__results.clear()
\ No newline at end of file
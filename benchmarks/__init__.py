@@ -0,0 +1 @@
+"""Headless end-to-end benchmarks of the app against the mock Tabbycat server and a fake Google API"""
\ No newline at end of file
@@ -0,0 +1,103 @@
+import argparse
+import asyncio
+from datetime import datetime
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+
+# The app reads its configuration at import time
+os.environ.setdefault("GOOGLE_CLIENT_ID", "benchmark")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import tabbycat_api as tc
+tc.config.set_tabbycat_config(null_exception=False, lazy_load=False)
+from app.utils import get_version
+from mock_tabbycat import MockServerConfig, TournamentSpec
+from .scenarios import run_size
+
+LOGGER = logging.getLogger("benchmarks")
+DEFAULT_SIZES = "64:bp:5,200:ap:7,400:bp:9"
+
+def parse_sizes(sizes: str) -> list[TournamentSpec]:
+    specs = []
+    for size in sizes.split(","):
+        num_teams, format, num_rounds = size.split(":")
+        specs.append(TournamentSpec(num_teams=int(num_teams), format=format, num_rounds=int(num_rounds)))
+    return specs
+
+def get_git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+async def run(args: argparse.Namespace) -> dict:
+    config = MockServerConfig(latency=args.latency, error_rate=args.error_rate, seed=0)
+    sizes = []
+    for spec in parse_sizes(args.sizes):
+        LOGGER.info(f"Running {spec.num_teams} teams, {spec.format.upper()}, {spec.num_rounds} rounds")
+        sizes.append(await run_size(spec, config, trace_memory=not args.no_memory, repeat=args.repeat))
+    return {
+        "version": get_version(),
+        "revision": get_git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "config": {"latency": args.latency, "error_rate": args.error_rate, "trace_memory": not args.no_memory},
+        "sizes": sizes,
+    }
+
+def size_key(size: dict) -> str:
+    spec = size["spec"]
+    return f"{spec['num_teams']}:{spec['format']}:{spec['num_rounds']}"
+
+def compare(old_path: str, new_path: str):
+    """Prints the ratio of the wall time and request count of every scenario between two result files"""
+    with open(old_path) as f:
+        old = {size_key(size): size["results"] for size in json.load(f)["sizes"]}
+    with open(new_path) as f:
+        new = {size_key(size): size["results"] for size in json.load(f)["sizes"]}
+    print(f"{'size':<12} {'scenario':<28} {'old (s)':>10} {'new (s)':>10} {'ratio':>7} {'old req':>8} {'new req':>8}")
+    for key in new:
+        for name, result in new[key].items():
+            before = old.get(key, {}).get(name)
+            if before is None:
+                print(f"{key:<12} {name:<28} {'-':>10} {result['wall']:>10.3f} {'-':>7} {'-':>8} {result['requests']:>8}")
+                continue
+            ratio = result["wall"] / before["wall"] if before["wall"] else float("inf")
+            print(f"{key:<12} {name:<28} {before['wall']:>10.3f} {result['wall']:>10.3f} {ratio:>7.2f} {before['requests']:>8} {result['requests']:>8}")
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Headless benchmarks against a mock Tabbycat server")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    parser_run = subparsers.add_parser("run", help="Run the benchmarks and write the results as JSON")
+    parser_run.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Comma separated teams:format:rounds. Defaults to {DEFAULT_SIZES}")
+    parser_run.add_argument("--latency", type=float, default=0.0, help="Mean latency of the mock server, in seconds")
+    parser_run.add_argument("--error-rate", type=float, default=0.0, help="Fraction of mock server requests failing with 429/5xx")
+    parser_run.add_argument("--repeat", type=int, default=3, help="Runs of the synchronous calculations, the fastest is reported")
+    parser_run.add_argument("--no-memory", action="store_true", help="Do not trace memory, which slows down the run")
+    parser_run.add_argument("--output", "-o", default=None, help="Output file. Defaults to benchmarks/results/<timestamp>.json")
+    parser_compare = subparsers.add_parser("compare", help="Compare two result files")
+    parser_compare.add_argument("old")
+    parser_compare.add_argument("new")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    LOGGER.setLevel(logging.INFO)
+    if args.command == "compare":
+        compare(args.old, args.new)
+        return
+    results = asyncio.run(run(args))
+    output = args.output or os.path.join("benchmarks", "results", f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    for size in results["sizes"]:
+        for name, result in size["results"].items():
+            print(f"{size_key(size):<12} {name:<28} {result['wall']:>8.3f}s {result['requests']:>6} req  max lag {result['loop_max_lag']*1000:>7.1f}ms")
+    print(f"Results written to {output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
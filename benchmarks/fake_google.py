@@ -0,0 +1,73 @@
+from collections import Counter
+from typing import Any, Callable, Optional
+
+class FakeRequest:
+    def __init__(self, response: Callable[[], Any]):
+        self.__response = response
+    
+    def execute(self, *args, **kwargs) -> Any:
+        return self.__response()
+
+class FakeSlidesService:
+    """Stand-in of the Google Slides API service returned by `build("slides", "v1", ...)`.
+    
+    Records every request instead of sending it, so that the construction of the batch updates can be timed without the network.
+    The object IDs of the slides are tracked through duplications, deletions and moves, so a scoped `SlidePipeline` can be run against it several times.
+    """
+    calls: Counter
+    batch_requests: list[dict]
+    slide_ids: list[str]
+    
+    def __init__(self, num_slides: int = 10):
+        self.calls = Counter()
+        self.batch_requests = []
+        self.slide_ids = [f"slide{i}" for i in range(num_slides)]
+    
+    @property
+    def num_slides(self) -> int:
+        return len(self.slide_ids)
+    
+    def presentations(self) -> "FakeSlidesService":
+        return self
+    
+    def get(self, presentationId: str, **kwargs) -> FakeRequest:
+        self.calls["presentations.get"] += 1
+        return FakeRequest(lambda: {"presentationId": presentationId, "slides": [{"objectId": object_id} for object_id in self.slide_ids]})
+    
+    def batchUpdate(self, presentationId: str, body: dict, **kwargs) -> FakeRequest:
+        self.calls["presentations.batchUpdate"] += 1
+        requests = body.get("requests", [])
+        def response() -> dict:
+            self.batch_requests.extend(requests)
+            for request in requests:
+                self.apply(request)
+            return {"presentationId": presentationId, "replies": [{} for _ in requests]}
+        return FakeRequest(response)
+    
+    def apply(self, request: dict):
+        if (duplicate := request.get("duplicateObject")) is not None:
+            source = duplicate["objectId"]
+            index = self.slide_ids.index(source) + 1 if source in self.slide_ids else len(self.slide_ids)
+            self.slide_ids.insert(index, duplicate.get("objectIds", {}).get(source, f"{source}_copy{len(self.slide_ids)}"))
+        elif (delete := request.get("deleteObject")) is not None:
+            if delete["objectId"] in self.slide_ids:
+                self.slide_ids.remove(delete["objectId"])
+        elif (move := request.get("updateSlidesPosition")) is not None:
+            moved = [object_id for object_id in move["slideObjectIds"] if object_id in self.slide_ids]
+            # The insertion index counts the slides before the move, like the Slides API
+            before = len([object_id for object_id in self.slide_ids[:move["insertionIndex"]] if object_id not in moved])
+            rest = [object_id for object_id in self.slide_ids if object_id not in moved]
+            self.slide_ids = rest[:before] + moved + rest[before:]
+    
+    def template_slides(self, max_images: int = 4) -> dict[int, str]:
+        return {i: f"slide{i}" for i in range(max_images + 1)}
+    
+    @property
+    def num_requests(self) -> int:
+        return sum(self.calls.values())
+    
+    def reset(self, num_slides: Optional[int] = None):
+        self.calls.clear()
+        self.batch_requests.clear()
+        if num_slides is not None:
+            self.slide_ids = [f"slide{i}" for i in range(num_slides)]
\ No newline at end of file
@@ -0,0 +1,119 @@
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+import inspect
+import time
+import tracemalloc
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+LOOP_LAG_INTERVAL = 0.005
+
+class LoopLagMonitor:
+    """Measures how long the event loop is blocked, by how late a periodic timer fires"""
+    interval: float
+    max_lag: float = 0.0
+    blocked: float = 0.0
+    __task: Optional[asyncio.Task] = None
+    
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL):
+        self.interval = interval
+    
+    def reset(self):
+        self.max_lag = 0.0
+        self.blocked = 0.0
+    
+    async def __run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = loop.time() - expected
+            if lag > self.interval:
+                self.blocked += lag
+            self.max_lag = max(self.max_lag, lag)
+    
+    def start(self):
+        self.__task = asyncio.create_task(self.__run())
+    
+    async def stop(self):
+        if self.__task is not None:
+            self.__task.cancel()
+            try:
+                await self.__task
+            except asyncio.CancelledError:
+                pass
+    
+    async def settle(self):
+        """Lets the timer fire once, so a lag caused by synchronous code is recorded"""
+        await asyncio.sleep(self.interval * 2)
+
+@dataclass
+class Measurement:
+    """Result of a single timed operation"""
+    name: str
+    wall: float = 0.0
+    requests: int = 0
+    errors: int = 0
+    peak_memory: Optional[int] = None
+    loop_max_lag: float = 0.0
+    loop_blocked: float = 0.0
+    extra: dict[str, Any] = field(default_factory=dict)
+    
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+class Recorder:
+    """Times operations and collects their measurements.
+    
+    Args:
+        request_stats (Any): Stats of the mock server, with `reset()` and `to_dict()`
+        trace_memory (bool, optional): Record the peak memory with tracemalloc. Slows everything down noticeably. Defaults to True.
+    """
+    measurements: list[Measurement]
+    
+    def __init__(self, request_stats: Any, trace_memory: bool = True):
+        self.request_stats = request_stats
+        self.trace_memory = trace_memory
+        self.monitor = LoopLagMonitor()
+        self.measurements = []
+    
+    async def __aenter__(self) -> "Recorder":
+        if self.trace_memory:
+            tracemalloc.start()
+        self.monitor.start()
+        return self
+    
+    async def __aexit__(self, *args):
+        await self.monitor.stop()
+        if self.trace_memory:
+            tracemalloc.stop()
+    
+    @asynccontextmanager
+    async def measure(self, name: str) -> AsyncIterator[Measurement]:
+        """Measures the body of the `async with` block"""
+        measurement = Measurement(name)
+        await self.monitor.settle()
+        self.request_stats.reset()
+        self.monitor.reset()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        yield measurement
+        measurement.wall = time.perf_counter() - start
+        await self.monitor.settle()
+        stats = self.request_stats.to_dict()
+        measurement.requests = stats["total"]
+        measurement.errors = stats["errors"]
+        measurement.loop_max_lag = self.monitor.max_lag
+        measurement.loop_blocked = self.monitor.blocked
+        if self.trace_memory:
+            measurement.peak_memory = tracemalloc.get_traced_memory()[1]
+        self.measurements.append(measurement)
+    
+    async def run(self, name: str, fn: Callable[[], Any | Awaitable]) -> Any:
+        """Measures a call to `fn`, which may be a coroutine function"""
+        async with self.measure(name):
+            result = fn()
+            if inspect.isawaitable(result):
+                result = await result
+        return result
\ No newline at end of file
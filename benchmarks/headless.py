@@ -0,0 +1,152 @@
+import asyncio
+import copy
+import inspect
+import logging
+from types import SimpleNamespace
+from typing import Any, Callable, Optional
+import weakref
+
+import flet as ft
+
+LOGGER = logging.getLogger(__name__)
+
+class HeadlessClientStorage:
+    """In-memory stand-in of `page.client_storage`"""
+    __data: dict[str, Any]
+    
+    def __init__(self):
+        self.__data = {}
+    
+    def get(self, key: str) -> Any:
+        return copy.deepcopy(self.__data.get(key))
+    
+    def set(self, key: str, value: Any) -> bool:
+        self.__data[key] = copy.deepcopy(value)
+        return True
+    
+    def contains_key(self, key: str) -> bool:
+        return key in self.__data
+    
+    def remove(self, key: str) -> bool:
+        return self.__data.pop(key, None) is not None
+    
+    def get_keys(self, key_prefix: str) -> list[str]:
+        return [key for key in self.__data if key.startswith(key_prefix)]
+    
+    def clear(self) -> bool:
+        self.__data.clear()
+        return True
+    
+    async def get_async(self, key: str) -> Any:
+        return self.get(key)
+    
+    async def set_async(self, key: str, value: Any) -> bool:
+        return self.set(key, value)
+    
+    async def contains_key_async(self, key: str) -> bool:
+        return self.contains_key(key)
+    
+    async def remove_async(self, key: str) -> bool:
+        return self.remove(key)
+    
+    async def get_keys_async(self, key_prefix: str) -> list[str]:
+        return self.get_keys(key_prefix)
+
+class HeadlessPage:
+    """Minimal stand-in of `ft.Page` to run the app without a browser.
+    
+    Controls are mounted the way Flet does it when they are added to the page: `build` once, `before_update` on every update, `did_mount` once after the tree was built.
+    Nothing is sent anywhere; `update` only counts the controls it would have sent.
+    """
+    session_id: str
+    data: Any = None
+    route: str = "/"
+    title: str = ""
+    auth: Any = None
+    splash: Optional[ft.Control] = None
+    appbar: Optional[ft.Control] = None
+    drawer: Optional[ft.Control] = None
+    bottom_appbar: Optional[ft.Control] = None
+    on_route_change: Optional[Callable] = None
+    on_close: Optional[Callable] = None
+    controls: list[ft.Control]
+    overlay: list[ft.Control]
+    updated_controls: int = 0
+    __mounted: weakref.WeakSet
+    __tasks: set[asyncio.Task]
+    
+    def __init__(self, session_id: str = "headless"):
+        self.session_id = session_id
+        self.client_storage = HeadlessClientStorage()
+        self.controls = []
+        self.overlay = []
+        self.__mounted = weakref.WeakSet()
+        self.__tasks = set()
+    
+    def __mount(self, control: Optional[ft.Control], added: list[ft.Control]):
+        if control is None:
+            return
+        if control not in self.__mounted:
+            control.page = self
+            self.__mounted.add(control)
+            control.build()
+            added.append(control)
+        control.before_update()
+        self.updated_controls += 1
+        for child in control._get_children():
+            self.__mount(child, added)
+    
+    def update(self, *controls: ft.Control):
+        if not controls:
+            controls = [self.appbar, self.drawer, self.bottom_appbar, self.splash, *self.controls, *self.overlay]
+        added: list[ft.Control] = []
+        for control in controls:
+            self.__mount(control, added)
+        for control in added:
+            control.did_mount()
+    
+    def go(self, route: str, **kwargs):
+        self.route = route
+        if self.on_route_change is not None:
+            self.__call_handler(self.on_route_change, SimpleNamespace(route=route, page=self, control=self))
+    
+    def open(self, control: ft.Control):
+        self.overlay.append(control)
+        self.update(control)
+    
+    def close(self, control: ft.Control):
+        if control in self.overlay:
+            self.overlay.remove(control)
+    
+    def run_task(self, handler: Callable, *args, **kwargs) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(handler(*args, **kwargs))
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+        return task
+    
+    def __call_handler(self, handler: Callable, e: Any):
+        result = handler(e)
+        if inspect.isawaitable(result):
+            self.run_task(lambda: result)
+    
+    def login(self, *args, **kwargs):
+        pass
+    
+    def logout(self, *args, **kwargs):
+        pass
+    
+    def launch_url(self, *args, **kwargs):
+        pass
+    
+    async def wait_idle(self):
+        """Waits until every task started with `run_task` has finished, including the ones they started"""
+        while self.__tasks:
+            results = await asyncio.gather(*list(self.__tasks), return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    LOGGER.warning("Task failed", exc_info=result)
+    
+    async def close_session(self):
+        if self.on_close is not None:
+            self.__call_handler(self.on_close, SimpleNamespace(page=self))
+        await self.wait_idle()
\ No newline at end of file
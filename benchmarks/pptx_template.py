@@ -0,0 +1,23 @@
+from pptx import Presentation
+from pptx.util import Inches
+
+from app.slides import image_placeholder
+
+TEXT_PLACEHOLDERS = ("{{title}}", "{{name}}", "{{speakers}}", "{{metrics}}")
+
+def write_template(path: str, max_images: int = 4) -> dict[int, int]:
+    """Writes a template presentation with a slide for each number of images, from 0 to `max_images`
+    
+    Returns:
+        dict[int, int]: Index of the template slide for each number of images
+    """
+    presentation = Presentation()
+    layout = presentation.slide_layouts[6]
+    for num_images in range(max_images + 1):
+        slide = presentation.slides.add_slide(layout)
+        for k, placeholder in enumerate(TEXT_PLACEHOLDERS):
+            slide.shapes.add_textbox(Inches(0.5), Inches(0.5 + k), Inches(6), Inches(0.8)).text_frame.text = placeholder
+        for i in range(num_images):
+            slide.shapes.add_textbox(Inches(0.5 + i * 2.2), Inches(5), Inches(2), Inches(2)).text_frame.text = image_placeholder(i)
+    presentation.save(path)
+    return {num_images: num_images for num_images in range(max_images + 1)}
\ No newline at end of file
@@ -0,0 +1,137 @@
+import logging
+import os
+import socket
+import tempfile
+from typing import Any
+
+import tabbycat_api as tc
+from app import TabbycatApp
+from app.components.generate_slides.adjudicators import AdjudicatorTab
+from app.components.generate_slides.speakers import SpeakerTab
+from app.components.generate_slides.teams import TeamTab
+from app.pptx_renderer import ImageCache, PptxRenderer
+from app.slides import SlidePipeline
+from app.utils import create_slides
+from mock_tabbycat import MockServerConfig, TournamentSpec, create_app, generate_tournament, run_in_thread
+from .fake_google import FakeSlidesService
+from .harness import Recorder
+from .headless import HeadlessPage
+from .pptx_template import write_template
+
+LOGGER = logging.getLogger(__name__)
+
+def get_free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+async def run_size(spec: TournamentSpec, config: MockServerConfig, trace_memory: bool = True, repeat: int = 3) -> dict[str, Any]:
+    """Runs every scenario against a freshly generated tournament
+    
+    Args:
+        spec (TournamentSpec): Tournament to generate
+        config (MockServerConfig): Latency and error injection of the mock server
+        trace_memory (bool, optional): Record peak memory. Defaults to True.
+        repeat (int, optional): Number of runs of the synchronous calculations, the fastest is reported. Defaults to 3.
+    """
+    port = get_free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    mt = generate_tournament(spec, base_url)
+    server_app = create_app(mt, config)
+    server = run_in_thread(server_app, port=port)
+    page = HeadlessPage(session_id=f"bench-{spec.num_teams}-{spec.format}-{spec.num_rounds}")
+    try:
+        async with Recorder(server_app.state.stats, trace_memory) as recorder:
+            app = TabbycatApp(page)
+            await page.wait_idle()
+            client = tc.Client(tc.ClientConfig(base_url=base_url, api_token="benchmark", editable=True, httpx_timeout=60))
+            tournaments = await client.get_tournaments()
+            tournament = tournaments.find(slug=spec.slug)
+            
+            await recorder.run("set_tabbycat", lambda: app.set_tabbycat(client, tournament, "tabbycat_login.benchmark", force=True))
+            async with recorder.measure("open_round_status") as m:
+                page.go("/rounds")
+                await page.wait_idle()
+                m.extra["updated_controls"] = page.updated_controls
+            pagelet = app.pagelets.pg_round_status
+            async with recorder.measure("round_status_set_tabbycat"):
+                await pagelet.set_tabbycat()
+                await page.wait_idle()
+            async with recorder.measure("round_status_set_tabs") as m:
+                page.updated_controls = 0
+                pagelet.set_tabs()
+                await page.wait_idle()
+                m.extra["updated_controls"] = page.updated_controls
+            async with recorder.measure("open_generate_slides"):
+                page.go("/slides")
+                await page.wait_idle()
+            
+            # Synchronous calculations, fastest of `repeat` runs per tab type
+            for tab in app.pagelets.pg_generate_slides.tabs.tabs:
+                name = {TeamTab: "team_tab_calculate", SpeakerTab: "speaker_tab_calculate", AdjudicatorTab: "adjudicator_tab_calculate"}.get(type(tab))
+                if name is None:
+                    continue
+                best = None
+                for _ in range(repeat):
+                    async with recorder.measure(name) as m:
+                        tab.calculate()
+                    recorder.measurements.pop()
+                    best = m if best is None or m.wall < best.wall else best
+                recorder.measurements.append(best)
+            
+            team_tab = next((tab for tab in app.pagelets.pg_generate_slides.tabs.tabs if isinstance(tab, TeamTab)), None)
+            if team_tab is not None:
+                service = FakeSlidesService()
+                async with recorder.measure("create_slides") as m:
+                    slides = team_tab.get_slides(ascending=True, danger=True)
+                    create_slides(service, "benchmark", service.template_slides(), slides, 0, service.num_slides)
+                    m.extra["slides"] = len(slides)
+                    m.extra["slide_requests"] = len(service.batch_requests)
+                    m.extra["google_calls"] = dict(service.calls)
+                
+                # Scoped pipeline: a first generation, a re-generation with nothing changed, then with one slide changed
+                keyed_slides = team_tab.get_slides(ascending=True, danger=True)
+                max_images = max((len(slide["images"]) for slide in keyed_slides), default=0)
+                service = FakeSlidesService(max_images + 1)
+                template_slides = service.template_slides(max_images)
+                scope = f"teams:{tournament.url}"
+                changed_slides = [{**slide, "texts": {**slide["texts"], "{{title}}": slide["texts"]["{{title}}"] + "*"}} if n == 0 else slide for n, slide in enumerate(keyed_slides)]
+                for name, slides in (("slide_pipeline_create", keyed_slides), ("slide_pipeline_unchanged", keyed_slides), ("slide_pipeline_one_changed", changed_slides)):
+                    service.reset()
+                    async with recorder.measure(name) as m:
+                        result = SlidePipeline(service, "benchmark", template_slides, slides, len(template_slides), scope=scope).run()
+                        m.extra["slides"] = len(slides)
+                        m.extra["created"] = result.created
+                        m.extra["kept"] = result.kept
+                        m.extra["deleted"] = result.deleted
+                        m.extra["slide_requests"] = len(service.batch_requests)
+                        m.extra["google_calls"] = dict(service.calls)
+                
+                # Local rendering from a generated template, offline so the images are skipped
+                with tempfile.TemporaryDirectory(prefix="tcm-bench-") as directory:
+                    template_path = os.path.join(directory, "template.pptx")
+                    renderer = PptxRenderer(
+                        template_path,
+                        write_template(template_path, max_images),
+                        keyed_slides,
+                        max_images + 1,
+                        image_cache=ImageCache(os.path.join(directory, "images"))
+                    )
+                    async with recorder.measure("pptx_render") as m:
+                        result = await renderer.render(os.path.join(directory, "output.pptx"))
+                        m.extra["slides"] = result.created
+                        m.extra["skipped_images"] = len(result.skipped_images)
+                        m.extra["bytes"] = os.path.getsize(result.path)
+            await page.close_session()
+    finally:
+        server.should_exit = True
+    results: dict[str, Any] = {}
+    for measurement in recorder.measurements:
+        # Tabs of the same type are summed, like a user generating every category
+        if measurement.name in results:
+            previous = results[measurement.name]
+            previous["wall"] += measurement.wall
+            previous["count"] += 1
+        else:
+            results[measurement.name] = {**measurement.to_dict(), "count": 1}
+    return {"spec": {**vars(spec)}, "objects": mt.count_objects(), "results": results}
\ No newline at end of file
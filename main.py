@@ -9,6 +9,8 @@ import logging
 load_dotenv()
 tc.config.set_tabbycat_config(null_exception=False, lazy_load=False)
 from app import TabbycatApp
+from app.downloads import UPLOAD_DIR
+from app.metrics import start_metrics_server
 
 def main(page: ft.Page):
     TabbycatApp(page)
@@ -25,11 +27,12 @@ def set_logging(default_level=logging.INFO):
 if __name__ == "__main__":
     set_logging()
     logging.getLogger(__name__).info("Starting Tabbycat Flet app, port %s", os.getenv("PORT"))
+    start_metrics_server()
     ft.app(
         main,
         port=int(os.getenv("PORT", 8550)),
         view=ft.WEB_BROWSER,
         assets_dir="assets",
-        upload_dir="assets/uploads",
+        upload_dir=UPLOAD_DIR,
     )
     
\ No newline at end of file
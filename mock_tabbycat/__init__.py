@@ -0,0 +1,3 @@
+"""Local stand-in for the Tabbycat REST API, serving generated tournaments for load testing"""
+from .generator import MockTournament, TournamentSpec, generate_tournament
+from .server import MockServerConfig, create_app, run_in_thread
\ No newline at end of file
@@ -0,0 +1,41 @@
+import argparse
+import logging
+import uvicorn
+from .generator import TournamentSpec, generate_tournament
+from .server import MockServerConfig, create_app
+
+LOGGER = logging.getLogger("mock_tabbycat")
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a generated tournament through a mock Tabbycat API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--teams", type=int, default=64, help="Number of teams")
+    parser.add_argument("--format", choices=["bp", "ap"], default="bp")
+    parser.add_argument("--rounds", type=int, default=5, help="Number of preliminary rounds")
+    parser.add_argument("--feedback-rate", type=float, default=0.8, help="Fraction of the required feedback submitted")
+    parser.add_argument("--ballot-rate", type=float, default=1.0, help="Fraction of the ballots submitted in the last round")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean latency added to each request, in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 429/5xx")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    spec = TournamentSpec(
+        num_teams=args.teams,
+        format=args.format,
+        num_rounds=args.rounds,
+        feedback_rate=args.feedback_rate,
+        ballot_rate=args.ballot_rate,
+        seed=args.seed,
+    )
+    mt = generate_tournament(spec, f"http://{args.host}:{args.port}")
+    LOGGER.info(f"Generated {mt.tournament['name']}: {mt.count_objects()}")
+    LOGGER.info(f"Log in with URL http://{args.host}:{args.port}/ and any token")
+    uvicorn.run(
+        create_app(mt, MockServerConfig(latency=args.latency, error_rate=args.error_rate, seed=args.seed)),
+        host=args.host,
+        port=args.port,
+    )
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,424 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+import itertools
+import random
+from typing import Any, Literal, Optional
+
+TournamentFormat = Literal["bp", "ap"]
+
+SIDES: dict[TournamentFormat, list[str]] = {
+    "bp": ["og", "oo", "cg", "co"],
+    "ap": ["aff", "neg"],
+}
+SPEAKERS_PER_TEAM: dict[TournamentFormat, int] = {
+    "bp": 2,
+    "ap": 3,
+}
+
+@dataclass
+class TournamentSpec:
+    """Parameters of a generated tournament"""
+    num_teams: int = 64
+    format: TournamentFormat = "bp"
+    num_rounds: int = 5
+    num_institutions: Optional[int] = None
+    feedback_rate: float = 0.8
+    ballot_rate: float = 1.0
+    seed: int = 0
+    slug: str = "mock"
+    
+    @property
+    def teams_per_debate(self) -> int:
+        return len(SIDES[self.format])
+
+@dataclass
+class MockTournament:
+    """Generated tournament, stored as the JSON objects served by the Tabbycat v1 API"""
+    base_url: str
+    spec: TournamentSpec
+    tournament: dict[str, Any] = field(default_factory=dict)
+    institutions: list[dict] = field(default_factory=list)
+    teams: list[dict] = field(default_factory=list)
+    speakers: list[dict] = field(default_factory=list)
+    adjudicators: list[dict] = field(default_factory=list)
+    break_categories: list[dict] = field(default_factory=list)
+    speaker_categories: list[dict] = field(default_factory=list)
+    rounds: list[dict] = field(default_factory=list)
+    pairings: dict[int, list[dict]] = field(default_factory=dict)
+    ballots: dict[int, list[dict]] = field(default_factory=dict)
+    feedback: list[dict] = field(default_factory=list)
+    feedback_questions: list[dict] = field(default_factory=list)
+    motions: list[dict] = field(default_factory=list)
+    venues: list[dict] = field(default_factory=list)
+    venue_categories: list[dict] = field(default_factory=list)
+    preferences: list[dict] = field(default_factory=list)
+    team_standings: list[dict] = field(default_factory=list)
+    speaker_standings: list[dict] = field(default_factory=list)
+    reply_standings: list[dict] = field(default_factory=list)
+    breaks: dict[int, list[dict]] = field(default_factory=dict)
+    
+    @property
+    def api_url(self) -> str:
+        return f"{self.base_url.rstrip('/')}/api/v1"
+    
+    @property
+    def tournament_url(self) -> str:
+        return f"{self.api_url}/tournaments/{self.spec.slug}"
+    
+    def collection(self, name: str) -> list[dict]:
+        return getattr(self, name)
+    
+    def next_id(self, name: str) -> int:
+        return max((obj["id"] for obj in self.collection(name)), default=0) + 1
+    
+    def count_objects(self) -> dict[str, int]:
+        return {
+            "institutions": len(self.institutions),
+            "teams": len(self.teams),
+            "speakers": len(self.speakers),
+            "adjudicators": len(self.adjudicators),
+            "rounds": len(self.rounds),
+            "pairings": sum(len(p) for p in self.pairings.values()),
+            "ballots": sum(len(b) for b in self.ballots.values()),
+            "feedback": len(self.feedback),
+        }
+
+def generate_tournament(spec: TournamentSpec, base_url: str = "http://localhost:8001") -> MockTournament:
+    """Generates a tournament with a full draw, ballots and feedback for every round
+    
+    Args:
+        spec (TournamentSpec): Size and format of the tournament
+        base_url (str, optional): Base URL the mock server is reachable at, used for the `url` of every object. Defaults to "http://localhost:8001".
+    """
+    if spec.num_teams % spec.teams_per_debate:
+        raise ValueError(f"Number of teams must be a multiple of {spec.teams_per_debate} for {spec.format.upper()}")
+    rng = random.Random(spec.seed)
+    mt = MockTournament(base_url, spec)
+    turl = mt.tournament_url
+    sides = SIDES[spec.format]
+    num_debates = spec.num_teams // spec.teams_per_debate
+    start = datetime(2025, 1, 1, 9, 0)
+    
+    mt.tournament = {
+        "id": 1,
+        "url": turl,
+        "name": f"Mock {spec.format.upper()} Open ({spec.num_teams} teams)",
+        "short_name": f"Mock{spec.num_teams}",
+        "slug": spec.slug,
+        "seq": 1,
+        "active": True,
+        "_links": {
+            "rounds": f"{turl}/rounds",
+            "break_categories": f"{turl}/break-categories",
+            "speaker_categories": f"{turl}/speaker-categories",
+            "institutions": f"{mt.api_url}/institutions",
+            "teams": f"{turl}/teams",
+            "adjudicators": f"{turl}/adjudicators",
+            "speakers": f"{turl}/speakers",
+            "venues": f"{turl}/venues",
+            "venue_categories": f"{turl}/venue-categories",
+            "motions": f"{turl}/motions",
+            "feedback": f"{turl}/feedback",
+            "feedback_questions": f"{turl}/feedback-questions",
+            "preferences": f"{turl}/preferences",
+        },
+    }
+    
+    # Institutions
+    num_institutions = spec.num_institutions or max(1, spec.num_teams // 4)
+    for i in range(1, num_institutions + 1):
+        mt.institutions.append({
+            "id": i,
+            "url": f"{mt.api_url}/institutions/{i}",
+            "name": f"University {i}",
+            "code": f"U{i}",
+            "region": None,
+            "venue_constraints": [],
+        })
+    
+    # Categories
+    for i, (name, slug, is_general) in enumerate([("Open", "open", True), ("ESL", "esl", False)], start=1):
+        mt.break_categories.append({
+            "id": i,
+            "url": f"{turl}/break-categories/{i}",
+            "name": name,
+            "slug": slug,
+            "seq": i,
+            "break_size": min(16 if is_general else 8, spec.num_teams),
+            "is_general": is_general,
+            "priority": i,
+            "limit": 0,
+            "rule": "standard",
+            "_links": {
+                "eligibility": f"{turl}/break-categories/{i}/eligibility",
+                "breaking_teams": f"{turl}/break-categories/{i}/break",
+            },
+        })
+    for i, (name, slug) in enumerate([("Novice", "novice"), ("EFL", "efl")], start=1):
+        mt.speaker_categories.append({
+            "id": i,
+            "url": f"{turl}/speaker-categories/{i}",
+            "name": name,
+            "slug": slug,
+            "seq": i,
+            "limit": 0,
+            "public": True,
+        })
+    
+    # Teams and speakers
+    speaker_ids = itertools.count(1)
+    for i in range(1, spec.num_teams + 1):
+        institution = mt.institutions[(i - 1) % num_institutions]
+        reference = chr(ord("A") + (i - 1) // num_institutions % 26)
+        team_url = f"{turl}/teams/{i}"
+        speakers = []
+        for _ in range(SPEAKERS_PER_TEAM[spec.format]):
+            sid = next(speaker_ids)
+            speaker = {
+                "id": sid,
+                "url": f"{turl}/speakers/{sid}",
+                "name": f"Speaker {sid}",
+                "email": f"speaker{sid}@example.com",
+                "phone": "",
+                "anonymous": False,
+                "code_name": f"S{sid}",
+                "url_key": f"spk{sid:05d}",
+                "gender": rng.choice(["M", "F", "O", ""]),
+                "pronoun": "",
+                "categories": [mt.speaker_categories[0]["url"]] if rng.random() < 0.2 else [],
+                "team": team_url,
+            }
+            speakers.append(speaker)
+            mt.speakers.append(speaker)
+        mt.teams.append({
+            "id": i,
+            "url": team_url,
+            "reference": reference,
+            "short_reference": reference,
+            "code_name": f"Team {i}",
+            "emoji": None,
+            "short_name": f"{institution['code']} {reference}",
+            "long_name": f"{institution['name']} {reference}",
+            "institution": institution["url"],
+            "speakers": speakers,
+            "use_institution_prefix": True,
+            "break_categories": [mt.break_categories[0]["url"]] + ([mt.break_categories[1]["url"]] if rng.random() < 0.25 else []),
+            "institution_conflicts": [],
+            "venue_constraints": [],
+        })
+    
+    # Adjudicators: a chair and two panellists per debate, plus trainees
+    num_adjudicators = num_debates * 3 + num_debates // 4
+    for i in range(1, num_adjudicators + 1):
+        mt.adjudicators.append({
+            "id": i,
+            "url": f"{turl}/adjudicators/{i}",
+            "name": f"Adjudicator {i}",
+            "email": f"adj{i}@example.com",
+            "phone": "",
+            "anonymous": False,
+            "pronoun": "",
+            "institution": rng.choice(mt.institutions)["url"],
+            "base_score": round(rng.uniform(2.0, 5.0), 1),
+            "breaking": False,
+            "trainee": i > num_debates * 3,
+            "independent": False,
+            "adj_core": i <= 3,
+            "institution_conflicts": [],
+            "team_conflicts": [],
+            "adjudicator_conflicts": [],
+            "url_key": f"adj{i:05d}",
+        })
+    
+    # Venues
+    mt.venue_categories.append({"id": 1, "url": f"{turl}/venue-categories/1", "name": "Main building", "description": "", "display_in_venue_name": "N", "display_in_public_tooltip": False, "venues": []})
+    for i in range(1, num_debates + 1):
+        venue = {"id": i, "url": f"{turl}/venues/{i}", "name": f"Room {i}", "display_name": f"Room {i}", "priority": 100, "categories": [mt.venue_categories[0]["url"]], "external_url": ""}
+        mt.venues.append(venue)
+        mt.venue_categories[0]["venues"].append(venue["url"])
+    
+    # Feedback questions
+    mt.feedback_questions.append({
+        "id": 1,
+        "url": f"{turl}/feedback-questions/1",
+        "seq": 1,
+        "reference": "comments",
+        "text": "Comments",
+        "name": "Comments",
+        "answer_type": "tl",
+        "required": False,
+        "from_adj": True,
+        "from_team": True,
+        "min_value": None,
+        "max_value": None,
+        "choices": [],
+    })
+    
+    # Preferences
+    mt.preferences.extend(
+        {"identifier": identifier, "section": identifier.split("__")[0], "name": identifier.split("__")[1], "value": value}
+        for identifier, value in {
+            "debate_rules__teams_in_debate": spec.teams_per_debate,
+            "debate_rules__speakers_in_team": SPEAKERS_PER_TEAM[spec.format],
+            "debate_rules__reply_scores_enabled": spec.format == "ap",
+            "feedback__feedback_from_teams": "orallist",
+            "feedback__feedback_paths": "with-p-on-c",
+            "standings__team_standings_precedence": ["points", "speaks_sum"] if spec.format == "bp" else ["wins", "speaks_sum"],
+            "standings__speaker_standings_precedence": ["total"],
+            "scoring__score_min": 68.0,
+            "scoring__score_max": 82.0,
+        }.items()
+    )
+    
+    # Rounds, draws, ballots and feedback
+    team_points = {team["url"]: 0 for team in mt.teams}
+    team_speaks = {team["url"]: 0.0 for team in mt.teams}
+    speaker_scores: dict[str, list[float]] = {speaker["url"]: [] for speaker in mt.speakers}
+    reply_scores: dict[str, list[float]] = {speaker["url"]: [] for speaker in mt.speakers}
+    pairing_ids = itertools.count(1)
+    ballot_ids = itertools.count(1)
+    feedback_ids = itertools.count(1)
+    chairs = mt.adjudicators[:num_debates]
+    panellists = mt.adjudicators[num_debates:num_debates * 3]
+    trainees = mt.adjudicators[num_debates * 3:]
+    for seq in range(1, spec.num_rounds + 1):
+        round_url = f"{turl}/rounds/{seq}"
+        motion_url = f"{turl}/motions/{seq}"
+        mt.motions.append({"id": seq, "url": motion_url, "text": f"This House would mock round {seq}", "reference": f"Motion {seq}", "info_slide": "", "rounds": [{"round": round_url, "seq": 1}]})
+        mt.rounds.append({
+            "id": seq,
+            "url": round_url,
+            "seq": seq,
+            "completed": seq < spec.num_rounds,
+            "name": f"Round {seq}",
+            "abbreviation": f"R{seq}",
+            "stage": "P",
+            "draw_type": "R" if seq == 1 else "P",
+            "draw_status": "R",
+            "break_category": None,
+            "starts_at": (start + timedelta(hours=2 * seq)).isoformat(),
+            "feedback_weight": 0.5,
+            "silent": False,
+            "motions_released": True,
+            "motions": [{"motion": motion_url, "seq": 1}],
+            "weight": 1,
+            "_links": {"pairing": f"{round_url}/pairings"},
+        })
+        # Power-paired draw on the current points, shuffled within brackets
+        ordered = sorted(mt.teams, key=lambda team: (-team_points[team["url"]], rng.random()))
+        shuffled_chairs = rng.sample(chairs, len(chairs))
+        shuffled_panellists = rng.sample(panellists, len(panellists))
+        shuffled_trainees = rng.sample(trainees, len(trainees))
+        mt.pairings[seq] = []
+        for d in range(num_debates):
+            pid = next(pairing_ids)
+            pairing_url = f"{round_url}/pairings/{pid}"
+            debate_teams = ordered[d * spec.teams_per_debate:(d + 1) * spec.teams_per_debate]
+            rng.shuffle(debate_teams)
+            chair = shuffled_chairs[d]
+            panel = shuffled_panellists[2 * d:2 * d + 2]
+            trainee = [shuffled_trainees[d]] if d < len(shuffled_trainees) else []
+            submitted = seq < spec.num_rounds or rng.random() < spec.ballot_rate
+            mt.pairings[seq].append({
+                "id": pid,
+                "url": pairing_url,
+                "venue": mt.venues[d]["url"],
+                "teams": [{"team": team["url"], "side": side} for team, side in zip(debate_teams, sides)],
+                "adjudicators": {"chair": chair["url"], "panellists": [adj["url"] for adj in panel], "trainees": [adj["url"] for adj in trainee]},
+                "bracket": team_points[debate_teams[0]["url"]],
+                "room_rank": d + 1,
+                "importance": 0,
+                "result_status": "C" if submitted else "N",
+                "sides_confirmed": True,
+                "barcode": None,
+                "_links": {"ballots": f"{pairing_url}/ballots"},
+            })
+            mt.ballots[pid] = []
+            if not submitted:
+                continue
+            # Ballot
+            ranking = rng.sample(range(spec.teams_per_debate), spec.teams_per_debate)
+            sheet_teams = []
+            timestamp = (start + timedelta(hours=2 * seq, minutes=90 + rng.randint(0, 30))).isoformat()
+            for team, side, rank in zip(debate_teams, sides, ranking):
+                points = spec.teams_per_debate - 1 - rank
+                speeches = []
+                for speaker in team["speakers"]:
+                    score = float(rng.randint(70, 80))
+                    speaker_scores[speaker["url"]].append(score)
+                    speeches.append({"ghost": False, "score": score, "rank": None, "speaker": speaker["url"]})
+                if spec.format == "ap":
+                    replier = team["speakers"][0]
+                    reply = rng.randint(70, 80) / 2
+                    reply_scores[replier["url"]].append(reply)
+                    speeches.append({"ghost": False, "score": reply, "rank": None, "speaker": replier["url"]})
+                total = sum(s["score"] for s in speeches)
+                team_points[team["url"]] += points
+                team_speaks[team["url"]] += total
+                sheet_teams.append({"side": side, "points": points, "win": points == spec.teams_per_debate - 1, "score": total, "team": team["url"], "speeches": speeches})
+            bid = next(ballot_ids)
+            mt.ballots[pid].append({
+                "id": bid,
+                "url": f"{pairing_url}/ballots/{bid}",
+                "result": {"sheets": [{"teams": sheet_teams}]},
+                "motion": motion_url,
+                "participant_submitter": chair["url"],
+                "submitter": None,
+                "confirmer": None,
+                "confirm_timestamp": timestamp,
+                "ip_address": "127.0.0.1",
+                "timestamp": timestamp,
+                "version": 1,
+                "private_url": True,
+                "confirmed": True,
+                "discarded": False,
+                "single_adj": False,
+                "forfeit": False,
+                "vetos": [],
+            })
+            # Feedback: teams on the chair, the chair on the panellists and the panel on the chair
+            directions = [(team["url"], team["speakers"][0]["url"], chair) for team in debate_teams]
+            directions.extend((chair["url"], chair["url"], adj) for adj in panel)
+            directions.extend((adj["url"], adj["url"], chair) for adj in panel + trainee)
+            for source, submitter, target in directions:
+                if rng.random() >= spec.feedback_rate:
+                    continue
+                fid = next(feedback_ids)
+                mt.feedback.append({
+                    "id": fid,
+                    "url": f"{turl}/feedback/{fid}",
+                    "adjudicator": target["url"],
+                    "source": source,
+                    "participant_submitter": submitter,
+                    "submitter": None,
+                    "confirmer": None,
+                    "confirm_timestamp": None,
+                    "ip_address": "127.0.0.1",
+                    "private_url": True,
+                    "version": 1,
+                    "timestamp": (start + timedelta(hours=2 * seq, minutes=100 + rng.randint(0, 60))).isoformat(),
+                    "score": float(rng.randint(1, 5)),
+                    "ignored": rng.random() < 0.02,
+                    "confirmed": True,
+                    "debate": pairing_url,
+                    "answers": [{"question": mt.feedback_questions[0]["url"], "answer": "Good"}],
+                })
+    
+    # Standings and breaks
+    team_order = sorted(mt.teams, key=lambda team: (-team_points[team["url"]], -team_speaks[team["url"]]))
+    for rank, team in enumerate(team_order, start=1):
+        metrics = [{"metric": "points" if spec.format == "bp" else "wins", "value": team_points[team["url"]]}, {"metric": "speaks_sum", "value": team_speaks[team["url"]]}]
+        mt.team_standings.append({"rank": rank, "tied": False, "metrics": metrics, "team": team["url"]})
+    for category in mt.break_categories:
+        eligible = [team for team in team_order if category["url"] in team["break_categories"]]
+        mt.breaks[category["id"]] = [
+            {"team": team["url"], "rank": rank, "break_rank": rank, "remark": None}
+            for rank, team in enumerate(eligible[:category["break_size"]], start=1)
+        ]
+    for standings, scores in ((mt.speaker_standings, speaker_scores), (mt.reply_standings, reply_scores)):
+        order = sorted((url for url in scores if scores[url]), key=lambda url: -sum(scores[url]))
+        standings.extend(
+            {"rank": rank, "tied": False, "metrics": [{"metric": "total", "value": sum(scores[url])}, {"metric": "average", "value": sum(scores[url]) / len(scores[url])}], "speaker": url}
+            for rank, url in enumerate(order, start=1)
+        )
+    return mt
\ No newline at end of file
@@ -0,0 +1,237 @@
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
+import logging
+import random
+import re
+import threading
+import time
+from typing import Optional
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+import uvicorn
+
+from .generator import MockTournament
+
+LOGGER = logging.getLogger(__name__)
+COLLECTIONS = {
+    "teams": "teams",
+    "adjudicators": "adjudicators",
+    "speakers": "speakers",
+    "break-categories": "break_categories",
+    "speaker-categories": "speaker_categories",
+    "rounds": "rounds",
+    "motions": "motions",
+    "venues": "venues",
+    "venue-categories": "venue_categories",
+    "feedback": "feedback",
+    "feedback-questions": "feedback_questions",
+    "preferences": "preferences",
+}
+
+@dataclass
+class MockServerConfig:
+    """Fault injection knobs of the mock server"""
+    latency: float = 0.0
+    jitter: float = 0.5
+    error_rate: float = 0.0
+    error_statuses: tuple[int, ...] = (429, 500, 502, 503)
+    seed: Optional[int] = None
+
+@dataclass
+class MockServerStats:
+    """Requests served by the mock server, by endpoint pattern"""
+    requests: Counter = field(default_factory=Counter)
+    errors: Counter = field(default_factory=Counter)
+    
+    def reset(self):
+        self.requests.clear()
+        self.errors.clear()
+    
+    def to_dict(self) -> dict:
+        return {
+            "total": sum(self.requests.values()),
+            "errors": sum(self.errors.values()),
+            "requests": dict(self.requests),
+            "by_status": {str(status): count for status, count in self.errors.items()},
+        }
+
+def endpoint_pattern(path: str) -> str:
+    """Normalizes a path for the stats, e.g. /rounds/3/pairings/12/ballots -> /rounds/{id}/pairings/{id}/ballots"""
+    return re.sub(r"/\d+(?=/|$)", "/{id}", path)
+
+class FaultInjectionMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app, config: MockServerConfig, stats: MockServerStats):
+        super().__init__(app)
+        self.config = config
+        self.stats = stats
+        self.rng = random.Random(config.seed)
+    
+    async def dispatch(self, request: Request, call_next):
+        if request.url.path.startswith("/_mock"):
+            return await call_next(request)
+        pattern = f"{request.method} {endpoint_pattern(request.url.path)}"
+        self.stats.requests[pattern] += 1
+        if self.config.latency > 0:
+            await asyncio.sleep(max(0.0, self.config.latency * (1 + self.config.jitter * self.rng.uniform(-1, 1))))
+        if self.config.error_rate > 0 and self.rng.random() < self.config.error_rate:
+            status = self.rng.choice(self.config.error_statuses)
+            self.stats.errors[status] += 1
+            headers = {"Retry-After": "1"} if status == 429 else None
+            return JSONResponse({"detail": "Injected error"}, status_code=status, headers=headers)
+        return await call_next(request)
+
+def create_app(mt: MockTournament, config: Optional[MockServerConfig] = None) -> Starlette:
+    """Creates the ASGI app serving a generated tournament through the Tabbycat v1 REST API
+    
+    Args:
+        mt (MockTournament): Tournament to serve, modified in place by POST requests
+        config (MockServerConfig, optional): Fault injection settings. Defaults to no latency and no errors.
+    """
+    config = config or MockServerConfig()
+    stats = MockServerStats()
+    
+    def not_found() -> JSONResponse:
+        return JSONResponse({"detail": "Not found."}, status_code=404)
+    
+    def check_slug(request: Request) -> bool:
+        return request.path_params["slug"] == mt.spec.slug
+    
+    def get_by_id(objects: list[dict], id: int) -> Optional[dict]:
+        return next((obj for obj in objects if obj.get("id") == id), None)
+    
+    async def create(request: Request, name: str, url: str) -> JSONResponse:
+        obj = await request.json()
+        obj["id"] = mt.next_id(name)
+        obj["url"] = f"{url}/{obj['id']}"
+        mt.collection(name).append(obj)
+        return JSONResponse(obj, status_code=201)
+    
+    async def tournaments(request: Request):
+        return JSONResponse([mt.tournament])
+    
+    async def tournament(request: Request):
+        return JSONResponse(mt.tournament) if check_slug(request) else not_found()
+    
+    async def institutions(request: Request):
+        if request.method == "POST":
+            return await create(request, "institutions", f"{mt.api_url}/institutions")
+        return JSONResponse(mt.institutions)
+    
+    async def institution(request: Request):
+        obj = get_by_id(mt.institutions, request.path_params["id"])
+        return JSONResponse(obj) if obj else not_found()
+    
+    async def collection(request: Request):
+        name = COLLECTIONS.get(request.path_params["collection"])
+        if not check_slug(request) or name is None:
+            return not_found()
+        if request.method == "POST":
+            return await create(request, name, f"{mt.tournament_url}/{request.path_params['collection']}")
+        return JSONResponse(mt.collection(name))
+    
+    async def detail(request: Request):
+        name = COLLECTIONS.get(request.path_params["collection"])
+        if not check_slug(request) or name is None or name == "preferences":
+            return not_found()
+        obj = get_by_id(mt.collection(name), request.path_params["id"])
+        return JSONResponse(obj) if obj else not_found()
+    
+    async def pairings(request: Request):
+        if not check_slug(request) or request.path_params["seq"] not in mt.pairings:
+            return not_found()
+        return JSONResponse(mt.pairings[request.path_params["seq"]])
+    
+    async def pairing(request: Request):
+        if not check_slug(request):
+            return not_found()
+        obj = get_by_id(mt.pairings.get(request.path_params["seq"], []), request.path_params["id"])
+        return JSONResponse(obj) if obj else not_found()
+    
+    async def ballots(request: Request):
+        if not check_slug(request) or request.path_params["id"] not in mt.ballots:
+            return not_found()
+        return JSONResponse(mt.ballots[request.path_params["id"]])
+    
+    async def team_standings(request: Request):
+        if not check_slug(request):
+            return not_found()
+        category = request.query_params.get("category")
+        if category is None:
+            return JSONResponse(mt.team_standings)
+        cat = next((c for c in mt.break_categories if category in (str(c["id"]), c["slug"], c["url"])), None)
+        teams = {team["url"] for team in mt.teams if cat and cat["url"] in team["break_categories"]}
+        return JSONResponse([standing for standing in mt.team_standings if standing["team"] in teams])
+    
+    async def speaker_standings(request: Request):
+        if not check_slug(request):
+            return not_found()
+        category = request.query_params.get("category")
+        if category is None:
+            return JSONResponse(mt.speaker_standings)
+        cat = next((c for c in mt.speaker_categories if category in (str(c["id"]), c["slug"], c["url"])), None)
+        speakers = {speaker["url"] for speaker in mt.speakers if cat and cat["url"] in speaker["categories"]}
+        return JSONResponse([standing for standing in mt.speaker_standings if standing["speaker"] in speakers])
+    
+    async def reply_standings(request: Request):
+        return JSONResponse(mt.reply_standings) if check_slug(request) else not_found()
+    
+    async def breaking_teams(request: Request):
+        if not check_slug(request) or request.path_params["id"] not in mt.breaks:
+            return not_found()
+        return JSONResponse(mt.breaks[request.path_params["id"]])
+    
+    async def mock_stats(request: Request):
+        if request.method == "DELETE":
+            stats.reset()
+            return Response(status_code=204)
+        return JSONResponse(stats.to_dict())
+    
+    async def mock_config(request: Request):
+        if request.method == "POST":
+            for key, value in (await request.json()).items():
+                if hasattr(config, key):
+                    setattr(config, key, value)
+        return JSONResponse({"latency": config.latency, "jitter": config.jitter, "error_rate": config.error_rate})
+    
+    t = "/api/v1/tournaments/{slug}"
+    app = Starlette(
+        routes=[
+            Route("/api/v1/tournaments", tournaments),
+            Route(t, tournament),
+            Route("/api/v1/institutions", institutions, methods=["GET", "POST"]),
+            Route("/api/v1/institutions/{id:int}", institution),
+            Route(t + "/teams/standings", team_standings),
+            Route(t + "/speakers/standings", speaker_standings),
+            Route(t + "/speakers/standings/replies", reply_standings),
+            Route(t + "/break-categories/{id:int}/break", breaking_teams),
+            Route(t + "/rounds/{seq:int}/pairings", pairings),
+            Route(t + "/rounds/{seq:int}/pairings/{id:int}", pairing),
+            Route(t + "/rounds/{seq:int}/pairings/{id:int}/ballots", ballots),
+            Route(t + "/{collection}", collection, methods=["GET", "POST"]),
+            Route(t + "/{collection}/{id:int}", detail),
+            Route("/_mock/stats", mock_stats, methods=["GET", "DELETE"]),
+            Route("/_mock/config", mock_config, methods=["GET", "POST"]),
+        ]
+    )
+    app.add_middleware(FaultInjectionMiddleware, config=config, stats=stats)
+    app.state.tournament = mt
+    app.state.config = config
+    app.state.stats = stats
+    return app
+
+def run_in_thread(app: Starlette, host: str = "127.0.0.1", port: int = 8001) -> uvicorn.Server:
+    """Runs the app in a daemon thread and waits until it accepts connections. Stop it by setting `should_exit` on the returned server."""
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError(f"Mock Tabbycat server failed to start on {host}:{port}")
+        time.sleep(0.05)
+    LOGGER.info(f"Mock Tabbycat server running on http://{host}:{port}")
+    return server
\ No newline at end of file
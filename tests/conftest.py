@@ -0,0 +1,6 @@
+import os
+
+# The app reads its configuration at import time
+os.environ.setdefault("GOOGLE_CLIENT_ID", "test")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "test")
+os.environ.setdefault("SECRET_KEY", "test")
\ No newline at end of file
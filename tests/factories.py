@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+from typing import Any, Optional
+
+import pytest
+
+tc = pytest.importorskip("tabbycat_api")
+
+def make_team(name: str, speakers: tuple[Any, ...] = ()) -> Any:
+    """Makes a team passing the `tc.models.Team` checks, without going through the API client"""
+    cls = type("Team", (tc.models.Team,), {"__init__": lambda self: None, "url": f"teams/{name}", "name": name, "short_name": name, "speakers": list(speakers)})
+    return cls()
+
+def make_adjudicator(name: str) -> SimpleNamespace:
+    return SimpleNamespace(url=f"adjudicators/{name}", name=name)
+
+def make_speaker(name: str) -> SimpleNamespace:
+    return SimpleNamespace(url=f"speakers/{name}", name=name)
+
+def make_pairing(
+    url: str,
+    teams: dict[str, Any],
+    chair: Optional[Any] = None,
+    panellists: tuple[Any, ...] = (),
+    trainees: tuple[Any, ...] = (),
+    result_status: str = "C",
+    ballots: tuple[Any, ...] = ()
+) -> SimpleNamespace:
+    """Makes a pairing with the teams by side"""
+    return SimpleNamespace(
+        url=url,
+        result_status=result_status,
+        adjudicators=SimpleNamespace(chair=chair, panellists=list(panellists), trainees=list(trainees)),
+        teams=[SimpleNamespace(side=side, team=team) for side, team in teams.items()],
+        _links=SimpleNamespace(ballots=list(ballots)),
+    )
+
+def make_round(url: str, pairings: list[Any], silent: bool = False, stage: str = "P") -> SimpleNamespace:
+    return SimpleNamespace(url=url, silent=silent, stage=stage, _links=SimpleNamespace(pairing=pairings))
+
+def make_feedback(source: Any, adjudicator: Any, debate: Any, confirmed: bool = True, version: int = 1) -> SimpleNamespace:
+    return SimpleNamespace(
+        url=f"feedback/{debate.url}/{source.url}/{adjudicator.url}/{version}",
+        source=source,
+        adjudicator=adjudicator,
+        debate=debate,
+        confirmed=confirmed,
+        ignored=False,
+        version=version,
+        timestamp=None,
+    )
+
+def make_ballot(url: str, sheets: list[Any], confirmed: bool = False, discarded: bool = False, version: int = 1) -> SimpleNamespace:
+    """Makes a ballot with its sheets, one per adjudicator for voting ballots"""
+    return SimpleNamespace(url=url, version=version, timestamp=None, confirmed=confirmed, discarded=discarded, result=SimpleNamespace(sheets=sheets))
+
+def make_sheet(teams: dict[str, tuple[Any, Optional[int], list[tuple[Any, Optional[float]]]]]) -> SimpleNamespace:
+    """Makes a sheet from the team, the points and the (speaker, score) speeches by side"""
+    return SimpleNamespace(
+        teams=[
+            SimpleNamespace(side=side, team=team, points=points, speeches=[SimpleNamespace(speaker=speaker, score=score) for speaker, score in speeches])
+            for side, (team, points, speeches) in teams.items()
+        ]
+    )
\ No newline at end of file
@@ -0,0 +1,94 @@
+import pytest
+
+pytest.importorskip("flet")
+from app.ballot_analysis import BallotAnalyzer, ScoreRules, analyze_pairing
+from app.verification import debate_status, summarize_debate, verify_pairing
+from .factories import make_ballot, make_pairing, make_round, make_sheet, make_speaker, make_team
+
+RULES = ScoreRules(score_min=68, score_max=82, reply_score_min=34, reply_score_max=41, speakers_in_team=2)
+GOV_SPEAKERS = (make_speaker("G1"), make_speaker("G2"))
+OPP_SPEAKERS = (make_speaker("O1"), make_speaker("O2"))
+GOV, OPP = make_team("Gov", GOV_SPEAKERS), make_team("Opp", OPP_SPEAKERS)
+
+def make_result(gov_points: int = 1, gov=GOV, opp=OPP, gov_speakers=GOV_SPEAKERS, scores=(75, 75, 37), opp_side: str = "opp"):
+    """Makes a sheet where Gov wins by default, with the scores of the two speeches and the reply of each team"""
+    return make_sheet({
+        "gov": (gov, gov_points, list(zip(gov_speakers + gov_speakers[:1], scores))),
+        opp_side: (opp, 1 - gov_points, list(zip(OPP_SPEAKERS + OPP_SPEAKERS[:1], (75, 75, 37)))),
+    })
+
+def analyze(*ballots):
+    return analyze_pairing(make_pairing("pairings/1", {"gov": GOV, "opp": OPP}, ballots=ballots), RULES)
+
+def kinds(analysis) -> list[str]:
+    return [flag.kind for flag in analysis.flags]
+
+def test_agreeing_ballots():
+    analysis = analyze(make_ballot("ballots/1", [make_result()]), make_ballot("ballots/2", [make_result()], confirmed=True, version=2))
+    assert not analysis
+    assert analysis.message == ""
+
+def test_rank():
+    analysis = analyze(make_ballot("ballots/1", [make_result()]), make_ballot("ballots/2", [make_result(gov_points=0)], version=2))
+    assert kinds(analysis) == ["rank"]
+    assert "Ver. 1 / Ver. 2" in analysis.message
+
+def test_discarded_ballots_are_ignored():
+    assert not analyze(make_ballot("ballots/1", [make_result()]), make_ballot("ballots/2", [make_result(gov_points=0)], discarded=True, version=2))
+
+def test_speakers_disagree():
+    swapped = GOV_SPEAKERS[::-1]
+    analysis = analyze(make_ballot("ballots/1", [make_result()]), make_ballot("ballots/2", [make_result(gov_speakers=swapped)], version=2))
+    assert kinds(analysis) == ["speaker"]
+
+def test_speaker_not_in_team():
+    analysis = analyze(make_ballot("ballots/1", [make_result(gov_speakers=(GOV_SPEAKERS[0], OPP_SPEAKERS[0]))]))
+    # The first speaker also gives the reply
+    assert kinds(analysis) == ["speaker"]
+    assert "O1 is not a speaker of Gov" in analysis.message
+
+@pytest.mark.parametrize("scores, message", [
+    ((83, 75, 37), "G1 scored 83, outside 68-82"),
+    ((75, 67, 37), "G2 scored 67, outside 68-82"),
+    ((75, 75, 42), "G1 scored 42 (reply), outside 34-41"),
+])
+def test_outlier(scores, message):
+    analysis = analyze(make_ballot("ballots/1", [make_result(scores=scores)]))
+    assert kinds(analysis) == ["outlier"]
+    assert message in analysis.message
+
+def test_outlier_on_every_sheet():
+    sheets = [make_result(scores=(90, 75, 37)) for _ in range(3)]
+    assert kinds(analyze(make_ballot("ballots/1", sheets))) == ["outlier"] * 3
+
+def test_side_swapped():
+    analysis = analyze(make_ballot("ballots/1", [make_result(gov=OPP, opp=GOV)]))
+    assert kinds(analysis).count("side") == 2
+    assert "Opp on gov, the draw has Gov" in analysis.message
+
+def test_side_not_in_draw():
+    analysis = analyze(make_ballot("ballots/1", [make_result(opp_side="cg")]))
+    assert kinds(analysis) == ["side"]
+    assert "side cg is not in the draw" in analysis.message
+
+def test_analyzer_reuses_analysis_until_ballots_change():
+    analyzer = BallotAnalyzer()
+    pairing = make_pairing("pairings/1", {"gov": GOV, "opp": OPP}, ballots=[make_ballot("ballots/1", [make_result()])])
+    analysis = analyzer.analyze(pairing, RULES)
+    assert analyzer.analyze(pairing, RULES) is analysis
+    pairing._links.ballots.append(make_ballot("ballots/2", [make_result(gov_points=0)], version=2))
+    assert kinds(analyzer.analyze(pairing, RULES)) == ["rank"]
+    assert analyzer.analyze_round(make_round("rounds/1", [pairing]), RULES).keys() == {"pairings/1"}
+
+def test_summary_counts_ballot_flags():
+    pairing = make_pairing("pairings/1", {"gov": GOV, "opp": OPP}, ballots=[make_ballot("ballots/1", [make_result(scores=(90, 75, 37))])])
+    round = make_round("rounds/1", [pairing])
+    result = verify_pairing(pairing, [], "no-one", "no-adjs")
+    assert result.status == 2
+    analysis = analyze_pairing(pairing, RULES)
+    summary = summarize_debate(round, pairing, result, analysis)
+    assert summary.status == debate_status(result, analysis) == 1
+    assert summary.has_problem
+    assert summary.ballot_flags == [flag.message for flag in analysis.flags]
+    assert summarize_debate(round, pairing, result).status == 2
+    assert debate_status(verify_pairing(make_pairing("pairings/2", {"gov": GOV, "opp": OPP}, result_status="D"), [], "no-one", "no-adjs"), analysis) == 0
\ No newline at end of file
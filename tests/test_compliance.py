@@ -0,0 +1,91 @@
+import pytest
+
+pytest.importorskip("flet")
+pytest.importorskip("numpy")
+from app.compliance import ComplianceEngine, build_compliance, get_directions
+from app.verification import verify_pairing
+from .factories import make_adjudicator, make_feedback, make_pairing, make_round, make_team
+
+CHAIR_1, PANELLIST_1, CHAIR_2, PANELLIST_2 = (make_adjudicator(name) for name in ("C1", "P1", "C2", "P2"))
+TEAM_A, TEAM_B, TEAM_C, TEAM_D = (make_team(name) for name in "ABCD")
+
+def make_rounds():
+    """Makes an inround, a silent round and an outround of two debates each"""
+    rounds = []
+    for n, kwargs in enumerate(({}, {"silent": True}, {"stage": "E"}), 1):
+        pairings = [
+            make_pairing(f"pairings/{n}-1", {"gov": TEAM_A, "opp": TEAM_B}, CHAIR_1, (PANELLIST_1,)),
+            make_pairing(f"pairings/{n}-2", {"gov": TEAM_C, "opp": TEAM_D}, CHAIR_2, (PANELLIST_2,)),
+        ]
+        rounds.append(make_round(f"rounds/{n}", pairings, **kwargs))
+    return rounds
+
+def make_feedbacks(rounds):
+    inround, silent, outround = rounds
+    debate_1, debate_2 = inround._links.pairing
+    return [
+        # Inround: A and B name different orallists and A names a second one, the orallist feedback of D missing,
+        # C1→P1 submitted twice, P2→C2 not required, C2→P2 missing
+        make_feedback(TEAM_A, CHAIR_1, debate_1),
+        make_feedback(TEAM_B, PANELLIST_1, debate_1),
+        make_feedback(TEAM_A, PANELLIST_1, debate_1, version=2),
+        make_feedback(TEAM_C, CHAIR_2, debate_2),
+        make_feedback(CHAIR_1, PANELLIST_1, debate_1),
+        make_feedback(CHAIR_1, PANELLIST_1, debate_1, version=2),
+        make_feedback(PANELLIST_2, CHAIR_2, debate_2),
+        make_feedback(CHAIR_2, PANELLIST_2, debate_2, confirmed=False),
+        # Silent round: team feedback is extra unless unconfirmed, adjudicators owe feedback
+        make_feedback(TEAM_A, CHAIR_1, silent._links.pairing[0]),
+        make_feedback(TEAM_B, CHAIR_1, silent._links.pairing[0], confirmed=False),
+        make_feedback(CHAIR_1, PANELLIST_1, silent._links.pairing[0]),
+        # Outround: nothing is owed
+        make_feedback(CHAIR_2, PANELLIST_2, outround._links.pairing[1]),
+    ]
+
+def test_counts():
+    rounds = make_rounds()
+    matrix = build_compliance(rounds, make_feedbacks(rounds), "orallist", "minimal")
+    assert matrix.totals() == {
+        # Per round: inround, silent round, outround
+        "required": 6 + 2 + 0,
+        "submitted": 4 + 1 + 0,
+        "missing": 2 + 1 + 0,
+        "extra": 3 + 1 + 1,
+        "debates": 6,
+        "confirmed_debates": 6,
+    }
+    assert matrix.missing_by_round() == {"rounds/1": 2, "rounds/2": 1, "rounds/3": 0}
+    participants = [participant.name for participant in matrix.participants]
+    assert [participants[i] for i in matrix.rows("team", only_missing=True)] == ["D", "A"]
+    assert [participants[i] for i in matrix.rows("adjudicator", only_missing=True)] == ["C2", "C1", "P2"]
+
+@pytest.mark.parametrize("team_direction", ["orallist", "all-adjs", "no-one"])
+@pytest.mark.parametrize("adj_direction", ["minimal", "with-p-on-c", "all-adjs", "no-adjs"])
+def test_agrees_with_verification(team_direction, adj_direction):
+    rounds = make_rounds()
+    feedbacks = make_feedbacks(rounds)
+    matrix = build_compliance(rounds, feedbacks, team_direction, adj_direction)
+    missing, extra = matrix.missing.sum(axis=0), matrix.extra.sum(axis=0)
+    for r, round in enumerate(rounds):
+        directions = get_directions(round, team_direction, adj_direction)
+        results = [
+            verify_pairing(pairing, [fb for fb in feedbacks if fb.debate is pairing], *directions)
+            for pairing in round._links.pairing
+        ]
+        assert missing[r] == sum(len(result.missing_team) + len(result.missing_adj) for result in results)
+        assert extra[r] == sum(len(result.extra_team) + len(result.extra_adj) for result in results)
+
+def test_invalid_feedback_path():
+    with pytest.raises(ValueError):
+        build_compliance(make_rounds(), [], "orallist", "everyone")
+
+def test_engine_reuses_matrix_until_inputs_change():
+    engine = ComplianceEngine()
+    rounds = make_rounds()
+    feedbacks = make_feedbacks(rounds)
+    matrix = engine.build(rounds, feedbacks, "orallist", "minimal")
+    assert engine.build(rounds, list(feedbacks), "orallist", "minimal") is matrix
+    feedbacks.append(make_feedback(TEAM_D, CHAIR_2, rounds[0]._links.pairing[1]))
+    updated = engine.build(rounds, feedbacks, "orallist", "minimal")
+    assert updated is not matrix
+    assert updated.totals()["missing"] == matrix.totals()["missing"] - 1
\ No newline at end of file
@@ -0,0 +1,93 @@
+import asyncio
+import os
+
+import pytest
+
+pytest.importorskip("flet")
+pytest.importorskip("googleapiclient")
+httpx = pytest.importorskip("httpx")
+Image = pytest.importorskip("PIL.Image")
+from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE_TYPE
+from app.pptx_renderer import ImageCache, PptxRenderer, is_public_address
+from benchmarks.pptx_template import write_template
+
+@pytest.fixture
+def template(tmp_path) -> tuple[str, dict[int, int]]:
+    path = str(tmp_path / "template.pptx")
+    return path, write_template(path, max_images=2)
+
+@pytest.fixture
+def image(tmp_path) -> str:
+    path = str(tmp_path / "logo.png")
+    Image.new("RGB", (40, 20), "red").save(path)
+    return path
+
+def texts(slide) -> list[str]:
+    return [shape.text_frame.text for shape in slide.shapes if shape.has_text_frame]
+
+def pictures(slide) -> int:
+    return sum(shape.shape_type == MSO_SHAPE_TYPE.PICTURE for shape in slide.shapes)
+
+def test_render(tmp_path, template, image):
+    template_path, template_slides = template
+    slides = [
+        {"texts": {"{{title}}": "Best team", "{{name}}": "Team 0"}, "images": set()},
+        {"texts": {"{{title}}": "Best team", "{{name}}": "Team 1"}, "images": {image}},
+        {"texts": {"{{title}}": "Best team", "{{name}}": "Team 2"}, "images": {image, "ftp://example.com/logo.png"}},
+    ]
+    progress = []
+    renderer = PptxRenderer(template_path, template_slides, slides, 1, image_cache=ImageCache(str(tmp_path / "cache"), allow_local=True), chunk_slides=2, on_progress=progress.append)
+    result = asyncio.run(renderer.render(str(tmp_path / "out" / "slides.pptx")))
+    assert result.created == 3
+    assert result.skipped_images == [(2, "ftp://example.com/logo.png")]
+    assert [(p.batches_done, p.slides_done) for p in progress] == [(1, 2), (2, 3)]
+    presentation = Presentation(result.path)
+    assert len(presentation.slides) == len(template_slides) + 3
+    rendered = list(presentation.slides)[1:4]
+    for n, slide in enumerate(rendered):
+        assert texts(slide)[:2] == ["Best team", f"Team {n}"]
+        assert not any("{{image" in text for text in texts(slide))
+    assert [pictures(slide) for slide in rendered] == [0, 1, 1]
+    # The templates are left as they were around the rendered slides
+    assert texts(presentation.slides[0])[0] == "{{title}}"
+    assert texts(presentation.slides[4])[0] == "{{title}}"
+
+def test_render_rejects_missing_template_slide(tmp_path, template):
+    template_path, _ = template
+    renderer = PptxRenderer(template_path, {0: 5}, [], image_cache=ImageCache(str(tmp_path / "cache")))
+    with pytest.raises(ValueError):
+        asyncio.run(renderer.render(str(tmp_path / "slides.pptx")))
+
+def test_local_images_need_allow_local(tmp_path, image):
+    assert asyncio.run(ImageCache(str(tmp_path / "cache")).fetch(image)) is None
+    assert asyncio.run(ImageCache(str(tmp_path / "cache"), allow_local=True).fetch(f"file://{image}")) == image
+
+@pytest.mark.parametrize("url", ["http://127.0.0.1/logo.png", "http://[::1]/logo.png", "http://169.254.169.254/latest", "http://10.0.0.1/", "ftp://8.8.8.8/logo.png"])
+def test_check_url_rejects_non_public_urls(tmp_path, url):
+    with pytest.raises(ValueError):
+        asyncio.run(ImageCache(str(tmp_path / "cache")).check_url(url))
+
+def test_download_connects_to_checked_address_and_caps_size(tmp_path, monkeypatch):
+    requests = []
+    def handler(request):
+        requests.append(request)
+        if request.url.path == "/moved.png":
+            return httpx.Response(302, headers={"Location": "/logo.png"})
+        return httpx.Response(200, content=b"x" * (100 if request.url.path == "/logo.png" else 101))
+    async def check_url(url):
+        return "93.184.216.34"
+    async def fetch(*urls):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            cache = ImageCache(str(tmp_path / "cache"), client, max_bytes=100)
+            monkeypatch.setattr(cache, "check_url", check_url)
+            return [await cache.fetch(url) for url in urls]
+    path, too_large = asyncio.run(fetch("https://example.com/moved.png", "https://example.com/large.png"))
+    assert open(path, "rb").read() == b"x" * 100
+    assert too_large is None
+    assert sorted(os.listdir(tmp_path / "cache")) == [os.path.basename(path)]
+    assert [(request.url.host, request.headers["Host"], request.extensions["sni_hostname"]) for request in requests] == [("93.184.216.34", "example.com", "example.com")] * 3
+
+@pytest.mark.parametrize("address, public", [("8.8.8.8", True), ("192.168.1.1", False), ("::ffff:127.0.0.1", False), ("224.0.0.1", False), ("2001:4860:4860::8888", True)])
+def test_is_public_address(address, public):
+    assert is_public_address(address) == public
\ No newline at end of file
@@ -0,0 +1,71 @@
+import pytest
+
+pytest.importorskip("flet")
+pytest.importorskip("googleapiclient")
+pytest.importorskip("httplib2")
+from app.slides import SlideData, SlidePipeline, slide_object_id
+from benchmarks.fake_google import FakeSlidesService
+
+SCOPE = "teams:tournaments/1"
+TEMPLATES = {0: "slide0", 1: "slide1"}
+
+def make_slides(n: int = 4) -> list[SlideData]:
+    return [{"texts": {"{{title}}": f"Team {i}"}, "images": {f"https://example.com/{i}.png"} if i % 2 else set(), "key": f"award:teams/{i}"} for i in range(n)]
+
+def make_pipeline(slides: list[SlideData], scope: str = SCOPE, service=None, position: int = 2) -> SlidePipeline:
+    return SlidePipeline(service, "presentation", TEMPLATES, slides, position, scope=scope)
+
+def object_ids(slides: list[SlideData], scope: str = SCOPE) -> list[str]:
+    return [slide_object_id(scope, slide, TEMPLATES[len(slide["images"])]) for slide in slides]
+
+def test_plan_without_slides_of_the_scope():
+    slides = make_slides()
+    pipeline = make_pipeline(slides)
+    assert pipeline.plan(["slide0", "slide1", "slide2"]) == ([0, 1, 2, 3], [], 2)
+    assert pipeline.result.slide_ids == object_ids(slides)
+    assert pipeline.result.kept == 0
+
+def test_plan_unchanged():
+    slides = make_slides()
+    current = ["slide0", "slide1", *object_ids(slides), "slide2"]
+    pipeline = make_pipeline(slides, position=0)
+    assert pipeline.plan(current) == ([], [], 2)
+    assert pipeline.result.kept == 4
+
+def test_plan_changed_added_and_removed():
+    old = make_slides(4)
+    new = make_slides(5)
+    new[1] = {**new[1], "texts": {"{{title}}": "Renamed"}}
+    del new[2]
+    other_scope = object_ids(old[:1], "teams:tournaments/2")
+    current = ["slide0", "slide1", *other_scope, *object_ids(old), "slide2"]
+    pipeline = make_pipeline(new)
+    to_create, to_delete, position = pipeline.plan(current)
+    # The slides are renumbered: new[1] is renamed and new[3] is added
+    assert to_create == [1, 3]
+    assert to_delete == object_ids(old)[1:3]
+    assert position == 3
+    assert pipeline.result.kept == 2
+
+def test_plan_rejects_slides_without_unique_keys():
+    slides = make_slides(2)
+    with pytest.raises(ValueError):
+        make_pipeline([slides[0], {**slides[1], "key": slides[0]["key"]}]).plan([])
+    del slides[1]["key"]
+    with pytest.raises(ValueError):
+        make_pipeline(slides).plan([])
+
+def test_run_again_only_replaces_changed_slides():
+    service = FakeSlidesService(3)
+    slides = make_slides()
+    result = make_pipeline(slides, service=service).run()
+    assert (result.created, result.kept, result.deleted) == (4, 0, 0)
+    assert service.slide_ids[2:6] == result.slide_ids
+    service.reset()
+    result = make_pipeline(slides, service=service).run()
+    assert (result.created, result.kept, result.deleted) == (0, 4, 0)
+    assert "presentations.batchUpdate" not in service.calls
+    slides[2] = {**slides[2], "texts": {"{{title}}": "Renamed"}}
+    result = make_pipeline(slides, service=service).run()
+    assert (result.created, result.kept, result.deleted) == (1, 3, 1)
+    assert service.slide_ids == ["slide0", "slide1", *result.slide_ids, "slide2"]
\ No newline at end of file
@@ -0,0 +1,127 @@
+import pytest
+
+pytest.importorskip("flet")
+from app.compliance import get_directions
+from app.verification import FEEDBACK_PATHS, VerificationEngine, verify_pairing
+from .factories import make_adjudicator, make_feedback, make_pairing, make_round, make_team
+
+CHAIR, PANELLIST_1, PANELLIST_2, TRAINEE = (make_adjudicator(name) for name in ("C", "P1", "P2", "T"))
+PANEL = (CHAIR, PANELLIST_1, PANELLIST_2, TRAINEE)
+GOV, OPP = make_team("Gov"), make_team("Opp")
+MINIMAL = {("C", "P1"), ("C", "P2"), ("C", "T")}
+# Feedback between adjudicators required by each feedback path, as (source, target) names
+REQUIRED_PATHS = {
+    "minimal": MINIMAL,
+    "with-p-on-c": MINIMAL | {("P1", "C"), ("P2", "C")},
+    "with-t-on-c": MINIMAL | {("P1", "C"), ("P2", "C"), ("T", "C")},
+    "all-adjs": {(src.name, dest.name) for src in PANEL for dest in PANEL if src is not dest},
+    "with-p-on-p": MINIMAL | {("P1", "C"), ("P2", "C"), ("T", "C"), ("P1", "P2"), ("P2", "P1")},
+    "no-adjs": set(),
+}
+
+def make_debate(result_status: str = "C"):
+    return make_pairing("pairings/1", {"gov": GOV, "opp": OPP}, CHAIR, (PANELLIST_1, PANELLIST_2), (TRAINEE,), result_status)
+
+def names(pairs) -> set[tuple[str, str]]:
+    return {(src.name, dest.name) for src, dest in pairs}
+
+def test_every_feedback_path_is_covered():
+    assert REQUIRED_PATHS.keys() == FEEDBACK_PATHS.keys()
+
+@pytest.mark.parametrize("adj_direction", FEEDBACK_PATHS)
+def test_missing_adjudicator_feedback(adj_direction):
+    result = verify_pairing(make_debate(), [], "no-one", adj_direction)
+    assert names(result.missing_adj) == REQUIRED_PATHS[adj_direction]
+    assert result.status == (1 if REQUIRED_PATHS[adj_direction] else 2)
+
+@pytest.mark.parametrize("adj_direction", FEEDBACK_PATHS)
+def test_extra_adjudicator_feedback(adj_direction):
+    pairing = make_debate()
+    feedbacks = [make_feedback(src, dest, pairing) for src in PANEL for dest in PANEL if src is not dest]
+    result = verify_pairing(pairing, feedbacks, "no-one", adj_direction)
+    assert result.missing_adj == []
+    assert {(fb.source.name, fb.adjudicator.name) for fb in result.extra_adj} == REQUIRED_PATHS["all-adjs"] - REQUIRED_PATHS[adj_direction]
+
+def test_duplicate_and_unconfirmed_feedback():
+    pairing = make_debate()
+    feedbacks = [
+        make_feedback(CHAIR, PANELLIST_1, pairing),
+        make_feedback(CHAIR, PANELLIST_1, pairing, version=2),
+        make_feedback(CHAIR, PANELLIST_2, pairing, confirmed=False),
+    ]
+    result = verify_pairing(pairing, feedbacks, "no-one", "minimal")
+    assert names(result.missing_adj) == {("C", "P2"), ("C", "T")}
+    assert [fb.version for fb in result.extra_adj] == [2]
+
+def test_invalid_feedback_path():
+    with pytest.raises(ValueError):
+        verify_pairing(make_debate(), [], "no-one", "everyone")
+
+def test_orallist():
+    pairing = make_debate()
+    result = verify_pairing(pairing, [make_feedback(GOV, CHAIR, pairing)], "orallist", "no-adjs")
+    assert [(team.name, adj) for team, adj in result.missing_team] == [("Opp", "orallist")]
+    result = verify_pairing(pairing, [make_feedback(GOV, CHAIR, pairing), make_feedback(OPP, CHAIR, pairing)], "orallist", "no-adjs")
+    assert result.missing_team == []
+    assert result.orallists == [CHAIR]
+    assert result.status == 2
+
+def test_multiple_orallists():
+    pairing = make_debate()
+    result = verify_pairing(pairing, [make_feedback(GOV, CHAIR, pairing), make_feedback(OPP, PANELLIST_1, pairing)], "orallist", "no-adjs")
+    assert result.missing_team == []
+    assert result.status == 1
+    assert "Multiple orallists" in result.message
+
+def test_second_orallist_feedback_is_extra():
+    pairing = make_debate()
+    feedbacks = [make_feedback(GOV, CHAIR, pairing), make_feedback(GOV, PANELLIST_1, pairing), make_feedback(OPP, CHAIR, pairing)]
+    result = verify_pairing(pairing, feedbacks, "orallist", "no-adjs")
+    assert result.missing_team == []
+    assert [(fb.source.name, fb.adjudicator.name) for fb in result.extra_team] == [("Gov", "P1")]
+    assert result.orallists == [CHAIR]
+
+def test_team_feedback_on_all_adjudicators():
+    pairing = make_debate()
+    feedbacks = [make_feedback(GOV, adj, pairing) for adj in PANEL]
+    result = verify_pairing(pairing, feedbacks, "all-adjs", "no-adjs")
+    assert [(team.name, adj.name) for team, adj in result.missing_team] == [("Opp", adj.name) for adj in PANEL]
+    assert result.orallists is None
+    outsider = make_adjudicator("X")
+    result = verify_pairing(pairing, feedbacks + [make_feedback(GOV, CHAIR, pairing, version=2), make_feedback(GOV, outsider, pairing)], "all-adjs", "no-adjs")
+    assert [(fb.source.name, fb.adjudicator.name) for fb in result.extra_team] == [("Gov", "C"), ("Gov", "X")]
+
+def test_silent_round():
+    pairing = make_debate()
+    team_direction, adj_direction = get_directions(make_round("rounds/1", [pairing], silent=True), "orallist", "minimal")
+    assert (team_direction, adj_direction) == ("no-one", "minimal")
+    result = verify_pairing(pairing, [make_feedback(GOV, CHAIR, pairing)], team_direction, adj_direction)
+    assert result.missing_team == []
+    assert [fb.source for fb in result.extra_team] == [GOV]
+    assert names(result.missing_adj) == MINIMAL
+    result = verify_pairing(pairing, [make_feedback(GOV, CHAIR, pairing, confirmed=False)], team_direction, adj_direction)
+    assert result.extra_team == []
+
+def test_outround():
+    pairing = make_debate()
+    team_direction, adj_direction = get_directions(make_round("rounds/1", [pairing], stage="E"), "orallist", "all-adjs")
+    assert (team_direction, adj_direction) == ("no-one", "no-adjs")
+    result = verify_pairing(pairing, [], team_direction, adj_direction)
+    assert result.status == 2
+    result = verify_pairing(pairing, [make_feedback(CHAIR, PANELLIST_1, pairing)], team_direction, adj_direction)
+    assert names((fb.source, fb.adjudicator) for fb in result.extra_adj) == {("C", "P1")}
+
+def test_unconfirmed_round():
+    assert verify_pairing(make_debate("D"), [], "orallist", "minimal").status == 0
+
+def test_engine_reuses_result_until_inputs_change():
+    engine = VerificationEngine()
+    pairing = make_debate()
+    feedbacks = [make_feedback(CHAIR, adj, pairing) for adj in (PANELLIST_1, PANELLIST_2)]
+    result = engine.verify(pairing, feedbacks, "no-one", "minimal")
+    assert engine.verify(pairing, list(feedbacks), "no-one", "minimal") is result
+    feedbacks.append(make_feedback(CHAIR, TRAINEE, pairing))
+    updated = engine.verify(pairing, feedbacks, "no-one", "minimal")
+    assert updated is not result
+    assert updated.status == 2
+    assert engine.verify(pairing, feedbacks, "no-one", "with-p-on-c") is not updated
\ No newline at end of file